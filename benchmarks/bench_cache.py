@@ -0,0 +1,66 @@
+"""
+Compare cold and warm client startup with a :class:`scio.cache.WsdlCache`.
+
+Each measurement constructs one client in a fresh interpreter, as a
+worker process would at boot. Run from the root of the source tree::
+
+  $ python benchmarks/bench_cache.py [wsdl ...]
+
+Wsdl files are looked up in tests/support; imports are served from
+there too.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, '..'))
+SUPPORT = os.path.join(ROOT, 'tests', 'support')
+
+DEFAULT_WSDLS = ('CampaignManagementService.wsdl', 'shoppingservice.wsdl',
+                 'synxis.wsdl', 'zfapi.wsdl')
+
+CHILD = """
+import os, sys, time
+sys.path.insert(0, %(root)r)
+import scio.client
+from scio.cache import WsdlCache
+support = lambda fn: open(os.path.join(%(support)r, fn), 'r')
+scio.client.urlopen = lambda url: support(url.split('/')[-1])
+cache = %(cache)r and WsdlCache(%(cache)r) or None
+start = time.time()
+scio.client.Client(support(%(wsdl)r), cache=cache)
+print time.time() - start
+"""
+
+
+def startup(wsdl, cache_dir=None, repeat=5):
+    code = CHILD % {'root': ROOT, 'support': SUPPORT, 'cache': cache_dir,
+                    'wsdl': wsdl}
+    times = []
+    for i in range(repeat):
+        out = subprocess.Popen([sys.executable, '-c', code],
+                               stdout=subprocess.PIPE).communicate()[0]
+        times.append(float(out))
+    return min(times)
+
+
+def main(wsdls):
+    directory = tempfile.mkdtemp()
+    try:
+        print '%-34s %10s %12s %10s %8s' % (
+            'wsdl', 'no cache', 'first build', 'warm', 'speedup')
+        for wsdl in wsdls:
+            cold = startup(wsdl)
+            first = startup(wsdl, directory, repeat=1)
+            warm = startup(wsdl, directory)
+            print '%-34s %8.1fms %10.1fms %8.1fms %7.1fx' % (
+                wsdl, cold * 1000, first * 1000, warm * 1000, cold / warm)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or DEFAULT_WSDLS)
@@ -0,0 +1,76 @@
+"""
+Compare the memory a built client keeps resident with and without
+compact mode, which releases the parsed wsdl and imported documents
+once the client is built.
+
+Each measurement builds one client in a fresh interpreter and reports
+the growth in resident memory (from /proc/self/statm, and using glibc's
+malloc_trim, so Linux only) once the build is done, garbage has been
+collected and freed memory handed back to the system. Run from the
+root of the source tree::
+
+  $ python benchmarks/bench_compact.py [wsdl ...]
+
+Wsdl files are looked up in tests/support; imports are served from
+there too.
+"""
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, '..'))
+SUPPORT = os.path.join(ROOT, 'tests', 'support')
+
+DEFAULT_WSDLS = sorted([fn for fn in os.listdir(SUPPORT)
+                        if fn.endswith('.wsdl')])
+
+CHILD = """
+import ctypes, gc, os, resource, sys, time
+sys.path.insert(0, %(root)r)
+import scio.client
+support = lambda fn: open(os.path.join(%(support)r, fn), 'r')
+def rss():
+    pages = int(open('/proc/self/statm').read().split()[1])
+    return pages * resource.getpagesize() / 1024
+gc.collect()
+ctypes.CDLL('libc.so.6').malloc_trim(0)
+before = rss()
+start = time.time()
+client = scio.client.Client(support(%(wsdl)r), compact=%(compact)r,
+                            resolver=lambda url: support(url.split('/')[-1]))
+took = time.time() - start
+gc.collect()
+# hand memory freed by libxml2 back to the system, in both modes
+ctypes.CDLL('libc.so.6').malloc_trim(0)
+print took, rss() - before
+"""
+
+
+def measure(wsdl, compact, repeat=3):
+    code = CHILD % {'root': ROOT, 'support': SUPPORT, 'wsdl': wsdl,
+                    'compact': compact}
+    best = None
+    for i in range(repeat):
+        out = subprocess.Popen([sys.executable, '-c', code],
+                               stdout=subprocess.PIPE).communicate()[0]
+        took, rss = out.split()
+        result = (int(rss), float(took))
+        if best is None or result < best:
+            best = result
+    return best
+
+
+def main(wsdls):
+    print '%-38s %8s %10s %8s %10s %8s' % (
+        'wsdl', 'size', 'rss', 'build', 'compact', 'build')
+    for wsdl in wsdls:
+        size = os.path.getsize(os.path.join(SUPPORT, wsdl)) / 1024
+        rss, took = measure(wsdl, False)
+        c_rss, c_took = measure(wsdl, True)
+        print '%-38s %6dkB %8dkB %6.1fms %8dkB %6.1fms' % (
+            wsdl, size, rss, took * 1000, c_rss, c_took * 1000)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or DEFAULT_WSDLS)
@@ -0,0 +1,91 @@
+"""
+Compare the time gen.sort_deps takes to order the types of the largest
+support wsdls, and of synthetic chains of types, with the sort_deps of
+a given git revision (default HEAD~1).
+
+Run from the root of the source tree::
+
+  $ python benchmarks/bench_sort_deps.py [revision]
+"""
+import logging
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, '..'))
+SUPPORT = os.path.join(ROOT, 'tests', 'support')
+sys.path.insert(0, ROOT)
+
+import scio.client
+import scio.gen
+import scio.ir
+
+WSDLS = ('CampaignManagementService.wsdl', 'shoppingservice.wsdl',
+         'zfapi.wsdl', 'synxis.wsdl')
+CHAINS = (500, 1000, 2000)
+
+
+def support(fn):
+    return open(os.path.join(SUPPORT, fn), 'r')
+
+
+def old_gen(revision):
+    source = subprocess.Popen(
+        ['git', 'show', '%s:scio/gen.py' % revision],
+        cwd=ROOT, stdout=subprocess.PIPE).communicate()[0]
+    namespace = {'__name__': 'old_gen',
+                 '__file__': os.path.join(ROOT, 'scio', 'gen.py')}
+    exec compile(source, 'old_gen.py', 'exec') in namespace
+    return namespace
+
+
+def wsdl_types(wsdl):
+    factory = scio.client.Factory(
+        support(wsdl), resolver=lambda url: support(url.split('/')[-1]))
+    description = scio.ir.Description(factory.describe())
+    return [scio.gen.typeinfo(name, typecls)
+            for name, typecls in description.types]
+
+
+def chain_types(n):
+    # each type refers to the next, so the input order is the worst case
+    types = []
+    for i in range(n):
+        types.append({'class_name': 'T%d' % i, 'deps': [],
+                      'refs': ['T%d' % (i + 1)], 'unresolved': set()})
+    types[-1]['refs'] = []
+    types[0]['refs'].append('T%d' % (n - 1))
+    return types
+
+
+def time_sort(sort_deps, types):
+    start = time.time()
+    types = list(sort_deps(types))
+    types = list(sort_deps(types, key=lambda t: t['deps'] + t['refs'],
+                           allow_refs=True))
+    return time.time() - start
+
+
+def best(sort_deps, make, arg, repeat=3):
+    return min([time_sort(sort_deps, make(arg)) for i in range(repeat)])
+
+
+def main(revision='HEAD~1'):
+    logging.disable(logging.DEBUG)
+    old = old_gen(revision)['sort_deps']
+    print '%-34s %7s %10s %10s %8s' % (
+        'types', 'count', revision, 'current', 'speedup')
+    cases = [(wsdl, wsdl_types, wsdl) for wsdl in WSDLS]
+    cases += [('chain of %d' % n, chain_types, n) for n in CHAINS]
+    for label, make, arg in cases:
+        count = len(make(arg))
+        before = best(old, make, arg)
+        after = best(scio.gen.sort_deps, make, arg)
+        print '%-34s %7d %8.1fms %8.1fms %7.1fx' % (
+            label, count, before * 1000, after * 1000, before / after)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
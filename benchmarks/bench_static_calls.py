@@ -0,0 +1,80 @@
+"""
+Measure the per-call overhead of methods of generated static clients:
+getting a method from the client's service and formatting a request,
+without sending it. Compares modules generated with the template of a
+given git revision (default HEAD~1) with modules generated with the
+current template.
+
+Run from the root of the source tree::
+
+  $ python benchmarks/bench_static_calls.py [revision]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, '..'))
+SUPPORT = os.path.join(ROOT, 'tests', 'support')
+sys.path.insert(0, ROOT)
+
+import scio.client
+import scio.gen
+
+CLIENTS = (
+    # module, wsdl, method, arguments
+    ('lwclient', 'lyrics.wsdl', 'getArtist', "'U2'"),
+    ('zfclient', 'zfapi.wsdl', 'GetCategories', ""),
+    )
+NUMBER = 20000
+
+
+def generate(directory, template, suffix):
+    for module, wsdl, method, args in CLIENTS:
+        client = scio.client.Client(open(os.path.join(SUPPORT, wsdl)))
+        fh = open(os.path.join(directory, module + suffix + '.py'), 'w')
+        fh.write(scio.gen.gen(client, template=template))
+        fh.close()
+
+
+def per_call(stmt, setup):
+    best = min(timeit.Timer(stmt, setup).repeat(3, NUMBER))
+    return best / NUMBER
+
+
+def main(revision='HEAD~1'):
+    directory = tempfile.mkdtemp()
+    try:
+        old_template = os.path.join(directory, 'old.tpl')
+        fh = open(old_template, 'w')
+        fh.write(subprocess.Popen(
+            ['git', 'show', '%s:scio/static_client.tpl' % revision],
+            cwd=ROOT, stdout=subprocess.PIPE).communicate()[0])
+        fh.close()
+        generate(directory, old_template, '_old')
+        generate(directory, scio.gen.TEMPLATE, '_new')
+        sys.path.insert(0, directory)
+        print '%-10s %-14s %-16s %10s %10s %8s' % (
+            'client', 'method', 'measure', revision, 'current', 'speedup')
+        for module, wsdl, method, args in CLIENTS:
+            for measure, stmt in (
+                ('get method', 'c.service.%s' % method),
+                ('format request',
+                 'c.service.%s.format_request(%s)' % (method, args))):
+                times = []
+                for suffix in ('_old', '_new'):
+                    setup = ('import %s as m; c = m.Client()' %
+                             (module + suffix))
+                    times.append(per_call(stmt, setup))
+                print '%-10s %-14s %-16s %8.1fus %8.1fus %7.1fx' % (
+                    module, method, measure, times[0] * 1e6,
+                    times[1] * 1e6, times[0] / times[1])
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,89 @@
+"""
+Time importing generated static client modules, made with every type
+created at import (the default) and with lazy types
+(scio_generate_client -l), and then making one type, and every type.
+Each import is timed in a new process, with the module already
+compiled and scio itself imported.
+
+Run from the root of the source tree::
+
+  $ python benchmarks/bench_static_import.py
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, '..'))
+SUPPORT = os.path.join(ROOT, 'tests', 'support')
+sys.path.insert(0, ROOT)
+
+import scio.client
+import scio.gen
+
+CLIENTS = (
+    # module, wsdl, a type to make
+    ('zfclient', 'zfapi.wsdl', 'PhotoSet'),
+    ('shoppingclient', 'shoppingservice.wsdl', 'FindItemsAdvancedRequestType'),
+    )
+RUNS = 7
+
+SCRIPT = """
+import sys, time
+sys.path[:0] = [%(root)r, %(directory)r]
+from scio import client, static
+start = time.time()
+import %(module)s
+imported = time.time()
+%(module)s.Client().type.%(type)s
+one = time.time()
+if isinstance(%(module)s.Client._types, static.LazyTypeRegistry):
+    %(module)s.Client.resolve_refs()
+done = time.time()
+print imported - start, one - imported, done - one
+"""
+
+
+def generate(directory):
+    for module, wsdl, type_name in CLIENTS:
+        client = scio.client.Client(open(os.path.join(SUPPORT, wsdl)))
+        for suffix, lazy in (('', False), ('_lazy', True)):
+            fh = open(os.path.join(directory, module + suffix + '.py'), 'w')
+            fh.write(scio.gen.gen(client, lazy=lazy))
+            fh.close()
+
+
+def run(directory, module, type_name):
+    script = SCRIPT % {'root': ROOT, 'directory': directory,
+                       'module': module, 'type': type_name}
+    times = []
+    for i in range(RUNS):
+        out = subprocess.Popen([sys.executable, '-c', script],
+                               stdout=subprocess.PIPE).communicate()[0]
+        times.append([float(t) for t in out.split()])
+    # median of each
+    return [sorted(col)[len(col) // 2] for col in zip(*times)]
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        generate(directory)
+        # compile the modules
+        subprocess.call([sys.executable, '-m', 'compileall', '-q',
+                         directory])
+        print '%-22s %10s %10s %10s' % ('', 'import', 'one type',
+                                        'all types')
+        for module, wsdl, type_name in CLIENTS:
+            for suffix in ('', '_lazy'):
+                times = run(directory, module + suffix, type_name)
+                print '%-22s %8.1fms %8.1fms %8.1fms' % (
+                    (module + suffix,) + tuple([t * 1000 for t in times]))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
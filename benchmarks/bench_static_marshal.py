@@ -0,0 +1,108 @@
+"""
+Time reading responses, and writing the values read back out as xml,
+with a dynamic client, a generated static client, and a static client
+generated with marshalling code (scio_generate_client -m). The clients
+are timed in turn, ROUNDS times over, and the best time of each kept,
+so that they all see the same load on the machine.
+
+Run from the root of the source tree::
+
+  $ python benchmarks/bench_static_marshal.py
+"""
+import imp
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, '..'))
+SUPPORT = os.path.join(ROOT, 'tests', 'support')
+sys.path.insert(0, ROOT)
+
+from lxml import etree
+
+import scio.client
+import scio.gen
+
+NUMBER = 200
+ROUNDS = 10
+
+
+def support(name):
+    return open(os.path.join(SUPPORT, name))
+
+
+def lyrics(client):
+    rsp = etree.fromstring(support('lyric_rsp.xml').read())[0][0]
+    output = client.service.getArtist.method.output
+    def read():
+        return output(rsp)
+    def write():
+        for album in albums:
+            album.toxml('album')
+    artist, albums = read()
+    return read, write
+
+
+def adwords(client):
+    rsp = support('adwords_response_example.xml').read()
+    method = client.service.estimateKeywordList.method
+    def read():
+        return client.handle_response(method, rsp)
+    def write():
+        for estimate in result:
+            estimate.toxml('estimate')
+    result, headers = read()
+    return read, write
+
+
+CASES = (('lyric_rsp.xml', 'lyrics.wsdl', lyrics),
+         ('adwords_response_example.xml',
+          'adwords_trafficestimatorservice.wsdl', adwords))
+
+
+def load(directory, name, code):
+    path = os.path.join(directory, name + '.py')
+    fh = open(path, 'w')
+    fh.write(code)
+    fh.close()
+    return imp.load_source(name, path)
+
+
+def per_call(func):
+    return timeit.Timer(func).timeit(NUMBER) / NUMBER * 1000
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        for response, wsdl, case in CASES:
+            dynamic = scio.client.Client(support(wsdl))
+            name = os.path.splitext(wsdl)[0]
+            generic = load(directory, name,
+                           scio.gen.gen(dynamic)).Client()
+            marshal = load(directory, name + '_marshal',
+                           scio.gen.gen(dynamic, marshal=True)).Client()
+            clients = (('dynamic', dynamic),
+                       ('static', generic),
+                       ('static -m', marshal))
+            cases = [case(client) for label, client in clients]
+            best = [[None, None] for label, client in clients]
+            for round in range(ROUNDS):
+                for funcs, times in zip(cases, best):
+                    for i, func in enumerate(funcs):
+                        t = per_call(func)
+                        if times[i] is None or t < times[i]:
+                            times[i] = t
+            print response
+            for (label, client), (read, write) in zip(clients, best):
+                print '  %-10s read %7.3fms  write %7.3fms' % (
+                    label, read, write)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
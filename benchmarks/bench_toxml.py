@@ -0,0 +1,98 @@
+"""
+Time writing large requests as xml: a Bing Ads AddKeywords request
+with many keywords and an AdWords addCampaignList request with many
+campaigns, each item setting only a few of its many optional
+children, and an eBay shopping FindItemsAdvanced request, whose type
+declares dozens of optional children. Each is written with a dynamic
+client and with a generated static client, from the request objects
+to the serialized envelope (MethodCall.format_request).
+
+Run from the root of the source tree::
+
+  $ python benchmarks/bench_toxml.py [items]
+"""
+import imp
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, '..'))
+SUPPORT = os.path.join(ROOT, 'tests', 'support')
+sys.path.insert(0, ROOT)
+
+import scio.client
+import scio.gen
+
+
+def support(name):
+    return open(os.path.join(SUPPORT, name))
+
+
+def bing(client, items):
+    keywords = []
+    for i in range(items):
+        kw = client.type.Keyword(Text='keyword %s' % i, Param1='p%s' % i)
+        kw.ExactMatchBid.Amount = 0.25
+        keywords.append(kw)
+    call = client.service.AddKeywords
+    return lambda: call.format_request(
+        AdGroupId=1, Keywords=client.type.ArrayOfKeyword(Keyword=keywords))
+
+
+def adwords(client, items):
+    campaigns = []
+    for i in range(items):
+        campaigns.append(client.type.Campaign(
+            name='campaign %s' % i, budgetAmount=1000 + i, status='Paused'))
+    call = client.service.addCampaignList
+    return lambda: call.format_request(campaigns=campaigns)
+
+
+def shopping(client, items):
+    call = client.service.FindItemsAdvanced
+    return lambda: call.format_request(QueryKeywords='ipod',
+                                       MaxEntries=items)
+
+
+CASES = (('CampaignManagementService.wsdl', bing),
+         ('adwords_campaignservice.wsdl', adwords),
+         ('shoppingservice.wsdl', shopping))
+
+
+def load(directory, name, code):
+    path = os.path.join(directory, name + '.py')
+    fh = open(path, 'w')
+    fh.write(code)
+    fh.close()
+    return imp.load_source(name, path)
+
+
+def per_call(func, number):
+    return min(timeit.Timer(func).repeat(3, number)) / number * 1000
+
+
+def main(items):
+    scio.client.urlopen = lambda url: support(url.split('/')[-1])
+    directory = tempfile.mkdtemp()
+    try:
+        for wsdl, case in CASES:
+            dynamic = scio.client.Client(support(wsdl))
+            name = os.path.splitext(wsdl)[0]
+            static = load(directory, name, scio.gen.gen(dynamic)).Client()
+            print wsdl
+            for label, client in (('dynamic', dynamic), ('static', static)):
+                number = case is shopping and 2000 or 5
+                print '  %-10s %9.3fms' % (
+                    label, per_call(case(client, items), number))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    items = 2000
+    if sys.argv[1:]:
+        items = int(sys.argv[1])
+    main(items)
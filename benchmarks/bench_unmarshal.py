@@ -0,0 +1,88 @@
+"""
+Time reading responses with a dynamic client and with a generated
+static client (without marshalling code), both of which read complex
+types with :meth:`scio.client.ComplexType._unmarshal`, and with a
+static client generated with marshalling code (scio_generate_client
+-m) for comparison.
+
+Run from the root of the source tree::
+
+  $ python benchmarks/bench_unmarshal.py
+"""
+import imp
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, '..'))
+SUPPORT = os.path.join(ROOT, 'tests', 'support')
+sys.path.insert(0, ROOT)
+
+from lxml import etree
+
+import scio.client
+import scio.gen
+
+NUMBER = 200
+
+
+def support(name):
+    return open(os.path.join(SUPPORT, name))
+
+
+def lyrics(client):
+    rsp = etree.fromstring(support('lyric_rsp.xml').read())[0][0]
+    output = client.service.getArtist.method.output
+    return lambda: output(rsp)
+
+
+def adwords(client):
+    rsp = etree.fromstring(support('adwords_response_example.xml').read())
+    body = rsp.find(scio.client.SOAP_BODY)[0]
+    header = rsp.find(scio.client.SOAP_HEADER)
+    output = client.service.estimateKeywordList.method.output
+    return lambda: output(body, header)
+
+
+CASES = (('lyric_rsp.xml', 'lyrics.wsdl', lyrics),
+         ('adwords_response_example.xml',
+          'adwords_trafficestimatorservice.wsdl', adwords))
+
+
+def load(directory, name, code):
+    path = os.path.join(directory, name + '.py')
+    fh = open(path, 'w')
+    fh.write(code)
+    fh.close()
+    return imp.load_source(name, path)
+
+
+def per_call(func):
+    return min(timeit.Timer(func).repeat(5, NUMBER)) / NUMBER * 1000
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        for response, wsdl, case in CASES:
+            dynamic = scio.client.Client(support(wsdl))
+            name = os.path.splitext(wsdl)[0]
+            generic = load(directory, name,
+                           scio.gen.gen(dynamic)).Client()
+            marshal = load(directory, name + '_marshal',
+                           scio.gen.gen(dynamic, marshal=True)).Client()
+            print response
+            for label, client in (('dynamic', dynamic),
+                                  ('static', generic),
+                                  ('static -m', marshal)):
+                print '  %-10s read %7.3fms' % (label,
+                                                per_call(case(client)))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -28,7 +28,11 @@
 # OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN
 # IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+from hashlib import sha1
+import json
+import logging
 import os
+from StringIO import StringIO
 
 from docutils import nodes
 from docutils.parsers.rst import directives
@@ -36,6 +40,87 @@ from docutils.statemachine import ViewList
 from sphinx.util.compat import Directive
 
 import scio, scio.client
+from scio import ir
+from scio.cache import imports_changed
+from scio.util import atomic_write
+
+log = logging.getLogger(__name__)
+
+# Bump this whenever the reST made for a wsdl changes, so that reST
+# cached by older versions is not used.
+CACHE_VERSION = 1
+
+
+class RstCache(object):
+    """
+    On-disk cache of the reST made for wsdl files, kept between Sphinx
+    builds. Entries are keyed by a hash of the file's content, the
+    namespace it is documented in and the versions of the reST and IR
+    (see :mod:`scio.ir`) formats. Each entry also holds digests of the
+    documents the wsdl imported; they are fetched again when the entry
+    is loaded, and the entry is stale, and made again, if any of them
+    has changed. Entries are JSON, so loading one runs no code, and
+    are written to a temporary file and renamed, so that processes
+    reading documents in parallel never see a partial entry.
+
+    :param directory: The directory in which to store entries. It will
+                      be created if it does not exist.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def key(self, data, ns):
+        """
+        Cache key for file content documented in a namespace.
+        """
+        return sha1('%s\n%s\n%s\n%s' % (
+            CACHE_VERSION, ir.FORMAT_VERSION, ns, data)).hexdigest()
+
+    def path(self, key):
+        """
+        Path to the cache file for a key.
+        """
+        return os.path.join(self.directory, '%s.json' % key)
+
+    def load(self, key):
+        """
+        Load the reST cached for a key, as a ViewList. Returns None if
+        there is no entry, the entry can't be read, or it is stale.
+        """
+        try:
+            fh = open(self.path(key), 'rb')
+        except IOError:
+            return None
+        try:
+            try:
+                entry = json.load(fh)
+            except ValueError, e:
+                log.warning("Unable to load cached reST %s: %s", key, e)
+                return None
+        finally:
+            fh.close()
+        if imports_changed(entry['imports']):
+            return None
+        return ViewList(entry['data'],
+                        items=[tuple(item) for item in entry['items']])
+
+    def store(self, key, buf, imports):
+        """
+        Store the reST in a ViewList for a key, made from a wsdl that
+        imported documents with the given digests (a dict mapping urls
+        to sha1 hex digests).
+        """
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                # made by another process reading in parallel
+                if not os.path.isdir(self.directory):
+                    raise
+        atomic_write(self.path(key), json.dumps(
+            {'imports': imports, 'data': list(buf.data),
+             'items': list(buf.items)}))
+
 
 class AutoWsdl(Directive):
     required_arguments = 1
@@ -44,13 +129,16 @@ class AutoWsdl(Directive):
     option_spec = {'namespace': directives.unchanged}
     has_content = False
     ns = 'unknown'
-    client = None
+    description = None
+    imports = None
 
     def run(self):
         wsdl_file = self.arguments[0]
         self.ns = self.options.get('namespace', self.ns_from_file(wsdl_file))
-        self.client = scio.Client(open(wsdl_file, 'r')) # FIXME accept urls too?
-        rst = self.doc()
+        env = self.state.document.settings.env
+        # rebuild the document when the wsdl changes
+        env.note_dependency(os.path.abspath(wsdl_file))
+        rst = self.rst(wsdl_file, self.cache(env))
         state = self.state
         node = nodes.section()
         surrounding_title_styles = state.memo.title_styles
@@ -62,16 +150,54 @@ class AutoWsdl(Directive):
         state.memo.section_level = surrounding_section_level
         return node.children
 
+    def cache(self, env):
+        directory = env.config.autowsdl_cache_dir
+        if directory is False:
+            return None
+        if directory is None:
+            directory = os.path.join(env.doctreedir, 'autowsdl')
+        return RstCache(directory)
+
+    def rst(self, filename, cache=None):
+        # FIXME accept urls too?
+        data = ir.read_file(filename)
+        if cache is None:
+            self.description = self.describe(data)
+            return self.doc()
+        key = cache.key(data, self.ns)
+        rst = cache.load(key)
+        if rst is not None:
+            log.debug("Using cached reST for %s", filename)
+            return rst
+        self.description = self.describe(data)
+        rst = self.doc()
+        cache.store(key, rst, self.imports or {})
+        return rst
+
+    def describe(self, data):
+        # the types and methods are documented from their description,
+        # without making any classes; the digests of the documents the
+        # wsdl imports are kept in imports
+        if ir.is_ir(data):
+            # no xml to parse
+            self.imports = {}
+            return ir.load(StringIO(data))
+        factory = scio.client.Factory(StringIO(data))
+        description = factory.describe()
+        self.imports = factory._digests.copy()
+        return description
+
     def ns_from_file(self, filename):
         bn = os.path.basename(filename)
         bn, _ext = os.path.splitext(bn)
         return bn
 
     def doc(self):
-        client = self.client
+        description = ir.Description(self.description)
         buf = ViewList()
-        name = client.wsdl.wsdl.get(
-            'name', client.wsdl.wsdl.get('targetNamespace', '(unnamed)'))
+        name = description.name
+        if name is None:
+            name = '(unnamed)'
         title = 'Web Service: %s' % name
         buf.append(title, '<autowsdl>')
         buf.append('=' * len(title), '<autowsdl>')
@@ -83,17 +209,14 @@ class AutoWsdl(Directive):
         buf.append("Methods are accessible under the ``service`` attribute "
                       "of a client instance.", '<autowsdl>')
         buf.append('', '<autowsdl>')
-        for entry in dir(client.service):
-            # print 'method', entry
-            if entry.startswith('_') or entry == 'method_class':
-                continue
-            item = getattr(client.service, entry)
+        for method in description.methods:
+            # print 'method', method.name
             try:
-                doc = self.doc_method(item.method)
+                doc = self.doc_method(method)
                 if doc is not None:
                     buf.extend(doc)
             except AttributeError, e:
-                print "failed method", entry, e
+                print "failed method", method.name, e
                 pass
         buf.append('', '<autowsdl>')
         buf.append('Types', '<autowsdl>')
@@ -102,10 +225,10 @@ class AutoWsdl(Directive):
         buf.append("Types are accessible under the ``type`` attribute "
                       "of a client instance.", '<autowsdl>')
         buf.append('', '<autowsdl>')
-        for entry in dir(client.type):
-            if entry.startswith('_'):
+        for entry, item in description.types:
+            if isinstance(item, ir.AnyTypeView):
+                # not a class; values are bound by their xsi:type
                 continue
-            item = getattr(client.type, entry)
             try:
                 doc = self.doc_type(item)
                 if doc is not None:
@@ -118,39 +241,39 @@ class AutoWsdl(Directive):
 
     def doc_type(self, cls):
         buf = ViewList()
-        buf.append('.. class :: %s.%s' % (self.ns, cls.__name__), '<autowsdl>')
+        buf.append('.. class :: %s.%s' % (self.ns, cls.name), '<autowsdl>')
         buf.append('', '<autowsdl>')
-        if issubclass(cls, scio.client.EnumType):
+        if cls.is_a(scio.client.EnumType):
             buf.append('   Values: ', '<autowsdl>')
             buf.append('', '<autowsdl>')
-            for val in cls._values:
+            for val in cls.get('_values'):
                 buf.append('   * %s' % val, '<autowsdl>')
                 buf.append('', '<autowsdl>')
         else:
-            if getattr(cls, '_content_type', None):
+            if cls.get('_content_type'):
                 buf.append('   .. attribute :: _content', '<autowsdl>')
                 buf.append('', '<autowsdl>')
                 buf.append(
                     '      type: :class:`%s.%s`' % (self.ns,
-                                                    cls._content_type.__name__),
+                                                    cls.get('_content_type').name),
                     '<autowsdl>')
                 buf.append('', '<autowsdl>')
-            for a in getattr(cls, '_attributes', []):
+            for a in cls.get('_attributes', []):
                 buf.append('   .. attribute :: %s' % a.name, '<autowsdl>')
                 buf.append('', '<autowsdl>')
-            for c in getattr(cls, '_children', []):
+            for c in cls.get('_children', []):
                 buf.append('   .. attribute :: %s' % c.name, '<autowsdl>')
                 buf.append('', '<autowsdl>')
-                if issubclass(c.type, (scio.client.ComplexType,
-                                       scio.client.EnumType)):
+                if c.type.is_a((scio.client.ComplexType,
+                                scio.client.EnumType)):
                     buf.append('      type: :class:`%s.%s`' % (self.ns,
-                                                               c.type.__name__),
+                                                               c.type.name),
                                   '<autowsdl>')
                 else:
-                    buf.append('      type: %s.%s' % (self.ns, c.type.__name__),
+                    buf.append('      type: %s.%s' % (self.ns, c.type.name),
                                '<autowsdl>')
 
-                descr = getattr(cls, c.name, None)
+                descr = cls.get(c.name)
                 if (descr and
                     descr.max and
                     (descr.max == 'unbounded' or descr.max > 1)):
@@ -162,7 +285,7 @@ class AutoWsdl(Directive):
                     buf.append('      ', '<autowsdl>')
                     buf.append(msg, '<autowsdl>')
 
-                subs = getattr(c.type, '_substitutions', {})
+                subs = c.type.get('_substitutions', {})
                 if subs:
                     buf.append('      ', '<autowsdl>')
                     buf.append('      This attribute may contain any of the '
@@ -188,10 +311,10 @@ class AutoWsdl(Directive):
         else:
             # FIXME is this correct?
             c = meth.input
-            name = c.name or c.__name__
+            name = c.name
             req.append(name)
             details.append('   :param %s: :class:`%s.%s`' %
-                           (name, self.ns, c.__name__))
+                           (name, self.ns, c.name))
         if meth.input.headers:
             for part_name, cls in meth.input.headers:
                 param_details, param_req, param_opt = self.doc_param(part_name, cls)
@@ -202,14 +325,14 @@ class AutoWsdl(Directive):
         rtypes = []
         # print meth.name, meth.output.parts
         if meth.output.parts:
-            rtypes = [':class:`%s.%s`' % (self.ns, cls.__name__)
+            rtypes = [':class:`%s.%s`' % (self.ns, cls.name)
                       for _, cls in meth.output.parts]
         #print meth.name, meth.output.headers
         if meth.output.headers:
             rtypes.append(
                 '{%s}' % ', '. join('%s: :class:`%s.%s`' % (name,
                                                             self.ns,
-                                                            cls.__name__)
+                                                            cls.name)
                                     for name, cls in meth.output.headers))
         if len(rtypes) == 1:
             details.append('   :rtype: %s' % rtypes[0])
@@ -230,8 +353,8 @@ class AutoWsdl(Directive):
         details = []
         req = []
         opt = []
-        kids = getattr(cls, '_children', ())
-        kids = kids + getattr(cls, '_attributes', ())
+        kids = cls.get('_children', ())
+        kids = kids + cls.get('_attributes', ())
         if kids:
             for c in kids:
                 if c.min:
@@ -245,19 +368,24 @@ class AutoWsdl(Directive):
                     opt.append(c.name)
                     desc = ' (optional)'
                 details.append('   :param %s: :class:`%s.%s`%s' %
-                               (c.name, self.ns, c.type.__name__, desc))
+                               (c.name, self.ns, c.type.name, desc))
         else:
-            name = part_name or cls._tag
+            name = part_name or cls.get('_tag')
             # FIXME is this correct?
             if name:
                 # print "Arg?", name, cls
                 req.append(name)
                 details.append('   :param %s: :class:`%s.%s`' %
-                               (name, self.ns, cls.__name__))
+                               (name, self.ns, cls.name))
         return details, req, opt
 
 
 def setup(app):
+    # None: cache in the doctree directory; False: don't cache
+    app.add_config_value('autowsdl_cache_dir', None, 'env')
     app.add_directive('autowsdl', AutoWsdl)
+    # the directive keeps no state in the environment, and the cache
+    # is safe to share between processes
+    return {'parallel_read_safe': True, 'parallel_write_safe': True}
 
 
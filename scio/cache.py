@@ -0,0 +1,244 @@
+# cache.py -- on-disk cache of types and methods built from wsdl files
+#
+# Copyright (c) 2011, Leapfrog Online, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the Leapfrog Online, LLC nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+from cPickle import dumps, load, HIGHEST_PROTOCOL
+from hashlib import sha1
+import gc
+from StringIO import StringIO
+import logging
+import os
+import time
+
+from scio import client
+from scio.ir import FORMAT_VERSION, IRFactory
+from scio.util import atomic_write, trusted
+
+log = logging.getLogger(__name__)
+
+
+class WsdlCache(object):
+    """
+    On-disk cache of the types and methods built from wsdl files.
+
+    Entries are keyed by a hash of the wsdl file's content. Each entry
+    holds the IR (see :mod:`scio.ir`) of the classes and methods the
+    :class:`scio.client.Factory` built for the wsdl, along with
+    digests of all of the documents the wsdl imported. A cached entry
+    is stale, and will be rebuilt, if it was written by an
+    incompatible version of scio, or if any imported document has
+    changed. The imported documents are fetched again to check them
+    each time an entry is loaded, or, when ``max_age`` is given, at
+    most once every ``max_age`` seconds.
+
+    Entries are pickles, and loading a pickle can run arbitrary code,
+    so the cache directory must be one that only trusted users can
+    write to. Entries are written readable and writable by their owner
+    only, and on posix systems an entry owned by another user, or
+    writable by anyone but its owner, is not loaded.
+
+    :param directory: The directory in which to store cache entries.
+                      It will be created, readable and writable by its
+                      owner only, if it does not exist.
+    :param max_age: Seconds for which the documents imported by the
+                    wsdl of an entry are not checked again, once they
+                    have been. If None (the default), they are checked
+                    each time the entry is loaded.
+    """
+    def __init__(self, directory, max_age=None):
+        self.directory = directory
+        self.max_age = max_age
+
+    def factory(self, wsdl_fp, lazy=False, operations=None, resolver=None,
+                factory_class=None, compact=False):
+        """
+        Return a factory for the given wsdl file. If there is a fresh
+        entry for the wsdl in the cache, the factory will rebuild
+        types and methods from the entry. Otherwise, the factory is
+        a normal :class:`scio.client.Factory`, lazy if ``lazy`` is true.
+        Entries hold every operation, so a factory for only some
+        ``operations`` is never built from the cache. Imported documents
+        are fetched with ``resolver``, as by the factory. A factory that
+        is not built from the cache is an instance of ``factory_class``
+        (default :class:`scio.client.Factory`), and is ``compact`` if
+        that is true; a factory built from the cache has no documents
+        to release.
+        """
+        if factory_class is None:
+            factory_class = client.Factory
+        data = wsdl_fp.read()
+        if operations is not None:
+            return factory_class(StringIO(data), operations=operations,
+                                 resolver=resolver, compact=compact)
+        key = self.key(data)
+        entry = self.load(key)
+        if entry is not None:
+            age = self.age(key)
+            if not self.is_stale(entry, resolver, age):
+                log.debug("Using cached description of %s", key)
+                if self.max_age is not None and (
+                    age is None or age >= self.max_age):
+                    # imports were checked; not again for max_age
+                    self._touch(key)
+                return CachedFactory(key, entry)
+        factory = factory_class(StringIO(data), lazy=lazy,
+                                resolver=resolver, compact=compact)
+        factory._cache_key = key
+        return factory
+
+    def store(self, client_):
+        """
+        Store a description of the types and methods of a client
+        in the cache. Does nothing if the client was itself built
+        from the cache, or was built lazily and so may not have all
+        of its types.
+        """
+        factory = client_.wsdl
+        if isinstance(factory, CachedFactory) or factory.lazy:
+            return
+        try:
+            key = factory._cache_key
+        except AttributeError:
+            raise ValueError("%s was not created by this cache" % factory)
+        try:
+            entry = {'version': FORMAT_VERSION,
+                     'imports': factory._digests.copy(),
+                     'description': factory.describe()}
+        except ValueError, e:
+            log.warning("Unable to cache client for %s: %s", key, e)
+            return
+        self._write(key, entry)
+
+    def key(self, data):
+        """
+        Cache key for wsdl content.
+        """
+        return sha1(data).hexdigest()
+
+    def path(self, key):
+        """
+        Path to the cache file for a key.
+        """
+        return os.path.join(self.directory, '%s.cache' % key)
+
+    def load(self, key):
+        """
+        Load the cache entry for a key. Returns None if there is no
+        entry, or the entry can't be read.
+        """
+        try:
+            fh = open(self.path(key), 'rb')
+        except IOError:
+            return None
+        if not trusted(fh):
+            log.warning("Not loading cache entry %s: it may be written "
+                        "by other users", key)
+            fh.close()
+            return None
+        # loading creates many container objects, none of them
+        # cyclic garbage; don't let the collector run over them
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            try:
+                return load(fh)
+            except Exception, e:
+                log.warning("Unable to load cache entry %s: %s", key, e)
+                return None
+        finally:
+            if gc_enabled:
+                gc.enable()
+            fh.close()
+
+    def age(self, key):
+        """
+        Seconds since the entry for a key was written, or its imports
+        were last checked. Returns None if there is no entry.
+        """
+        try:
+            return time.time() - os.path.getmtime(self.path(key))
+        except OSError:
+            return None
+
+    def is_stale(self, entry, resolver=None, age=None):
+        """
+        Is a cache entry stale? Entries are stale if they were written
+        in an older format, or if any of the documents imported by the
+        wsdl have changed since the entry was written. If the cache has
+        a ``max_age``, and the entry's imports were last checked less
+        than that long ago (its ``age``, in seconds), they are not
+        checked. Documents are fetched with ``resolver`` if given, or
+        :func:`urlopen`.
+        """
+        if entry.get('version') != FORMAT_VERSION:
+            return True
+        if (self.max_age is not None and age is not None and
+            age < self.max_age):
+            return False
+        return imports_changed(entry['imports'], resolver)
+
+    def _touch(self, key):
+        try:
+            os.utime(self.path(key), None)
+        except OSError, e:
+            log.debug("Unable to touch cache entry %s: %s", key, e)
+
+    def _write(self, key, entry):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, 0700)
+        atomic_write(self.path(key), dumps(entry, HIGHEST_PROTOCOL))
+
+
+def imports_changed(imports, resolver=None):
+    """
+    Have any of the documents in ``imports``, a dict mapping urls to
+    the sha1 hex digests of their content, changed? Documents are
+    fetched with ``resolver`` if given, or :func:`urlopen`; a document
+    that can't be fetched counts as changed.
+    """
+    if resolver is None:
+        resolver = client.urlopen
+    for url, digest in imports.items():
+        try:
+            data = resolver(url).read()
+        except Exception, e:
+            log.debug("Unable to check import %s: %s", url, e)
+            return True
+        if sha1(data).hexdigest() != digest:
+            log.debug("Import %s has changed", url)
+            return True
+    return False
+
+
+class CachedFactory(IRFactory):
+    """
+    Factory that builds types and methods from a cache entry rather
+    than from a wsdl file. Since there is no wsdl tree, the ``wsdl``
+    attribute of a cached factory is None.
+    """
+    def __init__(self, key, entry):
+        self._setup(entry['description'])
+        self._digests = entry['imports'].copy()
+        self._cache_key = key
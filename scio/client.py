@@ -34,14 +34,21 @@
 #   class sometimes, other times not
 
 from decimal import Decimal
+from hashlib import sha1
 import itertools
 from lxml import etree
+from Queue import Queue, Empty
+from StringIO import StringIO
+import sys
+from tempfile import SpooledTemporaryFile
 from urllib2 import urlopen, Request, HTTPError
-from threading import RLock
+from threading import RLock, Thread
 from datetime import date, datetime, time
 from dateutil.parser import parse as parse_date
 import logging
 
+from scio.resolver import Resolver
+
 
 log = logging.getLogger(__name__)
 
@@ -106,11 +113,88 @@ class Client(object):
                             The ``proto`` parameter will only be used for
                             a number of basic types, including int
                             and arrays (list).
+    :param cache: A :class:`scio.cache.WsdlCache`. If supplied, the
+                  types and methods built from the wsdl are stored in
+                  the cache, and later clients for the same wsdl are
+                  rebuilt from the cache without parsing any xml.
+    :param lazy: If true, methods and classes for types are not made
+                 when the client is built. Methods are made the first
+                 time they are accessed on client.service, and types
+                 the first time they are used, either by a method or
+                 by attribute access on client.type. Only the types
+                 that are used (and the types they depend on) are ever
+                 made. Types that have not been made yet do not appear
+                 in ``dir(client.type)``. A lazily built client is not
+                 stored in a cache.
+    :param operations: A list of operation names. If supplied, the
+                       client will have methods for only those
+                       operations, and when the client is built only
+                       the types that they use are made. The client
+                       is otherwise lazy: any other type is made if
+                       it is asked for.
+    :param resolver: A callable that, given the url of a document
+                     imported by the wsdl, returns a file-like object
+                     containing the document. See :mod:`scio.resolver`.
+                     Default: a :class:`scio.resolver.Resolver` using
+                     ``transport`` if one is given, otherwise
+                     :func:`urlopen`.
+    :param factory_class: The class of factory that will build the
+                          types and methods. Default: :class:`Factory`.
+                          See :class:`scio.report.ReportingFactory`.
+    :param compact: If true, the parsed wsdl and the documents it
+                    imports are released once the client is built
+                    (see :meth:`Factory.release`), to save memory.
+                    A compact client can't also be lazy, or pruned to
+                    some ``operations``.
+    :param pool: A :class:`TypePool`. If supplied, classes for types
+                 are shared with the other clients built with the same
+                 pool: where a type is defined in the same way, and
+                 refers to types that are defined in the same way, the
+                 class made for it by the first client is used by the
+                 rest, rather than each client making its own. A client
+                 with a pool can't also use a ``cache``.
+    :param stream_requests: A number of bytes. If supplied, each request
+                            is written one element at a time (see
+                            :meth:`write_envelope`) to a temporary file
+                            that keeps at most that many bytes in
+                            memory and the rest on disk, and is sent
+                            from there, rather than being made whole
+                            in memory first.
+    :param lazy_responses: If true, the complex values in responses are
+                           read lazily: each keeps its xml, and reads
+                           each of its children from it the first time
+                           the child is used. Using repr or toxml on a
+                           value, or pickling it, reads all of it.
     """
+    stream_requests = None
+    lazy_responses = False
+
     def __init__(self, wsdl_fp, transport=None,
                  service_class=None, type_class=None,
-                 reduce_callback=None):
-        self.wsdl = Factory(wsdl_fp)
+                 reduce_callback=None, cache=None, lazy=False,
+                 operations=None, resolver=None, factory_class=None,
+                 compact=False, pool=None, stream_requests=None,
+                 lazy_responses=False):
+        if resolver is None and transport is not None:
+            # fetch imports the same way requests are sent
+            resolver = Resolver(transport)
+        if factory_class is None:
+            factory_class = Factory
+        if cache is None:
+            self.wsdl = factory_class(wsdl_fp, lazy=lazy,
+                                      operations=operations,
+                                      resolver=resolver, compact=compact,
+                                      pool=pool)
+        elif pool is not None:
+            raise ValueError(
+                "A client can't both share classes through a pool and "
+                "be stored in a cache")
+        else:
+            self.wsdl = cache.factory(wsdl_fp, lazy=lazy,
+                                      operations=operations,
+                                      resolver=resolver,
+                                      factory_class=factory_class,
+                                      compact=compact)
         if transport is None:
             transport = urlopen
         if service_class is None:
@@ -121,7 +205,33 @@ class Client(object):
         self.service = service_class(self)
         self.type = type_class(self)
         self.reduce_callback = reduce_callback
+        self.stream_requests = stream_requests
+        self.lazy_responses = lazy_responses
         self.wsdl.build(self)
+        if cache is not None:
+            cache.store(self)
+
+    def copy(self, transport=None):
+        """
+        Make a new client that shares this client's types and methods
+        without building them again, but sends requests with its own
+        ``transport`` (by default, this client's transport). Methods
+        that a lazy client has not made yet are made once, and then
+        shared by every copy. Types keep a reference to the client
+        that built them, so copies also share its ``reduce_callback``.
+        """
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        if transport is not None:
+            new.transport = transport
+        service = self.service
+        new.service = service.__class__(new)
+        new.service._pending = service._pending.copy()
+        calls = set([id(call) for call in service._methods])
+        for name, call in service.__dict__.items():
+            if id(call) in calls:
+                setattr(new.service, name, call.method)
+        return new
 
     def envelope(self, request):
         """
@@ -142,6 +252,29 @@ class Client(object):
                 body.append(element)
         return env
 
+    def write_envelope(self, request, fh):
+        """
+        Given an InputMessage, write it wrapped in a SOAP envelope to
+        the file-like object ``fh``. Unlike :meth:`envelope`, which makes
+        the whole envelope before it can be written, the envelope is
+        written one element at a time with a :class:`StreamWriter`, so
+        only the element being written need be held in memory.
+        """
+        with etree.xmlfile(fh) as xf:
+            writer = StreamWriter(xf)
+            writer.start(etree.Element('{%s}Envelope' % NS_SOAP_ENV,
+                                       nsmap=SOAPNS), True)
+            if request.headers:
+                writer.start(etree.Element(SOAP_HEADER, nsmap=SOAPNS), True)
+                for element in request.headerxml():
+                    if element is not None:
+                        writer.write_element(element)
+                writer.end()
+            writer.start(etree.Element(SOAP_BODY, nsmap=SOAPNS), True)
+            request.write(writer)
+            writer.end()
+            writer.end()
+
     def send(self, method, request):
         """
         Send the SOAP request for the given method. Don't call this directly
@@ -158,6 +291,8 @@ class Client(object):
         """
         log.debug('Response xml: %s', response)
         body, header = self.parse_response(method, response)
+        if self.lazy_responses:
+            return method.output(body, header, lazy=True)
         return method.output(body, header)
 
     def parse_response(self, method, response):
@@ -173,6 +308,74 @@ class Client(object):
         header = parsed.find(SOAP_HEADER)
         return body, header
 
+    def send_stream(self, method, request):
+        """
+        Send the SOAP request for the given method, and return an
+        iterator over the items of the child that repeats in the
+        response (see :meth:`iter_response`). Don't call this directly
+        (use the ``stream`` method of the methods attached to a
+        client's `service` attribute instead), but do override it in a
+        subclass to mock a service or change how a request is sent.
+        """
+        return self.iter_response(method, self.transport(request))
+
+    def iter_response(self, method, response):
+        """
+        Parse the response xml from the file-like object ``response``
+        as it is read, and yield the items of the child that repeats in
+        the method's output, each made as soon as its element has been
+        read. The element of each item is then cleared, along with
+        those of any other children that have been read, so that only
+        about one item's worth of xml is held in memory at once. The
+        repeating child is found from the types of the output's parts:
+        the first child that may occur more than once, or the items of
+        the first array, at the least depth. Raises a :class:`Fault` if
+        the response body holds one. Other parts of the response and
+        its header are not read. Multiref-encoded responses can't be
+        read this way.
+        """
+        events = etree.iterparse(response, events=('start', 'end'))
+        body = None
+        names = make = None
+        # whether the element at each depth below the body is on the
+        # way to the items
+        matched = [True]
+        for event, element in events:
+            if body is None:
+                if event == 'start' and element.tag == SOAP_BODY:
+                    body = element
+                continue
+            if event == 'start':
+                depth = len(matched)
+                if depth == 1:
+                    if element.tag == SOAP_FAULT:
+                        names = ()
+                    else:
+                        names, make = method.output.items(local(element.tag))
+                        names = [None] + names
+                on_way = matched[-1] and depth <= len(names)
+                if on_way:
+                    allowed = names[depth - 1]
+                    on_way = allowed is None or local(element.tag) in allowed
+                matched.append(on_way)
+                continue
+            if element is body:
+                break
+            depth = len(matched) - 1
+            on_way = matched.pop()
+            if depth == 1 and element.tag == SOAP_FAULT:
+                self.raise_if_fault(method, body)
+            if depth > len(names):
+                # inside an item, or inside something else entirely
+                continue
+            if on_way and depth == len(names):
+                yield make(element)
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+        if body is None:
+            raise NotSOAP("No SOAP body found in response", response)
+
     def handle_error(self, method, err):
         """
         Handle an exception raised by a method call that may be a
@@ -268,6 +471,16 @@ class TypeContainer(object):
     def __init__(self, client):
         self._client = client
 
+    def __getattr__(self, attr):
+        # only called for types not made yet, by lazy factories
+        if attr.startswith('_') or '_client' not in self.__dict__:
+            raise AttributeError(attr)
+        self._client.wsdl.materialize(attr)
+        try:
+            return self.__dict__[attr]
+        except KeyError:
+            raise AttributeError(attr)
+
 
 class MethodCall(object):
     """
@@ -289,12 +502,48 @@ class MethodCall(object):
             else:
                 return self.client.handle_error(self.method, e)
 
+    def stream(self, *arg, **kw):
+        """
+        Call the method, and return an iterator over the items of the
+        child that repeats in its response, which are made one at a
+        time as the response is read (see
+        :meth:`Client.iter_response`), rather than all at once after
+        the whole response has been read.
+        """
+        request = self.format_request(*arg, **kw)
+        try:
+            return self.client.send_stream(self.method, request)
+        except HTTPError, e:
+            if e.code in (202, 204):
+                return iter(())
+            else:
+                return self.client.handle_error(self.method, e)
+
     def format_request(self, *arg, **kw):
-        request = self.client.envelope(self.method.input(*arg, **kw))
+        message = self.method.input(*arg, **kw)
+        if self.client.stream_requests:
+            return self.stream_request(message)
+        request = self.client.envelope(message)
         req_xml = etree.tostring(request)
         log.debug("Request: %s", req_xml)
         return Request(self.method.location, req_xml, self.headers())
 
+    def stream_request(self, message):
+        """
+        Make a request whose body is a temporary file that the message,
+        in its envelope, is written to one element at a time. At most
+        ``client.stream_requests`` bytes of it are kept in memory. The
+        body is a :class:`RequestBody`, which can be read through only
+        once.
+        """
+        body = SpooledTemporaryFile(self.client.stream_requests)
+        self.client.write_envelope(message, body)
+        headers = self.headers()
+        headers['Content-Length'] = str(body.tell())
+        body.seek(0)
+        log.debug("Request: %s bytes", headers['Content-Length'])
+        return Request(self.method.location, RequestBody(body), headers)
+
     def send_request(self, request):
         return self.client.send(self.method, request)
 
@@ -303,6 +552,39 @@ class MethodCall(object):
                 'SOAPAction': self.method.action}
 
 
+class RequestBody(object):
+    """
+    The body of a streamed request (see :meth:`MethodCall.stream_request`),
+    read from a file. Once it has been read to the end, reading it again
+    raises IOError, rather than sending an empty or truncated envelope,
+    unless it has first been rewound with ``seek(0)``. A transport that
+    retries a request or follows a redirect with the same body must
+    rewind it.
+    """
+    def __init__(self, fh):
+        self.fh = fh
+        self._sent = False
+
+    def read(self, size=-1):
+        if self._sent:
+            raise IOError("Request body has already been sent; seek(0) "
+                          "to send it again")
+        data = self.fh.read(size)
+        if size < 0 or (size and not data):
+            self._sent = True
+        return data
+
+    def seek(self, offset, whence=0):
+        self.fh.seek(offset, whence)
+        self._sent = False
+
+    def tell(self):
+        return self.fh.tell()
+
+    def close(self):
+        self.fh.close()
+
+
 class Method(object):
     """
     Definition of a single SOAP method, including the location, action, name
@@ -326,6 +608,7 @@ class ServiceContainer(object):
     method_class = MethodCall
     def __init__(self, client):
         self._methods = []
+        self._pending = {}
         self._client = client
 
     def __setattr__(self, attr, val):
@@ -336,6 +619,23 @@ class ServiceContainer(object):
             self._methods.append(meth)
             self.__dict__[attr] = meth
 
+    def __getattr__(self, attr):
+        # only called for methods not made yet, by lazy factories
+        pending = self.__dict__.get('_pending')
+        if not pending or attr not in pending:
+            raise AttributeError(attr)
+        self._client.wsdl.make_method(self, attr)
+        try:
+            return self.__dict__[attr]
+        except KeyError:
+            raise AttributeError(attr)
+
+    def __dir__(self):
+        names = set(dir(self.__class__))
+        names.update(self.__dict__)
+        names.update(self.__dict__.get('_pending', ()))
+        return sorted(names)
+
 #
 # Pickling support
 #
@@ -417,6 +717,9 @@ class Element(object):
         return e
 
 
+_element_toxml = Element.toxml.im_func
+
+
 class SimpleTypeMeta(type):
     """
     Metaclass that registers each simple type in the Element typemap.
@@ -707,8 +1010,36 @@ class ArrayType(list, Pickleable):
     _tag = _namespace = _nsmap = _prefix = None
 
     def __init__(self, iterable=()):
+        cls = self._arrayType
+        # how to make simple items from text, worked out the first
+        # time the class is used
+        base = self.__class__.__dict__.get('_item_base_', notset)
+        if base is notset:
+            base = simple_base(cls)
+            self.__class__._item_base_ = base
+        append = self.append
+        if base is None:
+            for item in iterable:
+                append(cls(item))
+            return
         for item in iterable:
-            self.append(self._arrayType(item))
+            if isinstance(item, etree._Element):
+                item = item.text
+                if item is None:
+                    append(cls())
+                    continue
+            append(base.__new__(cls, item))
+
+    @classmethod
+    def _lazy(cls, element):
+        # an array whose items are read lazily, if they can be
+        make = _lazy_maker(cls._arrayType)
+        if make is None:
+            return cls(element)
+        value = cls()
+        for item in element:
+            value.append(make(item))
+        return value
 
     def __reduce__(self):
         if self._client and self._client.reduce_callback:
@@ -757,29 +1088,7 @@ class ComplexType(Element, Pickleable):
             content = None
             if isinstance(element, etree._Element):
                 element = self._resolve_multiref(element)
-                attrs = set(attr.name for attr in self._attributes)
-                kids = set(child.name for child in self._children)
-                kids_subs = self._child_substitutions()
-                content = element.text
-                for attr, aval in element.attrib.items():
-                    if attr != local(attr):
-                        continue
-                    if self.any_attribute and attr not in attrs:
-                        self._attributes.append(AnyAttribute(attr))
-                    setattr(self, attr, aval)
-                for el in element:
-                    if el.text is not None or el.attrib or len(el):
-                        name = local(el.tag)
-                        if name in kids:
-                            setattr(self, name, el)
-                        else:
-                            # substitutionGroups
-                            real_cls, real_name = kids_subs.get(name, (None,None))
-                            if real_cls:
-                                setattr(self, real_name, real_cls(el))
-                                # FIXME Or for unnamed subelements:
-                                # setattr(self, name, real_cls(el))
-                        # TODO handle any tag, ref any_attribute above
+                content = self._unmarshal(element)
             elif isinstance(element, dict):
                 for k, v in element.items():
                     setattr(self, k, v)
@@ -802,6 +1111,174 @@ class ComplexType(Element, Pickleable):
                     pass
             setattr(self, k, v)
 
+    def _unmarshal(self, element):
+        # set attributes and children from an element, and return its
+        # content
+        plan = self.__class__.__dict__.get('_unmarshal_plan_')
+        if plan is None:
+            plan = self._unmarshal_plan()
+        self._unmarshal_attributes(element, plan)
+        self._unmarshal_children(element, plan)
+        return element.text
+
+    def _unmarshal_attributes(self, element, plan):
+        for attr, aval in element.attrib.items():
+            if '}' in attr:
+                continue
+            descr = plan.attributes.get(attr)
+            if descr is not None:
+                descr.__set__(self, aval)
+                continue
+            if self.any_attribute and attr not in plan.attribute_names:
+                self._attributes.append(AnyAttribute(attr))
+                plan.attribute_names.add(attr)
+            setattr(self, attr, aval)
+
+    def _unmarshal_children(self, elements, plan, lazy=False):
+        # set children from their elements; if lazy, complex children
+        # and arrays are themselves read lazily
+        tags = plan.tags
+        d = self.__dict__
+        for el in elements:
+            if el.text is not None or el.attrib or len(el):
+                step = tags.get(el.tag)
+                if step is None:
+                    step = plan.find(el.tag)
+                    if step is None:
+                        # TODO handle any tag, ref any_attribute above
+                        continue
+                how, name, target, base, multi = step
+                if how is _SIMPLE:
+                    # what target.__set__(self, el) would do
+                    text = el.text
+                    if text is None:
+                        value = target.type()
+                    else:
+                        value = base.__new__(target.type, text)
+                    value._tag = name
+                    value._namespace = target.namespace
+                    value._position = self._child_count
+                    self._child_count += 1
+                    key = target.key
+                    cur = d.get(key)
+                    if cur is None or not multi:
+                        d[key] = value
+                    elif isinstance(cur, list):
+                        cur.append(value)
+                    else:
+                        d[key] = [cur, value]
+                elif how is _DESCRIPTOR:
+                    make = lazy and _lazy_maker(target.type)
+                    if not make or (type(target).__set__ !=
+                                    AttributeDescriptor.__set__):
+                        target.__set__(self, el)
+                    elif issubclass(target.type, ArrayType) and not multi:
+                        # an array can't be given to __set__, which
+                        # would take it for a list of values
+                        value = make(el)
+                        target._set_xml_context(value)
+                        value._position = self._child_count
+                        self._child_count += 1
+                        d[target.key] = value
+                    else:
+                        target.__set__(self, make(el))
+                elif how is _SUBSTITUTE:
+                    make = lazy and _lazy_maker(target)
+                    if make:
+                        setattr(self, name, make(el))
+                    else:
+                        setattr(self, name, target(el))
+                else:
+                    setattr(self, name, el)
+
+    @classmethod
+    def _lazy(cls, element):
+        """
+        Make an instance from an element, as cls(element) does, but
+        read its children only when they are first used (see
+        :meth:`_read_pending`).
+        """
+        obj = cls.__new__(cls, element)
+        cls = obj.__class__
+        if (cls._unmarshal.im_func is not _complex_unmarshal or
+            cls.__init__.im_func is not _complex_init):
+            # a subclass's own code, which reads all at once
+            obj.__init__(element)
+            return obj
+        obj.qns = '{%s}' % obj._namespace
+        element = obj._resolve_multiref(element)
+        plan = cls.__dict__.get('_unmarshal_plan_')
+        if plan is None:
+            plan = obj._unmarshal_plan()
+        obj._unmarshal_attributes(element, plan)
+        # the elements of each child, each with its place, read the
+        # first time the child is used; children that aren't read
+        # through descriptors are read now
+        pending = {}
+        now = []
+        tags = plan.tags
+        for index, el in enumerate(element):
+            if el.text is not None or el.attrib or len(el):
+                step = tags.get(el.tag)
+                if step is None:
+                    step = plan.find(el.tag)
+                    if step is None:
+                        continue
+                name = step[1]
+                if step[0] is _SETATTR and not isinstance(
+                    getattr(cls, name, None), AttributeDescriptor):
+                    now.append(el)
+                elif name in pending:
+                    pending[name].append((index, el))
+                else:
+                    pending[name] = [(index, el)]
+        if now:
+            obj._unmarshal_children(now, plan, True)
+        if pending:
+            obj.__dict__['_pending_'] = pending
+        content = element.text
+        if content is not None:
+            if obj._content_type:
+                obj._content = obj._content_type(content)
+            else:
+                obj._content = content
+        return obj
+
+    def _read_pending(self, name=None):
+        """
+        Read the children of a lazily read instance that have not been
+        read yet: those of the child ``name``, or all of them, in the
+        order of the xml.
+        """
+        d = self.__dict__
+        pending = d.get('_pending_')
+        if not pending:
+            return
+        if name is None:
+            found = []
+            for elements in pending.values():
+                found.extend(elements)
+            found.sort()
+            pending.clear()
+        else:
+            found = pending.pop(name, ())
+        if not pending:
+            del d['_pending_']
+        plan = self.__class__.__dict__.get('_unmarshal_plan_')
+        if plan is None:
+            plan = self._unmarshal_plan()
+        self._unmarshal_children([el for index, el in found], plan, True)
+
+    @classmethod
+    def _unmarshal_plan(cls):
+        # how to read instances of the class from xml, made the first
+        # time one is read and kept on the class
+        plan = cls.__dict__.get('_unmarshal_plan_')
+        if plan is None:
+            plan = UnmarshalPlan(cls)
+            cls._unmarshal_plan_ = plan
+        return plan
+
     def _resolve_multiref(self, element):
         href = element.get('href', None)
         if href is None:
@@ -848,13 +1325,20 @@ class ComplexType(Element, Pickleable):
                 yield n
 
     def _items(self):
+        # the fields that have values, in the order of the schema; the
+        # instance's dict holds only the fields that have been set, so
+        # read it rather than the fields, which would autovivify
+        if '_pending_' in self.__dict__:
+            self._read_pending()
+        plan = self.__class__.__dict__.get('_marshal_plan_')
+        if plan is None:
+            plan = self._marshal_plan()
+        d = self.__dict__
+        fields = plan.fields
         items = []
-        for a in itertools.chain(self._attributes, self._children):
-            # access the internal key not the real attribute to
-            # avoid autovivification
-            val = getattr(self, "_%s_" % a.name, None)
-            if val is not None:
-                items.append((a.name, val))
+        for place in plan.populated(d):
+            name, key = fields[place]
+            items.append((name, d[key]))
         return items
 
     def __repr__(self):
@@ -871,10 +1355,23 @@ class ComplexType(Element, Pickleable):
             return unicode(self._content)
         return u''
 
+    def __getstate__(self):
+        if '_pending_' in self.__dict__:
+            self._read_pending()
+        return Pickleable.__getstate__(self)
+
     __str__ = __unicode__
 
     def __nonzero__(self):
-        return bool(self._content or self._items())
+        if self._content:
+            return True
+        if '_pending_' in self.__dict__:
+            # each child not read yet has a non-empty element
+            return True
+        plan = self.__class__.__dict__.get('_marshal_plan_')
+        if plan is None:
+            plan = self._marshal_plan()
+        return plan.any_populated(self.__dict__)
 
     def __iter__(self):
         if self:
@@ -882,6 +1379,37 @@ class ComplexType(Element, Pickleable):
         return iter([])
 
     def toxml(self, tag=None, empty=False):
+        if '_pending_' in self.__dict__:
+            self._read_pending()
+        e = self._xml_element(tag)
+        plan = self.__class__.__dict__.get('_marshal_plan_')
+        if plan is None:
+            plan = self._marshal_plan()
+        # only children with values are rendered, so look for them
+        # among the values the instance holds, rather than looking up
+        # every child; read them directly to avoid autovivification,
+        # since we're potentially passing empty=True to children.
+        d = self.__dict__
+        fields = plan.fields
+        for place in plan.populated(d, plan.first_child):
+            name, key = fields[place]
+            ch_val = d[key]
+            if isinstance(ch_val, (list, ItemStream)):
+                for ch in ch_val:
+                    ch_el = ch.toxml(name, empty=empty)
+                    if ch_el is not None:
+                        e.append(ch_el)
+            else:
+                ch_el = ch_val.toxml(name, empty=empty)
+                if ch_el is not None:
+                    e.append(ch_el)
+        if not empty and e.text is None and not e.attrib and not len(e):
+            return None
+        return e
+
+    def _xml_element(self, tag):
+        # the element for this value, with its attributes and content
+        # but not its children
         if tag is None:
             tag = self._tag
         if tag is None:
@@ -890,11 +1418,11 @@ class ComplexType(Element, Pickleable):
             value = unicode(self._content)
         else:
             value = None
-        if self._namespace:
-            tag = '{%s}%s' % (self._namespace, tag)
+        namespace = self._namespace
+        if namespace:
+            tag = '{%s}%s' % (namespace, tag)
         if self._schema:
-            e = etree.Element(
-                tag, nsmap=self._schema.minimal_nsmap(self._namespace))
+            e = etree.Element(tag, nsmap=self._schema.minimal_nsmap(namespace))
         else:
             e = etree.Element(tag)
         if self._type_attr and self._type_value:
@@ -903,31 +1431,46 @@ class ComplexType(Element, Pickleable):
             e.text = value
         elif isinstance(value, etree._Element):
             e.append(value)
-        for attr in self._attributes:
-            at_val = getattr(self, attr.name, None)
-            if at_val is not None:
-                e.attrib[attr.name] = unicode(at_val)
-        for child in self._children:
-            # use private accessors to avoid autovivification
-            # since we're potentially passing empty=True to children
-            # and we don't want to render all possible children, only
-            # those with actual values.
-            key = "_%s_" % child.name
-            ch_val = getattr(self, key, None)
-            if ch_val is not None:
-                if isinstance(ch_val, list):
-                    for ch in ch_val:
-                        ch_el = ch.toxml(child.name, empty=empty)
-                        if ch_el is not None:
-                            e.append(ch_el)
+        if self._attributes:
+            plan = self.__class__.__dict__.get('_marshal_plan_')
+            if plan is None:
+                plan = self._marshal_plan()
+            keys = plan.attribute_keys
+            d = self.__dict__
+            for attr in self._attributes:
+                key = keys.get(attr.name)
+                if key is None:
+                    at_val = getattr(self, attr.name, None)
                 else:
-                    ch_el = ch_val.toxml(child.name, empty=empty)
-                    if ch_el is not None:
-                        e.append(ch_el)
-        if not empty and e.text is None and not e.attrib and not len(e):
-            return None
+                    at_val = d.get(key)
+                if at_val is not None:
+                    e.attrib[attr.name] = unicode(at_val)
         return e
 
+    @classmethod
+    def _marshal_plan(cls):
+        # how to write instances of the class as xml, made the first
+        # time one is written and kept on the class
+        plan = cls.__dict__.get('_marshal_plan_')
+        if plan is None:
+            plan = MarshalPlan(cls)
+            cls._marshal_plan_ = plan
+        return plan
+
+
+_complex_unmarshal = ComplexType._unmarshal.im_func
+_complex_init = ComplexType.__init__.im_func
+
+
+def _lazy_maker(type_):
+    # how to make a value of type_ from an element, reading its
+    # children only when they are first used, or None if values of
+    # type_ are read all at once
+    if isinstance(type_, type) and issubclass(type_, (ComplexType,
+                                                      ArrayType)):
+        return type_._lazy
+    return None
+
 
 class AttributeDescriptor(object):
     """
@@ -942,6 +1485,7 @@ class AttributeDescriptor(object):
     def __init__(self, name, type_=None, required=False, min=None, max=None,
                  doc=None, namespace=None, **kw):
         self.name = name
+        self.key = '_%s_' % name
         if type_ is None:
             type_ = StringType
         self.type = type_
@@ -959,8 +1503,12 @@ class AttributeDescriptor(object):
     def __get__(self, obj, cls):
         if obj is None:
             return self
-        key = '_%s_' % self.name
+        key = self.key
         val = getattr(obj, key, notset)
+        if val is notset and '_pending_' in obj.__dict__:
+            # a lazily read value, whose child may not be read yet
+            obj._read_pending(self.name)
+            val = getattr(obj, key, notset)
         if val is notset:
             # ComplexTypes should not return None, but fresh
             # empty versions of themselves if not set -- of course
@@ -974,7 +1522,9 @@ class AttributeDescriptor(object):
 
     def __set__(self, obj, value):
         # convert from node or other xml value into simple value
-        key = '_%s_' % self.name
+        key = self.key
+        if '_pending_' in obj.__dict__:
+            obj._read_pending(self.name)
 
         if isinstance(value, (list, tuple)):
             new = []
@@ -987,6 +1537,12 @@ class AttributeDescriptor(object):
             setattr(obj, key, new)
             return
 
+        if (not isinstance(value, (Element, etree._Element, basestring))
+            and hasattr(value, 'next') and iter(value) is value
+            and self.streams()):
+            setattr(obj, key, ItemStream(self, obj, value))
+            return
+
         if isinstance(self.type, AnyType) or not isinstance(value, self.type):
             value = self._new(value)
         else:
@@ -1010,7 +1566,9 @@ class AttributeDescriptor(object):
         setattr(obj, key, value)
 
     def __delete__(self, obj):
-        delattr(obj, '_%s_' % self.name)
+        if '_pending_' in obj.__dict__:
+            obj._read_pending(self.name)
+        delattr(obj, self.key)
 
     def _new(self, value):
         val = self.type(value)
@@ -1029,6 +1587,358 @@ class AttributeDescriptor(object):
         return (isinstance(self.type, AnyType)
                 or getattr(self.type, '_abstract', False))
 
+    def streams(self):
+        """
+        Can the values of this child be given by an iterator, and made
+        one at a time as they are written? They can if the child may
+        occur more than once, or is an array.
+        """
+        return (self.max == 'unbounded' or self.max > 1
+                or (isinstance(self.type, type)
+                    and issubclass(self.type, ArrayType)))
+
+
+class ItemStream(object):
+    """
+    The values of a child that may occur more than once, or the items
+    of an array, given by an iterator. Each value is made as it is
+    written, so that a large request need not be held in memory all at
+    once (see :meth:`Client.write_envelope`). An ItemStream can be
+    written only once; writing it again raises ValueError, rather than
+    writing none of its values.
+    """
+    def __init__(self, descriptor, obj, iterator):
+        self.descriptor = descriptor
+        self.obj = obj
+        self.iterator = iterator
+        self.type = descriptor.type
+        if not descriptor.max == 'unbounded' and not descriptor.max > 1:
+            self.type = self.type._arrayType
+        self._written = False
+
+    def __iter__(self):
+        if self._written:
+            raise ValueError("%r has already been written" % self)
+        self._written = True
+        descriptor = self.descriptor
+        obj = self.obj
+        cls = self.type
+        for item in self.iterator:
+            if isinstance(cls, AnyType) or not isinstance(item, cls):
+                item = cls(item)
+            descriptor._set_xml_context(item)
+            item._position = obj._child_count
+            obj._child_count += 1
+            yield item
+
+    def __repr__(self):
+        return '<%s of %s>' % (self.__class__.__name__, self.descriptor.name)
+
+
+class MarshalPlan(object):
+    """
+    How a ComplexType class writes its attributes and children as xml,
+    worked out once for the class. ``fields`` lists the name and storage
+    key of each attribute and then each child, in the order of the
+    schema, and ``first_child`` is the place of the first child in that
+    list. ``order`` maps each storage key to its places in the list.
+    An instance's dict holds exactly the fields that have been set, so
+    the fields an instance has values for can be found and put in order
+    without looking at the others. ``attribute_keys`` maps the names of
+    attributes whose values can be read directly to their storage keys.
+    """
+    def __init__(self, cls):
+        self.fields = []
+        for field in itertools.chain(cls._attributes, cls._children):
+            self.fields.append((field.name, '_%s_' % field.name))
+        self.first_child = len(cls._attributes)
+        self.order = {}
+        for place, (name, key) in enumerate(self.fields):
+            self.order[key] = self.order.get(key, ()) + (place,)
+        self.attribute_keys = {}
+        if cls.__getattribute__ != object.__getattribute__:
+            return
+        for attr in cls._attributes:
+            descr = getattr(cls, attr.name, None)
+            # reading an unset value of these types gives None, just
+            # as reading its storage key directly does
+            if (isinstance(descr, AttributeDescriptor) and
+                type(descr).__get__ == AttributeDescriptor.__get__ and
+                isinstance(descr.type, type) and
+                issubclass(descr.type, (SimpleType, EnumType, UnionType))):
+                self.attribute_keys[attr.name] = descr.key
+
+    def populated(self, d, start=0):
+        """
+        The places of the fields that have values in an instance's dict
+        ``d``, in order, leaving out those before ``start``.
+        """
+        order = self.order
+        found = []
+        for key in d:
+            places = order.get(key)
+            if places is not None and d[key] is not None:
+                found.extend(places)
+        found.sort()
+        if start and found and found[0] < start:
+            found = [place for place in found if place >= start]
+        return found
+
+    def any_populated(self, d):
+        """
+        Does an instance's dict ``d`` have a value for any field?
+        """
+        order = self.order
+        for key in d:
+            if key in order and d[key] is not None:
+                return True
+        return False
+
+
+class StreamWriter(object):
+    """
+    Writes values as xml to an lxml incremental writer (see
+    :class:`lxml.etree.xmlfile`), one element at a time. Complex types
+    are written child by child, and the values of an :class:`ItemStream`
+    are made as they are written, so that only the element being
+    written is held in memory. The xml is the same as ``toxml()``
+    would make: an element is opened only once something is written
+    inside it, so complex values with nothing to write are left out,
+    and, as when an element is appended to another, namespaces already
+    declared by an enclosing element are not declared again.
+    """
+    def __init__(self, xf):
+        self.xf = xf
+        # the elements started and not yet ended, each with the
+        # context that opened it and the namespaces declared inside
+        # it, and those of them not opened yet
+        self._started = []
+        self._pending = []
+        self._scope = frozenset()
+
+    def write(self, value, tag=None, empty=False):
+        """
+        Write ``value`` as the element ``tag``. ``empty`` is passed on
+        as it is by ``toxml()``.
+        """
+        if not isinstance(value, ComplexType):
+            if value.__class__.toxml.im_func is _element_toxml:
+                self._write_simple(value, tag)
+                return
+            element = value.toxml(tag, empty=empty)
+            if element is not None:
+                self.write_element(element)
+            return
+        if '_pending_' in value.__dict__:
+            value._read_pending()
+        head = value._xml_element(tag)
+        self.start(head, (empty or head.text is not None
+                          or len(head.attrib) or len(head)))
+        for child in head:
+            self.write_element(child)
+        plan = value.__class__.__dict__.get('_marshal_plan_')
+        if plan is None:
+            plan = value._marshal_plan()
+        d = value.__dict__
+        fields = plan.fields
+        for place in plan.populated(d, plan.first_child):
+            name, key = fields[place]
+            ch_val = d[key]
+            if isinstance(ch_val, (list, ItemStream)):
+                for ch in ch_val:
+                    self.write(ch, name, empty)
+            else:
+                self.write(ch_val, name, empty)
+        self.end()
+
+    def _write_simple(self, value, tag):
+        # as Element.toxml() makes it, without making it
+        if tag is None:
+            tag = value._tag
+        if tag is None:
+            raise ValueError("%s has no tag" % value)
+        try:
+            text = unicode(value)
+        except TypeError:
+            text = None
+        namespace = value._namespace
+        if namespace:
+            tag = '{%s}%s' % (namespace, tag)
+        nsmap = {}
+        if value._schema:
+            scope = self._scope
+            for prefix, uri in value._schema.minimal_nsmap(
+                namespace).items():
+                if uri not in scope:
+                    nsmap[prefix] = uri
+        if self._pending:
+            self._open()
+        xf = self.xf
+        context = xf.element(tag, nsmap=nsmap)
+        context.__enter__()
+        if text:
+            xf.write(text)
+        context.__exit__(None, None, None)
+
+    def write_element(self, element):
+        """
+        Write a whole element.
+        """
+        if not isinstance(element.tag, basestring):
+            # a comment or processing instruction
+            self._open()
+            self.xf.write(element)
+            return
+        if not len(element):
+            # most elements written whole are simple values, opened
+            # and closed at once
+            if self._pending:
+                self._open()
+            xf = self.xf
+            scope = self._scope
+            nsmap = {}
+            for prefix, uri in element.nsmap.items():
+                if uri not in scope:
+                    nsmap[prefix] = uri
+            context = xf.element(element.tag, element.attrib, nsmap=nsmap)
+            context.__enter__()
+            if element.text is not None:
+                xf.write(element.text)
+            context.__exit__(None, None, None)
+            return
+        self.start(element, True)
+        for child in element:
+            self.write_element(child)
+            if child.tail:
+                self.xf.write(child.tail)
+        self.end()
+
+    def start(self, element, open=False):
+        """
+        Start the element ``element``, writing its attributes and
+        text, but not its children. If ``open`` is false, it is
+        written only if something is written inside it before it is
+        ended.
+        """
+        entry = [element, None, None]
+        self._started.append(entry)
+        self._pending.append(entry)
+        if open:
+            self._open()
+
+    def end(self):
+        """
+        End the element last started.
+        """
+        element, context, scope = self._started.pop()
+        if context is None:
+            self._pending.pop()
+        else:
+            context.__exit__(None, None, None)
+            if self._started:
+                self._scope = self._started[-1][2]
+            else:
+                self._scope = frozenset()
+
+    def _open(self):
+        xf = self.xf
+        for entry in self._pending:
+            element = entry[0]
+            # declare only the namespaces not already declared
+            scope = self._scope
+            nsmap = {}
+            for prefix, uri in element.nsmap.items():
+                if uri not in scope:
+                    nsmap[prefix] = uri
+            if nsmap:
+                scope = scope.union(nsmap.values())
+                self._scope = scope
+            context = xf.element(element.tag, element.attrib, nsmap=nsmap)
+            context.__enter__()
+            entry[1] = context
+            entry[2] = scope
+            if element.text is not None:
+                xf.write(element.text)
+        del self._pending[:]
+
+
+# how an UnmarshalPlan reads a child element
+_SIMPLE = 'simple'
+_DESCRIPTOR = 'descriptor'
+_SUBSTITUTE = 'substitute'
+_SETATTR = 'setattr'
+
+
+class UnmarshalPlan(object):
+    """
+    How a ComplexType class reads its attributes and children from
+    xml, worked out once for the class. Each child element's tag,
+    qualified or not, maps to a step ``(how, name, target, base,
+    multi)``: ``simple`` steps make the value of a simple-typed child
+    directly from its text, with ``base``; ``descriptor`` steps pass
+    the element to the child's descriptor, ``target``; ``substitute``
+    steps set the attribute ``name`` to an instance of ``target``, a
+    member of a child's substitution group; and ``setattr`` steps set
+    the attribute ``name`` to the element. ``multi`` is true if the
+    child may occur more than once.
+    """
+    def __init__(self, cls):
+        self.attribute_names = set([attr.name for attr in cls._attributes])
+        # classes with their own __setattr__ see every assignment
+        direct = cls.__setattr__ == object.__setattr__
+        self.attributes = {}
+        if direct:
+            for name in self.attribute_names:
+                descr = getattr(cls, name, None)
+                if isinstance(descr, AttributeDescriptor):
+                    self.attributes[name] = descr
+        self.names = {}
+        namespaces = {}
+        for child in cls._children:
+            name = child.name
+            if name in self.names:
+                continue
+            descr = getattr(cls, name, None)
+            if not direct or not isinstance(descr, AttributeDescriptor):
+                step = (_SETATTR, name, None, None, False)
+            else:
+                base = None
+                if type(descr).__set__ == AttributeDescriptor.__set__:
+                    base = simple_base(descr.type)
+                multi = descr.max == 'unbounded' or descr.max > 1
+                if base is not None:
+                    step = (_SIMPLE, name, descr, base, multi)
+                else:
+                    step = (_DESCRIPTOR, name, descr, None, multi)
+            self.names[name] = step
+            namespaces[name] = (child.namespace, cls._namespace)
+        # members of the children's substitution groups; where two
+        # children have a member with the same name, the last one wins
+        subs = {}
+        for child in cls._children:
+            for sub_name, sub in (getattr(child.type, '_substitutions', None)
+                                  or {}).items():
+                subs[sub_name] = (sub, child.name)
+        for sub_name, (sub, name) in subs.items():
+            if sub_name not in self.names:
+                self.names[sub_name] = (_SUBSTITUTE, name, sub, None, False)
+                namespaces[sub_name] = (sub._namespace, cls._namespace)
+        # the tags each child is likely to have, so that most elements
+        # are found without taking their local names
+        self.tags = {}
+        for name, step in self.names.items():
+            self.tags[name] = step
+            for namespace in namespaces[name]:
+                if namespace:
+                    self.tags['{%s}%s' % (namespace, name)] = step
+
+    def find(self, tag):
+        """
+        Find the step for a child element by its local name, or None
+        if the class has no child with that name.
+        """
+        return self.names.get(local(tag))
+
 
 class InputMessage(object):
     """
@@ -1123,6 +2033,15 @@ class InputFormatter(object):
     def toxml(self):
         raise NotImplemented
 
+    def write(self, writer):
+        """
+        Write the xml of the message with a :class:`StreamWriter`. By
+        default the elements made by toxml() are written whole.
+        """
+        for element in self.toxml():
+            if element is not None:
+                writer.write_element(element)
+
     def headerxml(self):
         for name, hdr in self.headers:
             yield hdr.toxml(name)
@@ -1139,6 +2058,10 @@ class DocumentLiteralWrapperInputFormatter(InputFormatter):
         _, part = self.parts[0]
         yield part.toxml(empty=True)
 
+    def write(self, writer):
+        _, part = self.parts[0]
+        writer.write(part, empty=True)
+
 
 class DocumentLiteralInputFormatter(InputFormatter):
     """
@@ -1151,6 +2074,10 @@ class DocumentLiteralInputFormatter(InputFormatter):
         for part_tag, part in self.parts:
             yield part.toxml(empty=True)
 
+    def write(self, writer):
+        for part_tag, part in self.parts:
+            writer.write(part, empty=True)
+
 
 class RpcLiteralInputFormatter(InputFormatter):
     """
@@ -1169,6 +2096,14 @@ class RpcLiteralInputFormatter(InputFormatter):
                     e.append(part_xml)
         yield e
 
+    def write(self, writer):
+        writer.start(etree.Element('{%s}%s' % (self.namespace, self.tag)),
+                     True)
+        for part_tag, type_ in self.parts:
+            if part_tag:
+                writer.write(type_, part_tag)
+        writer.end()
+
 
 class RpcEncodedInputFormatter(InputFormatter):
     """
@@ -1208,7 +2143,7 @@ class OutputMessage(object):
         self.parts = parts
         self.headers = headers
 
-    def __call__(self, body, header=None):
+    def __call__(self, body, header=None, lazy=False):
         result = []
         local_tag = local(body.tag)
         for part_tag, part in self.parts:
@@ -1217,7 +2152,7 @@ class OutputMessage(object):
             if part_tag is None:
                 raise ValueError("No part tag for part %s" % part)
             if local_tag in (part_tag, part._tag):
-                result.append(part(body))
+                result.append(_read_part(part, body, lazy))
             else:
                 part_el = None
                 if part._tag:
@@ -1225,7 +2160,7 @@ class OutputMessage(object):
                 if part_el is None:
                     part_el = body.find(part_tag)
                 if part_el is not None:
-                    result.append(part(part_el))
+                    result.append(_read_part(part, part_el, lazy))
                 else:
                     log.debug(
                         "No element found in %s  for part %s/%s",
@@ -1235,13 +2170,71 @@ class OutputMessage(object):
             for header_tag, part in self.headers:
                 header_el = header.find('{%s}%s' % (self.namespace, header_tag))
                 if header_el is not None:
-                    headers[header_tag] = part(header_el)
+                    headers[header_tag] = _read_part(part, header_el, lazy)
             if headers:
                 result.append(headers)
         if len(result) == 1:
             return result[0]
         return tuple(result)
 
+    def items(self, tag):
+        """
+        Find the child that repeats in a response whose body holds the
+        element ``tag`` (a local name), for :meth:`Client.iter_response`.
+        Returns a list of the local names an element may have at each
+        level below that one, down to the items, with None where any
+        name will do, and a callable that makes an item from its
+        element.
+        """
+        for part_tag, part in self.parts:
+            found = _repeating_child(part)
+            if found is None:
+                continue
+            names, make = found
+            if part_tag is None:
+                part_tag = part._tag
+            if tag in (part_tag, part._tag):
+                return names, make
+            return [set([part_tag, part._tag])] + names, make
+        raise ValueError("No child repeats in the output of %s" % self.tag)
+
+
+def _read_part(part, element, lazy):
+    # the value of a part; if lazy, read lazily if it can be
+    if lazy:
+        make = _lazy_maker(part)
+        if make is not None:
+            return make(element)
+    return part(element)
+
+
+def _repeating_child(cls):
+    # the names of the elements on the way to the first child of cls
+    # that may occur more than once, or the items of the first array,
+    # looking at shallower children first, and how to make the items
+    if isinstance(cls, type) and issubclass(cls, ArrayType):
+        return [None], cls._arrayType
+    queue = [([], cls)]
+    seen = set()
+    while queue:
+        names, cls = queue.pop(0)
+        if (not isinstance(cls, type) or not issubclass(cls, ComplexType)
+            or cls in seen):
+            continue
+        seen.add(cls)
+        for child in cls._children:
+            descr = getattr(cls, child.name, None)
+            if not isinstance(descr, AttributeDescriptor):
+                continue
+            here = names + [set([child.name])]
+            if descr.max == 'unbounded' or descr.max > 1:
+                return here, descr._new
+            if isinstance(descr.type, type) and issubclass(descr.type,
+                                                           ArrayType):
+                return here + [None], descr.type._arrayType
+            queue.append((here, descr.type))
+    return None
+
 
 #
 # The wsdl type factory.
@@ -1295,19 +2288,101 @@ class Factory(object):
     _cplx_type_tag = '{%s}complexType' % NS_XSD
     _wsdl_import_tag = '{%s}import' % NS_WSDL
 
-    def __init__(self, wsdl_file):
-        self.wsdl = etree.parse(wsdl_file).getroot()
-        self.nsmap = NSStack(self.wsdl)
+    # most imported documents that will be fetched at the same time
+    fetch_threads = 8
+
+    def __init__(self, wsdl_file, lazy=False, operations=None,
+                 resolver=None, compact=False, pool=None):
+        wsdl = self._parse(wsdl_file)
+        # pruning to some operations is done by describing just those
+        # operations' methods in a lazy build
+        lazy = lazy or operations is not None
+        if compact and lazy:
+            raise ValueError(
+                "A lazy factory can't be compact, since it makes classes "
+                "from the wsdl after it is built")
+        self._init_state(wsdl, wsdl.get('name', wsdl.get('targetNamespace')),
+                         NSStack(wsdl), lazy, operations, resolver, compact,
+                         pool)
+
+    def _init_state(self, wsdl, service_name, nsmap, lazy, operations,
+                    resolver, compact, pool):
+        # the state of a factory before anything is built, for factories
+        # that read a wsdl tree (None for those that don't) and for
+        # those that read a description made before
+        self.wsdl = wsdl
+        self.service_name = service_name
+        self.resolver = resolver
+        self.pool = pool
+        # keys in the pool of the classes that can be shared, by name
+        self.pool_keys = {}
+        self._keyed = pool is not None
+        self._schema_keys = {}
+        self.nsmap = nsmap
+        self.lazy = lazy
+        self.operations = operations
+        self.compact = compact
+        self._client = None
+        self._building = False
+        self._described = False
+        self._pending = {}
+        self._methods = {}
+        self._position = None
+        self._definition_count = 0
+        self._made_at = {}
         self._imports = {}
-        self._methods = dict(message={},
-                             binding={},
-                             port_type={})
+        self._digests = {}
+        self._prefetched = {}
+        self._prefetch_errors = {}
+        self._index = DefinitionIndex()
+        if wsdl is not None:
+            self._index.add(wsdl)
         self._lock = RLock()
         self._lock.acquire()
         try:
             self._typemap = self._typemap.copy()
         finally:
             self._lock.release()
+        self._setup_description()
+
+    def _setup_description(self):
+        # The description of the types and methods, which classes and
+        # methods are made from. Classes are described by records of
+        # (name, bases, body, pool key), descriptors by lists of
+        # [name, type, required, min, max, namespace, doc] and schemas
+        # by (nsmap items, targetNamespace, qualified). Values in them
+        # are strings, numbers, booleans, None, lists of values, or
+        # (kind, payload) tuples that refer to records, descriptors,
+        # schemas, scio's own classes or the client, so that the whole
+        # description is plain data.
+        self._records = []
+        self._descriptors = []
+        self._schemas = []
+        self._schema_ids = {}
+        self._schema_specs = {}
+        # the value for each type name, as the typemap has its class
+        self._types = dict([(name, ('scio', cls.__name__))
+                            for name, cls in self._typemap.items()])
+        # the value for each name in the client's type container
+        self._names = {}
+        self._method_records = {}
+        self._deferred = {}
+        # places in the description that refer to types not described
+        # yet, as (container, key)
+        self._refs = []
+        # substitutions added to heads of groups, as (record, name, value)
+        self._substituted = []
+        # names whose class has not been put in the typemap, or in the
+        # client's type container, yet
+        self._typed = set()
+        self._named = set()
+        # classes taken from the pool, by record
+        self._pooled = {}
+        # what has been made from the description
+        self._classes = []
+        self._made_descriptors = {}
+        self._frozen = {}
+        self._later = []
 
     def build(self, client):
         """
@@ -1317,13 +2392,106 @@ class Factory(object):
         """
         self._lock.acquire()
         try:
-            self._process_wsdl_imports(client)
-            self._process_types(client, self.wsdl)
-            self._process_methods(client, self.wsdl)
+            self._client = client
+            self._describe_wsdl()
+            self._make_classes()
+            for name in sorted(self._method_records):
+                setattr(client.service, name, self._make_method(name))
+            client.service._pending.update(self._deferred)
+            if self.compact:
+                self.release()
             return client
         finally:
             self._lock.release()
 
+    def describe(self):
+        """
+        Describe the types and methods in the wsdl as plain data
+        (tuples, lists, dicts and strings) that can be pickled: the
+        intermediate representation (IR) that the factory makes classes
+        and methods from. See :mod:`scio.ir`. The wsdl is read the first
+        time a factory builds a client or describes it, and not again;
+        describing it makes no classes. A lazy factory describes only
+        the types and methods it has made so far. Raises ValueError if
+        the factory took classes from a pool, since they are not
+        described.
+        """
+        self._lock.acquire()
+        try:
+            self._describe_wsdl()
+            if self._pooled:
+                raise ValueError("Classes taken from a pool can't be "
+                                 "described")
+            builtin = Factory._typemap
+            typemap = []
+            for name, value in sorted(self._types.items()):
+                cls = builtin.get(name)
+                if cls is None or value != ('scio', cls.__name__):
+                    typemap.append((name, value))
+            return {'name': self.service_name,
+                    'pool': self._keyed,
+                    'classes': [(name, list(bases), sorted(body.items()), key)
+                                for name, bases, body, key in self._records],
+                    'descriptors': [tuple(desc) for desc in self._descriptors],
+                    'schemas': list(self._schemas),
+                    'types': [(name, value) for name, value
+                              in sorted(self._names.items())
+                              if not name.startswith('_')],
+                    'typemap': typemap,
+                    'methods': [self._method_records[name]
+                                for name in sorted(self._method_records)]}
+        finally:
+            self._lock.release()
+
+    def _read_description(self, description, operations=None):
+        # take the types and methods from a description made by
+        # describe(), rather than from the wsdl
+        methods = description['methods']
+        if operations is not None:
+            missing = set(operations) - set([m['name'] for m in methods])
+            if missing:
+                raise ValueError("No operation named %s" %
+                                 ', '.join(sorted(missing)))
+            methods = [m for m in methods if m['name'] in operations]
+        self._keyed = description['pool']
+        self._records = [(name, bases, dict(body), key)
+                         for name, bases, body, key in description['classes']]
+        self._descriptors = [list(desc) for desc in description['descriptors']]
+        self._schemas = list(description['schemas'])
+        for name, value in description['types']:
+            self._names[name] = value
+            self._named.add(name)
+        for name, value in description['typemap']:
+            self._types[name] = value
+            self._typed.add(name)
+        for method in methods:
+            self._method_records[method['name']] = method
+        self._described = True
+
+    def release(self):
+        """
+        Release the parsed wsdl and the documents it imported, once
+        the factory has built a client. The classes made refer only to
+        frozen copies of their schemas, so nothing refers to the
+        documents any more. Only a factory that is not lazy can be
+        released, since a lazy factory makes classes from the documents
+        on demand. Afterwards, the ``wsdl`` attribute is None.
+        """
+        if self.lazy:
+            raise ValueError("A lazy factory can't release its wsdl")
+        self._lock.acquire()
+        try:
+            self.wsdl = None
+            self.nsmap = NSStack()
+            self._index = DefinitionIndex()
+            self._imports = {}
+            self._prefetched = {}
+            self._refs = []
+            self._schema_keys = {}
+            self._schema_ids = {}
+        finally:
+            self._lock.release()
+
     def resolve(self, name, allow_ref=True):
         """
         Resolve a class name to a class.
@@ -1333,15 +2501,144 @@ class Factory(object):
         except KeyError:
             if allow_ref:
                 return TypeRef(name, self)
-            raise
+            if name not in self._pending:
+                raise
+        self.materialize(name)
+        return self._typemap[name]
+
+    def materialize(self, name):
+        """
+        Make the class for the type or element with the given name,
+        and any classes it depends on, if that has not been done yet.
+        Lazy factories only make classes when they are asked for; for
+        other factories this does nothing. Returns the class, or None
+        if there is no class with that name.
+        """
+        self._lock.acquire()
+        try:
+            self._on_demand(self._materialize, name)
+            return self._typemap.get(name)
+        finally:
+            self._lock.release()
 
-    def _process_wsdl_imports(self, client):
+    def make_method(self, service, name):
+        """
+        Make the method with the given name, which a lazy factory
+        deferred when building the given service container, and
+        attach it to the service container. Does nothing if the
+        method has already been made.
+        """
+        self._lock.acquire()
+        try:
+            # another thread may have made the method while
+            # this one waited for the lock
+            deferred = service._pending.get(name)
+            if deferred is None:
+                return
+            # copies of a client share the methods made for any of them
+            try:
+                method = self._methods[name]
+            except KeyError:
+                self._on_demand(self._add_method, *deferred)
+                method = self._methods[name] = self._make_method(name)
+            setattr(service, name, method)
+            del service._pending[name]
+        finally:
+            self._lock.release()
+
+    def _describe_wsdl(self):
+        # read the wsdl and the documents it imports, once
+        if self._described:
+            return
+        self._building = True
+        try:
+            self._prefetch()
+            self._process_wsdl_imports()
+            self._process_types(self.wsdl)
+            self._process_methods(self.wsdl)
+            if self.operations is not None:
+                self._prune()
+            self._resolve_refs()
+        finally:
+            self._building = False
+        self._described = True
+
+    def _prune(self):
+        # keep only the wanted operations, and describe their methods
+        missing = set(self.operations) - set(self._deferred)
+        if missing:
+            raise ValueError("No operation named %s" %
+                             ', '.join(sorted(missing)))
+        for name in self._deferred.keys():
+            if name not in self.operations:
+                del self._deferred[name]
+        for name in self.operations:
+            deferred = self._deferred.pop(name, None)
+            if deferred is not None:
+                self._add_method(*deferred)
+        self._resolve_refs()
+
+    def _on_demand(self, describe, *arg):
+        # describe types or methods outside of build(), and make their
+        # classes; type references can only be resolved once
+        # everything being described is complete
+        if self._building:
+            return describe(*arg)
+        self._building = True
+        try:
+            result = describe(*arg)
+            self._resolve_refs()
+        finally:
+            self._building = False
+        if self._client is not None:
+            self._make_classes()
+        return result
+
+    def _materialize(self, name):
+        definitions = self._pending.pop(name, None)
+        if definitions is None:
+            return
+        if name not in self._types:
+            self._made_at[name] = definitions[0][0]
+        outer = self._position
+        for position, schema, child in definitions:
+            self._position = position
+            self.nsmap.push_schema(schema)
+            try:
+                self._describe_type(child)
+            finally:
+                self.nsmap.pop_schema()
+                self._position = outer
+        # members of a substitution group can appear wherever the
+        # group's head can, so they are needed as soon as the head is
+        for member in self._index.substitutions.get(name, ()):
+            self._materialize(member)
+
+    def _defined_before(self, name):
+        # is there a pending definition of name that comes before the
+        # definition now being described (if any) in the wsdl's documents?
+        try:
+            definitions = self._pending[name]
+        except KeyError:
+            return False
+        return self._position is None or definitions[0][0] < self._position
+
+    def _made_after(self, name):
+        # was name described from a definition that comes after the
+        # one now being described? If so, an eager build would not
+        # have described it yet.
+        made_at = self._made_at.get(name)
+        if made_at is None or self._position is None:
+            return False
+        return made_at > self._position
+
+    def _process_wsdl_imports(self):
         # handle top-level imports
         imports = self.wsdl.findall(self._wsdl_import_tag)
         for child in imports:
-            self._process_wsdl_import(client, child)
+            self._process_wsdl_import(child)
 
-    def _process_wsdl_import(self, client, child):
+    def _process_wsdl_import(self, child):
         # loop protection
         # process schema for any types
         # (which may trigger schema imports too)
@@ -1354,35 +2651,136 @@ class Factory(object):
         if url in self._imports:
             log.debug('Already imported %s', url)
             return
-        wsdl = etree.parse(urlopen(url)).getroot()
+        wsdl = self._fetch(url)
         self._imports[url] = wsdl
-        self._process_types(client, wsdl)
-        self._process_methods(client, wsdl)
+        self._index.add(wsdl)
+        self._process_types(wsdl)
+        self._process_methods(wsdl)
 
-    def _process_types(self, client, wsdl):
-        self._refs = []
+    def _fetch(self, url):
+        try:
+            data, document = self._prefetched.pop(url)
+        except KeyError:
+            error = self._prefetch_errors.pop(url, None)
+            if error is not None:
+                raise error[0], error[1], error[2]
+            data, document = self._load(url)
+        # keep a digest of each imported document, so that anything
+        # caching the results of a build can tell when it is stale
+        self._digests[url] = sha1(data).hexdigest()
+        return document
+
+    def _load(self, url):
+        if self.resolver is None:
+            fh = urlopen(url)
+        else:
+            fh = self.resolver(url)
+        data = fh.read()
+        return data, self._parse(StringIO(data))
+
+    def _parse(self, fh):
+        return etree.parse(fh).getroot()
+
+    def _prefetch(self):
+        # Fetch and parse every document that processing the wsdl will
+        # import, one level of the import graph at a time, so that
+        # documents are loaded concurrently. Processing still happens
+        # in document order; it just finds the documents already loaded.
+        urls = self._import_urls(self.wsdl)
+        seen = set(urls)
+        while urls:
+            self._load_all(urls)
+            found = []
+            for url in urls:
+                try:
+                    data, document = self._prefetched[url]
+                except KeyError:
+                    continue
+                for imported in self._import_urls(document):
+                    if imported not in seen:
+                        seen.add(imported)
+                        found.append(imported)
+            urls = found
+
+    def _load_all(self, urls):
+        # lxml releases the GIL while parsing, so threads help with
+        # parsing as well as with waiting on the network
+        queue = Queue()
+        for url in urls:
+            queue.put(url)
+        def load():
+            while True:
+                try:
+                    url = queue.get_nowait()
+                except Empty:
+                    return
+                try:
+                    self._prefetched[url] = self._load(url)
+                except Exception:
+                    self._prefetch_errors[url] = sys.exc_info()
+        threads = [Thread(target=load)
+                   for i in range(min(self.fetch_threads, len(urls)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _import_urls(self, document):
+        # urls of the documents that processing a document will import,
+        # in the order in which they will be imported
+        urls = []
+        if document.tag == self._schema_tag:
+            schemas = [document]
+        else:
+            if document is self.wsdl:
+                # only the wsdl's own wsdl imports are followed
+                for child in document.findall(self._wsdl_import_tag):
+                    urls.append(child.get('location'))
+            types = document.find(self._types_tag)
+            if types is None:
+                schemas = []
+            else:
+                schemas = types.findall(self._schema_tag)
+        for schema in schemas:
+            for child in schema.findall(self._import_tag):
+                urls.append(child.get('schemaLocation'))
+        return [url for url in urls if url]
+
+    def _process_types(self, wsdl):
         types = wsdl.find(self._types_tag)
         if types is None:
             return
         for child in types.getchildren():
             if self._is_schema(child):
-                self._process_schema(client, child)
+                self._process_schema(child)
             elif self._is_type(child):
-                self._process_type(client, child)
+                self._process_type(child)
             else:
                 raise Exception("Unknown type tag %s" % child)
         self._resolve_refs()
 
-    def _process_schema(self, client, schema):
+    def _process_schema(self, schema):
         self.nsmap.push_schema(schema)
         for child in schema.getchildren():
             if self._is_type(child):
-                self._process_type(client, child)
+                self._process_type(child)
             elif self._is_import(child):
-                self._process_import(client, child)
+                self._process_import(child)
         self.nsmap.pop_schema()
 
-    def _process_type(self, client, child):
+    def _process_type(self, child):
+        if self.lazy:
+            # note where the definition is, and describe the class the
+            # first time it is asked for
+            name = child.get('name', None)
+            if name is not None:
+                self._pending.setdefault(name, []).append(
+                    (self._definition_count, self.nsmap.top().element, child))
+                self._definition_count += 1
+            return
+        self._describe_type(child)
+
+    def _describe_type(self, child):
         if self._is_element(child):
             name = child.get('name')
             typel = child.find(self._cplx_type_tag)
@@ -1392,15 +2790,15 @@ class Factory(object):
                 typel = child.get('type', None)
             if typel is None:
                 raise ValueError("Could not find type for element %s" % child)
-            self._make_class(client, typel, name=name, force_name=True,
-                             name_from=child)
+            self._describe_class(typel, name=name, force_name=True,
+                                 name_from=child)
         else:
             name = child.get('name', None)
             if name is None:
                 return
-            self._make_class(client, child, name=name, force_name=False)
+            self._describe_class(child, name=name, force_name=False)
 
-    def _process_import(self, client, child):
+    def _process_import(self, child):
         # IMPORTS CAN BE CIRCULAR! BEWARE!
         url = child.get('schemaLocation')
         if not url:
@@ -1408,35 +2806,136 @@ class Factory(object):
         if url in self._imports:
             log.debug("Already imported %s", url)
             return
-        schema = etree.parse(urlopen(url)).getroot()
+        schema = self._fetch(url)
         self._imports[url] = schema
-        self._process_schema(client, schema)
+        self._index.add(schema)
+        self._process_schema(schema)
+
+    def _ref(self, name):
+        # a reference to a type not described yet
+        return ('ref', name)
+
+    def _resolve_ref(self, name):
+        return self._type_value(name, allow_ref=False)
 
     def _resolve_refs(self):
-        for client_type, name in self._refs:
-            ref = getattr(client_type, name)
-            if isinstance(ref, TypeRef):
-                setattr(client_type, name, ref())
-        self._refs = []
+        # resolving a reference may describe more types, with
+        # references of their own
+        while self._refs:
+            refs, self._refs = self._refs, []
+            for container, key in refs:
+                value = container[key]
+                if type(value) is tuple and value[0] == 'ref':
+                    container[key] = self._resolve_ref(value[1])
+
+    def _track(self, container, key):
+        # note a reference to a type not described yet, to be resolved
+        # once it is
+        value = container[key]
+        if type(value) is tuple and value[0] == 'ref':
+            self._refs.append((container, key))
+
+    def _type_value(self, name, allow_ref=True):
+        # the value for a type name, as resolve() finds its class
+        try:
+            return self._types[name]
+        except KeyError:
+            if allow_ref:
+                return self._ref(name)
+            if name not in self._pending:
+                raise
+        self._materialize(name)
+        return self._types[name]
+
+    def _set_type(self, name, value):
+        self._types[name] = value
+        self._typed.add(name)
+        self._set_name(name, value)
+        return value
+
+    def _set_name(self, name, value):
+        self._names[name] = value
+        self._named.add(name)
+        self._track(self._names, name)
+
+    def _add_record(self, name, bases, body, pool_key=None):
+        cid = len(self._records)
+        self._records.append((name, bases, body, pool_key))
+        for i in range(len(bases)):
+            self._track(bases, i)
+        for key in ('_content_type', '_arrayType'):
+            if key in body:
+                self._track(body, key)
+        return ('class', cid)
+
+    def _descriptor(self, name, type_=None, required=False, min=None,
+                    max=None, namespace=None):
+        did = len(self._descriptors)
+        desc = [name, type_, required, min, max, namespace, None]
+        self._descriptors.append(desc)
+        self._track(desc, 1)
+        return ('desc', did)
+
+    def _schema(self, schema):
+        # classes get frozen copies of their schemas, one for each
+        # distinct schema, so that they don't refer to the documents
+        try:
+            return ('schema', self._schema_ids[schema.element])
+        except KeyError:
+            pass
+        try:
+            targetNamespace = schema.targetNamespace
+        except KeyError:
+            targetNamespace = None
+        # nsmap items are kept in order, so that the frozen copy
+        # lists them as the schema does
+        spec = (tuple(schema.nsmap.items()), targetNamespace,
+                schema.qualified)
+        sid = self._schema_specs.get(spec)
+        if sid is None:
+            sid = self._schema_specs[spec] = len(self._schemas)
+            self._schemas.append(spec)
+        self._schema_ids[schema.element] = sid
+        return ('schema', sid)
+
+    def _pool_key(self, type_, name, force_name, namespace, schema):
+        # the key under which the class made from a definition is
+        # shared, or None if it can't be shared. Members and heads of
+        # substitution groups are changed as the group is made.
+        if self.pool is None or name in self._index.substitutions:
+            return None
+        digest = self._index.digest(type_, self.__class__._typemap)
+        if digest is None:
+            return None
+        try:
+            context = self._schema_keys[schema.element]
+        except KeyError:
+            context = self._schema_keys[schema.element] = repr(
+                (schema.qualified, sorted(schema.nsmap.items())))
+        key = sha1(repr((name, force_name, namespace, context, digest)))
+        return key.hexdigest()
+
+    def _shared_class(self, key):
+        # the class another client made with the same key, if any;
+        # there is no client to share with while only describing
+        if self._client is None:
+            return None
+        return self.pool.get((key, self._client.reduce_callback))
 
-    def _process_methods(self, client, wsdl):
-        # catalog the method building blocks we'll need to
-        # look up later on (one wsdl file may reference
-        # method parts defined in another that is imported
-        # so we can't depend on them being in this wsdl)
-        for binding in wsdl.findall('.//{%s}binding' % NS_WSDL):
-            self._methods['binding'][binding.get('name')] = binding
-        for ptype in wsdl.findall('.//{%s}portType' % NS_WSDL):
-            self._methods['port_type'][ptype.get('name')] = ptype
-        for message in wsdl.findall('.//{%s}message' % NS_WSDL):
-            self._methods['message'][message.get('name')] = message
-        # then process each soap port in each service entry
+    def _process_methods(self, wsdl):
+        # the method building blocks we'll need to look up (one wsdl
+        # file may reference method parts defined in another that is
+        # imported) were cataloged in the index when each document was
+        # loaded, so just process each soap port in each service entry
         services = wsdl.findall('.//{%s}service' % NS_WSDL)
         for service in services:
             for port in service.findall('.//{%s}port' % NS_WSDL):
                 if not self._is_soap_port(port):
                     continue
-                self._process_port(client, port)
+                self._process_port(port)
+        if self.lazy:
+            # types described for the methods may refer to each other
+            self._resolve_refs()
 
     def _is_soap_port(self, port):
         soap_ns = (NS_SOAP, NS_SOAP12)
@@ -1445,14 +2944,12 @@ class Factory(object):
                 return True
         return False
 
-    def _process_port(self, client, port):
-        service = client.service
+    def _process_port(self, port):
         location = port[0].get('location')
         binding_name = local_attr(port.get('binding'))
         binding = self._binding(binding_name)
         style = self._binding_style(binding)
         ptype_name = local_attr(binding.get('type'))
-        ptype = self._port_type(ptype_name)
         for op in binding.findall('{%s}operation' % NS_WSDL):
             name = local_attr(op.attrib['name'])
             params = op.attrib.get('parameterOrder', '').split(' ')
@@ -1466,8 +2963,7 @@ class Factory(object):
                 if not style:
                     raise SyntaxError("Neither binding nor operation style found")
                 op_style = style
-            port_op = ptype.find("{%s}operation[@name='%s']" %
-                                 (NS_WSDL, name))
+            port_op = self._port_operation(ptype_name, name)
             in_msg_name = local_attr(port_op.find(
                 '{%s}input' % NS_WSDL).attrib['message'])
             out_msg_name = local_attr(port_op.find(
@@ -1476,33 +2972,71 @@ class Factory(object):
                 '{%s}part' % NS_WSDL)
             out_types = self._message(out_msg_name).findall(
                 '{%s}part' % NS_WSDL)
-            in_msg = self._make_input_msg(client, name, in_types, params,
+            deferred = (location, name, action, params, op_style, literal,
+                        in_types, in_headers, out_types, out_headers)
+            if self.lazy:
+                # describe the method (and so its message part classes)
+                # the first time it is called for
+                self._deferred[name] = deferred
+            else:
+                self._add_method(*deferred)
+
+    def _add_method(self, location, name, action, params, op_style,
+                    literal, in_types, in_headers, out_types, out_headers):
+        in_msg = self._describe_input_msg(name, in_types, params,
                                           op_style, literal, in_headers)
-            out_msg = self._make_output_msg(client, name, out_types,
+        out_msg = self._describe_output_msg(name, out_types,
                                             op_style, literal, out_headers)
-            setattr(service, name,
-                    Method(location, name, action, in_msg, out_msg))
+        self._method_records[name] = {'name': name,
+                                      'location': location,
+                                      'action': action,
+                                      'input': in_msg,
+                                      'output': out_msg}
+
+    def _make_method(self, name):
+        method = self._method_records[name]
+        inp, out = method['input'], method['output']
+        in_msg = InputMessage(inp['tag'], inp['namespace'],
+                              self._parts(inp['parts']), inp['style'],
+                              inp['literal'], self._parts(inp['headers']))
+        out_msg = OutputMessage(out['tag'], out['namespace'],
+                                self._parts(out['parts']),
+                                self._parts(out['headers']))
+        return Method(method['location'], name, method['action'],
+                      in_msg, out_msg)
+
+    def _parts(self, parts):
+        return [(name, self._value(value)) for name, value in parts]
 
     def _binding(self, binding_name):
         try:
-            return self._methods['binding'][binding_name]
+            return self._index.bindings[binding_name]
         except KeyError:
             raise SyntaxError("No binding found with name '%s'" % binding_name)
 
     def _port_type(self, ptype_name):
         try:
-            return self._methods['port_type'][ptype_name]
+            return self._index.port_types[ptype_name]
         except KeyError:
             raise SyntaxError("No portType found with name '%s'" % ptype_name)
 
+    def _port_operation(self, ptype_name, op_name):
+        try:
+            return self._index.operations[(ptype_name, op_name)]
+        except KeyError:
+            # distinguish a missing portType from a missing operation
+            self._port_type(ptype_name)
+            raise SyntaxError("No operation '%s' found in portType '%s'" %
+                              (op_name, ptype_name))
+
     def _message(self, message_name):
         try:
-            return self._methods['message'][message_name]
+            return self._index.messages[message_name]
         except KeyError:
             raise SyntaxError("No message found with name '%s'" % message_name)
 
-    def _make_input_msg(self, client, name, types, params, op_style, literal,
-                        headers):
+    def _describe_input_msg(self, name, types, params, op_style, literal,
+                            headers):
         # FIXME use params! There's useful information there...
         parts = []
         header_parts = []
@@ -1515,16 +3049,17 @@ class Factory(object):
             part_name = t.attrib['name']
             if 'element' in t.attrib:
                 parts.append(
-                    (part_name, self._make_class(client, t.attrib['element'])))
+                    (part_name, self._describe_class(t.attrib['element'])))
             elif 'type' in t.attrib:
                 parts.append(
-                    (part_name, self._make_class(client, t.attrib['type'])))
+                    (part_name, self._describe_class(t.attrib['type'])))
         for h_name, h_type in headers:
-            header_parts.append((h_name, self._make_class(client, h_type)))
-        return InputMessage(name, namespace, parts, op_style, literal,
-                            header_parts)
+            header_parts.append((h_name, self._describe_class(h_type)))
+        return {'tag': name, 'namespace': namespace, 'parts': parts,
+                'style': op_style, 'literal': literal,
+                'headers': header_parts}
 
-    def _make_output_msg(self, client, name, types, op_style, literal, headers):
+    def _describe_output_msg(self, name, types, op_style, literal, headers):
         parts = []
         header_parts = []
 
@@ -1536,37 +3071,39 @@ class Factory(object):
             part_name = t.attrib['name']
             if 'element' in t.attrib:
                 parts.append(
-                    (part_name, self._make_class(client, t.attrib['element'])))
+                    (part_name, self._describe_class(t.attrib['element'])))
             elif 'type' in t.attrib:
                 parts.append(
-                    (part_name, self._make_class(client, t.attrib['type'])))
+                    (part_name, self._describe_class(t.attrib['type'])))
         for h_name, h_type in headers:
-            header_parts.append((h_name, self._make_class(client, h_type)))
-        return OutputMessage(name, namespace, parts, header_parts)
+            header_parts.append((h_name, self._describe_class(h_type)))
+        return {'tag': name, 'namespace': namespace, 'parts': parts,
+                'headers': header_parts}
 
-    def _make_class(self, client, type_, name=None, force_name=False,
-                    name_from=None):
-        client_type = client.type
+    def _describe_class(self, type_, name=None, force_name=False,
+                        name_from=None):
         ref = None
 
         if isinstance(type_, basestring):
             # catch known types
             key = local_attr(type_)
-            if key in self._typemap:
+            if self._defined_before(key):
+                # lazy build: an eager build would have described this
+                # class from its own definition by now, so do that first
+                self._materialize(key)
+            if key in self._types and not self._made_after(key):
                 # FIXME (both branches) this fails for instances of types that
                 # have their own namespaces
                 if force_name and name != key:
                     # handle simple rename-only "subclasses" of existing types
-                    cls = self._make_subclass(client, name, name_from,
-                                              self._typemap[key])
-                    self._typemap[name] = cls
-                    setattr(client_type, name, cls)
-                    return cls
-                return self._typemap[key]
+                    value = self._describe_subclass(name, name_from,
+                                                    self._types[key])
+                    return self._set_type(name, value)
+                return self._types[key]
             if key == 'anyType':
                 # anyType must be bound to client, since
                 # it requires run-time type lookup
-                return self._anyType(client)
+                return ('anytype', None)
             # ... or find the definition in wsdl
             ref, etype = None, self._find_type(type_)
             if etype is None:
@@ -1590,67 +3127,72 @@ class Factory(object):
         schema, namespace = self._find_schema(parent)
 
         # in cache?
-        cls = self._typemap.get(name, None)
-        if cls is not None:
-            if isinstance(cls, TypeRef):
-                self._refs.append((client_type, name))
-            if not hasattr(client_type, name):
-                setattr(client_type, name, cls)
+        value = self._types.get(name, None)
+        if value is not None:
+            if name not in self._names:
+                # a lazy build describes it from its own definition
+                # as soon as the client's type container is asked for it
+                self._materialize(name)
+            if name not in self._names:
+                self._set_name(name, value)
             if ref is not None:
-                # FIXME this is similar to _make_subclass: consolidate?
                 # need to subclass, set ref's name, namespace and schema
                 # because the referring element wraps the type
                 rname = ref.get('name')
-                cls = type(rname, (cls,), {'_tag': rname,
-                                           '_namespace': namespace,
-                                           '_schema': schema})
-                self._typemap[rname] = cls
-                setattr(client_type, rname, cls)
-            return cls
+                value = self._add_record(rname, [value],
+                                         {'_tag': rname,
+                                          '_namespace': namespace,
+                                          '_schema': self._schema(schema)})
+                self._set_type(rname, value)
+            return value
+
+        # made by another client?
+        key = self._pool_key(type_, name, force_name, namespace, schema)
+        if key is not None:
+            self.pool_keys[name] = key
+            cls = self._shared_class(key)
+            if cls is not None:
+                value = self._add_record(name, [], {}, key)
+                self._pooled[value[1]] = cls
+                return self._set_type(name, value)
 
         # short circuit for enums
         if self._is_enum(type_):
-            cls = self._make_enum(type_, client, namespace, name)
-            self._typemap[name] = cls
-            setattr(client_type, name, cls)
-            return cls
+            value = self._describe_enum(type_, namespace, name, key)
         # short circuit for arrays
         elif self._is_array(type_):
-            cls = self._make_array(type_, client, namespace, name)
-            self._typemap[name] = cls
-            setattr(client_type, name, cls)
-            return cls
+            value = self._describe_array(type_, namespace, name, key)
         # short circuit for unions
         elif self._is_union(type_):
-            cls = self._make_union(type_, client, namespace, name)
-            self._typemap[name] = cls
-            setattr(client_type, name, cls)
-            return cls
+            value = self._describe_union(type_, namespace, name, key)
         # short circuit for simpleTypes
         elif self._is_simple(type_):
-            cls = self._make_simple(type_, client, namespace, name)
-            self._typemap[name] = cls
-            setattr(client_type, name, cls)
-            return cls
+            value = self._describe_simple(type_, namespace, name, key)
+        else:
+            value = self._describe_complex(type_, name, force_name,
+                                           namespace, schema, key)
+        return self._set_type(name, value)
 
+    def _describe_complex(self, type_, name, force_name, namespace, schema,
+                          pool_key):
         # In case a type is self-referential, we need something in
         # the typemap before we start processing children
-        self._typemap[name] = TypeRef(name, self)
+        self._types[name] = self._ref(name)
 
         # the body dict of the class
         data = {'_attributes': [],
                 '_children': [],
-                '_substitutions': {},
+                '_substitutions': ('dict', []),
                 '_namespace': namespace,
-                '_schema': schema,
-                '_client': client,
-                '_resolver': client,
-                'xsd_type': (namespace, name)}
+                '_schema': self._schema(schema),
+                '_client': ('client', None),
+                '_resolver': ('client', None),
+                'xsd_type': ('tuple', [namespace, name])}
         # this handles cases where the xml element name is always
         # forced to the name in the wsdl
         if force_name:
             data['_tag'] = name
-        bases = (ComplexType,)
+        bases = [('scio', 'ComplexType')]
 
         if schema.qualified:
             child_namespace = namespace
@@ -1663,48 +3205,42 @@ class Factory(object):
             # FIXME how to handle 'any attribute' ?
             # FIXME how to handle restrictions?
             if e.tag == self._attr_tag:      # attribute
-                self._add_attribute(client, data, e, child_namespace)
+                self._add_attribute(data, e, child_namespace)
             elif e.tag in (self._seq_tag,
                            self._all_tag,
                            self._choice_tag): # sequence of elements
-                self._add_children(client, data, e, child_namespace)
+                self._add_children(data, e, child_namespace)
             elif e.tag == self._cplx_tag:    # subclass
                 e = e[0]
                 if e.tag == self._ext_tag:
-                    bases = (self._make_class(client, e.attrib['base']),)
+                    bases = [self._describe_class(e.attrib['base'])]
                 for se in e:
                     if se.tag == self._attr_tag:
-                        self._add_attribute(client, data, se, child_namespace)
+                        self._add_attribute(data, se, child_namespace)
                     elif se.tag in (self._seq_tag,
                                     self._all_tag,
                                     self._choice_tag):
-                        self._add_children(client, data, se, child_namespace)
+                        self._add_children(data, se, child_namespace)
             elif e.tag == self._spl_tag:      # subclass of builtin
                 e = e[0]
                 if e.tag == self._ext_tag:
                     # type for class's _content attribute
                     # to allow it to be properly converted
-                    data['_content_type'] = self.resolve(
+                    data['_content_type'] = self._type_value(
                         local_attr(e.attrib['base']))
                 for se in e:
                     if se.tag == self._attr_tag:
-                        self._add_attribute(client, data, se, namespace)
+                        self._add_attribute(data, se, namespace)
                     elif se.tag in (self._seq_tag, self._all_tag):
-                        self._add_children(client, data, se, namespace)
+                        self._add_children(data, se, namespace)
             elif e.tag == self._any_attr_tag:
                 data['any_attribute'] = True
         # add attributes/children from parent classes to my lists
         for base in bases:
-            data['_attributes'] = list(base._attributes) + data['_attributes']
-            data['_children'] = list(base._children) + data['_children']
-
-        # track any typerefs in attributes/children
-        for attr in data['_attributes']:
-            if isinstance(attr.type, TypeRef):
-                self._refs.append((attr, 'type'))
-        for child in data['_children']:
-            if isinstance(child.type, TypeRef):
-                self._refs.append((child, 'type'))
+            data['_attributes'] = (self._inherited(base, '_attributes') +
+                                   data['_attributes'])
+            data['_children'] = (self._inherited(base, '_children') +
+                                 data['_children'])
 
         # mark abstract classes as such
         if type_.get('abstract', None) == 'true':
@@ -1716,26 +3252,17 @@ class Factory(object):
                 data['_type_attr'] = '{%s}type' % NS_XSI
                 data['_type_value'] = name
 
-        cls = type(name, bases, data)
+        value = self._add_record(name, bases, data, pool_key)
 
         # add to substitutionGroup
         substitutionGroup = (type_.get('substitutionGroup')
                              or type_.getparent().get('substitutionGroup'))
         if substitutionGroup:
-            group_cls = self._make_class(
-                client,
-                local_attr(substitutionGroup)
-                )
-            group_cls._substitutions[name] = cls
+            head = self._describe_class(local_attr(substitutionGroup))
+            self._substitute(head, name, value)
+        return value
 
-        # track typeref in _content_type
-        if isinstance(cls._content_type, TypeRef):
-            self._refs.append((cls, '_content_type'))
-        self._typemap[name] = cls
-        setattr(client_type, name, cls)
-        return cls
-
-    def _add_attribute(self, client, data, element, namespace):
+    def _add_attribute(self, data, element, namespace):
         try:
             name = element.attrib['name']
         except KeyError:
@@ -1753,18 +3280,17 @@ class Factory(object):
                 type_ref = local_attr(restr.get('base'))
 
         if type_ref:
-            attr = AttributeDescriptor(
+            attr = self._descriptor(
                 name=name,
                 namespace=namespace,
-                type_=self._make_class(client, type_ref),
+                type_=self._describe_class(type_ref),
                 required=element.get('use', None) == 'required')
         elif (len(element) and
               len(element[0]) and
               element[0][0].tag == self._list_tag):
             # not really a simple type -- a list
-            type_ = self._make_list(
-                element[0][0], client, namespace, name)
-            attr = AttributeDescriptor(
+            type_ = self._describe_list(element[0][0], namespace, name)
+            attr = self._descriptor(
                 name=name,
                 namespace=namespace,
                 type_=type_)
@@ -1774,7 +3300,7 @@ class Factory(object):
         data[name] = attr
         data['_attributes'].append(attr)
 
-    def _add_children(self, client, data, element, namespace):
+    def _add_children(self, data, element, namespace):
         for se in self._children(element):
             name = se.attrib.get('name')
             # ref for substitutionGroup
@@ -1784,7 +3310,7 @@ class Factory(object):
                     # FIXME: or leave as None,
                     # see ComplexType.__init__ real_cls
                     name = local_attr(type_)
-                type_ = self._make_class(client, type_)
+                type_ = self._describe_class(type_)
             else:
                 # element may n reference a type, or may include a complexType
                 # or other type definition inline
@@ -1792,9 +3318,9 @@ class Factory(object):
                     type_ref = se.attrib['type']
                 except KeyError:
                     type_ref = se[0]
-                type_ = self._make_class(client, type_ref)
+                type_ = self._describe_class(type_ref)
 
-            el = AttributeDescriptor(
+            el = self._descriptor(
                 name=name,
                 type_=type_,
                 min=se.get('minOccurs'),
@@ -1803,6 +3329,52 @@ class Factory(object):
             data[name] = el
             data['_children'].append(el)
 
+    def _substitute(self, head, name, value):
+        # add a member to the substitutions of its group's head, which
+        # a class may have from a class it derives from
+        record = self._owner(head, '_substitutions')
+        self._records[record][2]['_substitutions'][1].append((name, value))
+        self._substituted.append((record, name, value))
+
+    def _owner(self, value, key):
+        # the record of the described class that a class gets an
+        # attribute from, or None if it gets it from some other class
+        kind, payload = value
+        if kind != 'class' or payload in self._pooled:
+            return None
+        name, bases, body, pool_key = self._records[payload]
+        if key in body:
+            return payload
+        for base in bases:
+            record = self._owner(base, key)
+            if record is not None:
+                return record
+        return None
+
+    def _inherited(self, value, key):
+        # the attributes or children that a class has, as a new list
+        record = self._owner(value, key)
+        if record is not None:
+            return list(self._records[record][2][key])
+        kind, payload = value
+        if kind == 'class':
+            bases = self._records[payload][1]
+            if payload in self._pooled:
+                # the pooled class's own descriptors
+                items = getattr(self._pooled[payload], key, ())
+                return [('pooled', (payload, key, i))
+                        for i in range(len(items))]
+            # a class made from a record with none of its own, like a
+            # rename of a pooled class
+            for base in bases:
+                items = self._inherited(base, key)
+                if items:
+                    return items
+            return []
+        if kind == 'scio':
+            return list(getattr(self._known_class(value), key, ()))
+        return []
+
     def _is_array(self, element):
         try:
             restr = element[0][0]
@@ -1850,14 +3422,35 @@ class Factory(object):
             self._element_tag, self._cplx_type_tag, self._simple_tag)
 
     def _any_abstract(self, bases):
-        for cls in bases:
-            if getattr(cls, '_abstract', None):
-                return True
-            base_bases = getattr(cls, '__bases__', [])
-            if base_bases and self._any_abstract(base_bases):
-                return True
+        for base in bases:
+            kind, payload = base
+            if kind == 'class' and payload not in self._pooled:
+                name, base_bases, body, pool_key = self._records[payload]
+                if body.get('_abstract') or self._any_abstract(base_bases):
+                    return True
+            elif kind in ('class', 'scio'):
+                for cls in self._known_class(base).__mro__:
+                    if cls.__dict__.get('_abstract'):
+                        return True
         return False
 
+    def _is_pickleable(self, value):
+        kind, payload = value
+        if kind == 'class' and payload not in self._pooled:
+            for base in self._records[payload][1]:
+                if self._is_pickleable(base):
+                    return True
+            return False
+        return Pickleable in self._known_class(value).__mro__
+
+    def _known_class(self, value):
+        # a class that exists before any are made from the description:
+        # one of scio's own, or one taken from the pool
+        kind, payload = value
+        if kind == 'scio':
+            return globals()[payload]
+        return self._pooled[payload]
+
     def _find_schema(self, element):
         if self._is_schema(element):
             schema = Schema(element)
@@ -1867,7 +3460,7 @@ class Factory(object):
             namespace = schema.targetNamespace
         return schema, namespace
 
-    def _make_enum(self, element, client, namespace, name):
+    def _describe_enum(self, element, namespace, name, pool_key):
         vals = []
         data = {}
         for e in self._find_enumerations(element):
@@ -1879,11 +3472,12 @@ class Factory(object):
             except KeyError:
                 pass # enumeration value without a name? we can't use it
         data['_values'] = vals
-        data['_client'] = client
-        data['xsd_type'] = (namespace, name)
-        return type(element.attrib['name'], (EnumType,), data)
+        data['_client'] = ('client', None)
+        data['xsd_type'] = ('tuple', [namespace, name])
+        return self._add_record(element.attrib['name'],
+                                [('scio', 'EnumType')], data, pool_key)
 
-    def _make_array(self, element, client, namespace, name):
+    def _describe_array(self, element, namespace, name, pool_key):
         # look for restriction on array type, that is the
         # type for each item. Make a list container
         # with the appropriate item type.
@@ -1901,35 +3495,29 @@ class Factory(object):
         # the correct type at runtime), so we have to special
         # case it here
         if array_type == 'anyType':
-            array_type = AnyType
+            array_type = ('scio', 'AnyType')
         else:
-            array_type = self.resolve(array_type)
-        bases = (ArrayType,)
+            array_type = self._type_value(array_type)
         data = {'_arrayType': array_type,
-                '_client': client,
-                'xsd_type': (namespace, name)}
-        cls = type(name, bases, data)
-        if isinstance(array_type, TypeRef):
-            self._refs.append((cls, '_arrayType'))
-        return cls
+                '_client': ('client', None),
+                'xsd_type': ('tuple', [namespace, name])}
+        return self._add_record(name, [('scio', 'ArrayType')], data,
+                                pool_key)
 
-    def _make_list(self, element, client, namespace, name):
+    def _describe_list(self, element, namespace, name):
         # implemented as ArrayType subclass since arrays and lists
         # mean the same thing on the python side
         list_type = local_attr(element.get('itemType'))
         if list_type == 'anyType':
-            list_type = AnyType
+            list_type = ('scio', 'AnyType')
         else:
-            list_type = self.resolve(list_type)
+            list_type = self._type_value(list_type)
         data = {'_arrayType': list_type,
-                '_client': client,
-                'xsd_type': (namespace, name)}
-        cls = type(name, (ArrayType,), data)
-        if isinstance(list_type, TypeRef):
-            self._refs.append((cls, '_arrayType'))
-        return cls
+                '_client': ('client', None),
+                'xsd_type': ('tuple', [namespace, name])}
+        return self._add_record(name, [('scio', 'ArrayType')], data)
 
-    def _make_union(self, element, client, namespace, name):
+    def _describe_union(self, element, namespace, name, pool_key):
         # Totally fake for the moment.
         # FIXME: union the restrictions when we care about restrictions
         #base_types = element[0].attrib['memberTypes'].split(' ')
@@ -1937,40 +3525,154 @@ class Factory(object):
         #              for base_type in base_types]
         # Cases of union so far are int+enum, so string for now
         #base_cls = self.resolve('string', allow_ref=False)
-        base_cls = UnionType
-        data = {'xsd_type': (namespace, name),
+        data = {'xsd_type': ('tuple', [namespace, name]),
                 '_tag': name,
-                '_client': client,
+                '_client': ('client', None),
                 '_namespace': namespace,
-                '_nsmap': self.nsmap.top()} # FIXME prefix?
-        cls = type(name, (base_cls,), data)
-        return cls
+                '_nsmap': self._schema(self.nsmap.top())} # FIXME prefix?
+        return self._add_record(name, [('scio', 'UnionType')], data,
+                                pool_key)
 
-    def _make_simple(self, element, client, namespace, name):
+    def _describe_simple(self, element, namespace, name, pool_key):
         base_type = local_attr(self._find_restriction(element).get('base'))
-        base_cls = self.resolve(base_type, allow_ref=False)
-        data = {'xsd_type': (namespace, name),
+        base = self._type_value(base_type, allow_ref=False)
+        data = {'xsd_type': ('tuple', [namespace, name]),
                 '_tag': name,
-                '_client': client,
+                '_client': ('client', None),
                 '_namespace': namespace,
-                '_schema': self.nsmap.top()} # FIXME prefix?
-        cls = type(name, (Pickleable, base_cls,), data)
-        return cls
+                '_schema': self._schema(self.nsmap.top())} # FIXME prefix?
+        return self._add_record(name, [('scio', 'Pickleable'), base], data,
+                                pool_key)
 
-    def _make_subclass(self, client, name, element, base):
+    def _describe_subclass(self, name, element, base):
         schema, namespace = self._find_schema(element)
-        data = {'xsd_type': (namespace, name),
+        data = {'xsd_type': ('tuple', [namespace, name]),
                 '_tag': name,
-                '_client': client,
+                '_client': ('client', None),
                 '_namespace': namespace,
-                '_schema': schema}
-        if Pickleable in base.__mro__:
-            bases = (base,)
+                '_schema': self._schema(schema)}
+        if self._is_pickleable(base):
+            bases = [base]
         else:
-            bases = (Pickleable, base)
-        cls = type(name, bases, data)
+            bases = [('scio', 'Pickleable'), base]
+        return self._add_record(name, bases, data)
+
+    def _make_classes(self):
+        # make the classes described since the last time, and attach
+        # them to the client
+        start = len(self._classes)
+        self._classes.extend([None] * (len(self._records) - start))
+        for cid in range(start, len(self._records)):
+            self._make_class(cid)
+        # values that refer to classes are set once all classes exist
+        later, self._later = self._later, []
+        for cls, key, value in later:
+            setattr(cls, key, self._value(value))
+        substituted, self._substituted = self._substituted, []
+        for record, name, value in substituted:
+            self._classes[record]._substitutions[name] = self._value(value)
+        typed, self._typed = self._typed, set()
+        for name in typed:
+            self._typemap[name] = self._value(self._types[name])
+        named, self._named = self._named, set()
+        for name in named:
+            setattr(self._client.type, name, self._value(self._names[name]))
+        if self.pool is not None:
+            self._share_classes(start)
+
+    def _make_class(self, cid):
+        # make the class for a record, after the classes it derives from
+        cls = self._classes[cid]
+        if cls is not None:
+            return cls
+        if cid in self._pooled:
+            cls = self._classes[cid] = self._pooled[cid]
+            return cls
+        name, bases, body, pool_key = self._records[cid]
+        bases = [self._base(base) for base in bases]
+        data = {}
+        later = []
+        for key, value in body.items():
+            # the classes a value refers to may not have been made yet
+            if _refers(value):
+                later.append((key, value))
+            else:
+                data[key] = self._value(value)
+        cls = self._classes[cid] = type(name, tuple(bases), data)
+        for key, value in later:
+            self._later.append((cls, key, value))
         return cls
 
+    def _base(self, value):
+        if value[0] == 'class':
+            return self._make_class(value[1])
+        return self._value(value)
+
+    def _value(self, value):
+        # the python value for a value in the description
+        t = type(value)
+        if t is list:
+            return [self._value(v) for v in value]
+        elif t is not tuple:
+            return value
+        kind, payload = value
+        if kind == 'class':
+            return self._classes[payload]
+        elif kind == 'desc':
+            try:
+                return self._made_descriptors[payload]
+            except KeyError:
+                return self._make_descriptor(payload)
+        elif kind == 'tuple':
+            return tuple([self._value(v) for v in payload])
+        elif kind == 'dict':
+            return dict([(k, self._value(v)) for k, v in payload])
+        elif kind == 'scio':
+            return globals()[payload]
+        elif kind == 'schema':
+            try:
+                return self._frozen[payload]
+            except KeyError:
+                nsmap, targetNamespace, qualified = self._schemas[payload]
+                schema = self._frozen[payload] = FrozenSchema(
+                    dict(nsmap), targetNamespace, qualified)
+                return schema
+        elif kind == 'anytype':
+            return AnyType(self._client)
+        elif kind == 'client':
+            return self._client
+        elif kind == 'pooled':
+            cid, key, index = payload
+            return getattr(self._pooled[cid], key)[index]
+        elif kind == 'ref':
+            return self._value(self._type_value(payload, allow_ref=False))
+        raise ValueError("Unknown value kind %s" % kind)
+
+    def _make_descriptor(self, did):
+        (name, type_, required, min, max, namespace,
+         doc) = self._descriptors[did]
+        desc = self._made_descriptors[did] = AttributeDescriptor(
+            name, required=required, min=min, max=max, doc=doc,
+            namespace=namespace)
+        if type_ is not None:
+            desc.type = self._value(type_)
+        return desc
+
+    def _share_classes(self, start):
+        # classes in the pool outlive the client that made them, so
+        # they must not refer to it or to its documents
+        reduce_callback = self._client.reduce_callback
+        owner = PooledClient(reduce_callback)
+        for cid in range(start, len(self._records)):
+            key = self._records[cid][3]
+            if key is None or cid in self._pooled:
+                continue
+            cls = self._classes[cid]
+            cls._client = owner
+            if '_resolver' in cls.__dict__:
+                cls._resolver = None
+            self.pool.add((key, reduce_callback), cls)
+
     def _children(self, element):
         # FIXME for element.tag == _all_tag,
         # force minOccurs -> 0, maxOccurs -> 1
@@ -1987,32 +3689,20 @@ class Factory(object):
                     yield se
 
     def _find_type(self, name):
-        lname = local_attr(name)
-        sources = [self.wsdl] + self._imports.values()
-        for source in sources:
-            type_nodes = itertools.chain(
-                    source.findall(
-                        ".//%s[@name='%s']" % (self._cplx_type_tag, lname)),
-                    source.findall(
-                        ".//%s[@name='%s']" % (self._simple_tag, lname)))
-            for node in type_nodes:
-                return node # return first node found, if any
+        return self._index.find_type(local_attr(name))
 
     def _find_element_ref(self, name):
-        sources = [self.wsdl] + self._imports.values()
-        for source in sources:
-            elem_refs = source.findall(
-                ".//%s[@name='%s']" % (self._element_tag, local_attr(name)))
-            if elem_refs:
-                # elem_refs[0] contains information about
-                # the eventual wanted type -- its name and namespace
-                # will actually wrap the wanted type.
-                type_name = elem_refs[0].get('type')
-                if type_name:
-                    return elem_refs[0], self._find_type(type_name)
-                else:
-                    # self-contained type declaration
-                    return elem_refs[0], elem_refs[0][0]
+        elem_ref = self._index.find_element(local_attr(name))
+        if elem_ref is not None:
+            # elem_ref contains information about
+            # the eventual wanted type -- its name and namespace
+            # will actually wrap the wanted type.
+            type_name = elem_ref.get('type')
+            if type_name:
+                return elem_ref, self._find_type(type_name)
+            else:
+                # self-contained type declaration
+                return elem_ref, elem_ref[0]
         raise UnknownType("Could not find definition of class %s" % name)
 
     def _find_enumerations(self, element):
@@ -2033,9 +3723,6 @@ class Factory(object):
             return
         return self._find_restriction(next)
 
-    def _anyType(self, client):
-        return AnyType(client)
-
     def _binding_style(self, binding):
         soap_binding = binding.find('{%s}binding' % NS_SOAP)
         if soap_binding is None:
@@ -2076,9 +3763,11 @@ class Factory(object):
 
     def _find_message_part(self, message, part):
         message = local_attr(message)
-        part = self.wsdl.find(
-            ".//{%s}message[@name='%s']/{%s}part[@name='%s']" %
-            (NS_WSDL, message, NS_WSDL, part))
+        try:
+            part = self._index.parts[(message, part)]
+        except KeyError:
+            raise UnknownType("No part '%s' found in message '%s'" %
+                              (part, message))
         return (part.get('name'), part.get('element') or part.get('type'))
 
 
@@ -2091,10 +3780,53 @@ class TypeRef(object):
         return self.factory.resolve(self.name, allow_ref=False)
 
 
+def _refers(value):
+    # does a value in a factory's description refer to a class or
+    # descriptor, which may not have been made yet?
+    t = type(value)
+    if t is list:
+        for v in value:
+            if _refers(v):
+                return True
+    elif t is tuple:
+        kind, payload = value
+        if kind in ('class', 'desc', 'pooled', 'ref'):
+            return True
+        elif kind == 'tuple':
+            return _refers(payload)
+        elif kind == 'dict':
+            for k, v in payload:
+                if _refers(v):
+                    return True
+    return False
+
+
 def local(tag):
     return tag[tag.find('}')+1:]
 
 
+def simple_base(cls):
+    """
+    The python type whose constructor makes the values of a simple type
+    class from text, or None if the class makes its values some other
+    way (as dates and booleans do).
+    """
+    if not isinstance(cls, type) or not issubclass(cls, SimpleType):
+        return None
+    if (cls.adapt_args.im_func is not SimpleType.adapt_args.im_func or
+        cls.fromxml.im_func is not Element.fromxml.im_func):
+        return None
+    for klass in cls.__mro__:
+        if klass is SimpleType:
+            break
+        if '__new__' in klass.__dict__ or '__init__' in klass.__dict__:
+            return None
+    base = cls._base_type()
+    if base in (unicode, int, long, float, Decimal):
+        return base
+    return None
+
+
 def local_attr(attr):
     if ':' in attr:
         _, attr = attr.split(':')
@@ -2109,6 +3841,323 @@ def xsi_type(element):
             return local_attr(val)
 
 
+class DefinitionIndex(object):
+    """
+    Name index of the definitions in a set of wsdl and schema documents.
+
+    Each document is indexed in a single pass when it is loaded, so that
+    finding a type, element, message or binding by name is a dict lookup
+    rather than a scan of every loaded document. Schema definitions are
+    keyed by (targetNamespace, name); since references in the wsdl are
+    usually resolved by local name only, the first definition seen for
+    each local name is also kept. As with the document scans this
+    replaces, documents indexed earlier win, and within a document a
+    complexType wins over a simpleType of the same name. The members of
+    each substitution group are listed by the group's local name.
+    """
+    _schema_tag = '{%s}schema' % NS_XSD
+    _cplx_type_tag = '{%s}complexType' % NS_XSD
+    _simple_tag = '{%s}simpleType' % NS_XSD
+    _element_tag = '{%s}element' % NS_XSD
+    _binding_tag = '{%s}binding' % NS_WSDL
+    _port_type_tag = '{%s}portType' % NS_WSDL
+    _message_tag = '{%s}message' % NS_WSDL
+    _operation_tag = '{%s}operation' % NS_WSDL
+    _part_tag = '{%s}part' % NS_WSDL
+    _array_type_attr = '{%s}arrayType' % NS_WSDL
+    # attributes that refer to other definitions, or that stop a
+    # definition being shared
+    _reference_path = etree.XPath(
+        ' | '.join(['descendant-or-self::*/@%s' % attr for attr in (
+            'type', 'base', 'ref', 'itemType', 'memberTypes',
+            'wsdl:arrayType', 'abstract', 'substitutionGroup')]),
+        namespaces={'wsdl': NS_WSDL})
+    # soap encoding's array type and attribute, which factories
+    # handle themselves
+    _encoding_names = ('Array', 'arrayType')
+
+    def __init__(self):
+        self.types = {}
+        self.elements = {}
+        self.bindings = {}
+        self.port_types = {}
+        self.operations = {}
+        self.messages = {}
+        self.parts = {}
+        self.substitutions = {}
+        self._type_names = {}
+        self._element_names = {}
+        self._digests = {}
+
+    def add(self, document):
+        """
+        Index the schema and wsdl definitions in a document.
+        """
+        if document.tag == self._schema_tag:
+            schemas = [document]
+        else:
+            schemas = document.iter(self._schema_tag)
+        complex, simple, elements = [], [], []
+        by_tag = {self._cplx_type_tag: complex,
+                  self._simple_tag: simple,
+                  self._element_tag: elements}
+        for schema in schemas:
+            namespace = schema.get('targetNamespace')
+            for node in schema.iter():
+                found = by_tag.get(node.tag)
+                if found is not None:
+                    name = node.get('name')
+                    if name is not None:
+                        found.append((namespace, name, node))
+        for namespace, name, node in complex + simple:
+            self.types.setdefault((namespace, name), node)
+            self._type_names.setdefault(name, node)
+        for namespace, name, node in elements:
+            self.elements.setdefault((namespace, name), node)
+            self._element_names.setdefault(name, node)
+            group = node.get('substitutionGroup')
+            if group:
+                self.substitutions.setdefault(
+                    local_attr(group), []).append(name)
+        if document.tag != self._schema_tag:
+            self._add_wsdl(document)
+
+    def _add_wsdl(self, document):
+        for node in document.iter(self._binding_tag):
+            self.bindings.setdefault(node.get('name'), node)
+        for node in document.iter(self._port_type_tag):
+            ptype_name = node.get('name')
+            self.port_types.setdefault(ptype_name, node)
+            for op in node.iterchildren(self._operation_tag):
+                self.operations.setdefault((ptype_name, op.get('name')), op)
+        for node in document.iter(self._message_tag):
+            message_name = node.get('name')
+            self.messages.setdefault(message_name, node)
+            for part in node.iterchildren(self._part_tag):
+                self.parts.setdefault((message_name, part.get('name')), part)
+
+    def find_type(self, name, namespace=None):
+        """
+        Find the complexType or simpleType definition with the given
+        local name, in the given namespace if one is given.
+        """
+        if namespace is not None:
+            return self.types.get((namespace, name))
+        return self._type_names.get(name)
+
+    def find_element(self, name, namespace=None):
+        """
+        Find the element definition with the given local name, in the
+        given namespace if one is given.
+        """
+        if namespace is not None:
+            return self.elements.get((namespace, name))
+        return self._element_names.get(name)
+
+    def digest(self, node, builtins):
+        """
+        Digest of a type or element definition and of every definition
+        it refers to, directly or not, by type, base, ref, itemType,
+        memberTypes or arrayType. Names in ``builtins`` are not looked
+        up. Returns None if classes made from the definition should not
+        be shared between clients: if it or any definition it refers to
+        is abstract, is in a substitution group, refers to anyType, or
+        refers to a name that is not defined, or defined ambiguously.
+        """
+        try:
+            return self._digests[node]
+        except KeyError:
+            pass
+        # Tarjan's algorithm, without recursion: definitions that refer
+        # to each other are digested together, after the definitions
+        # that they refer to
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        edges = {}
+        work = [(node, 0)]
+        while work:
+            current, edge = work.pop()
+            if edge == 0:
+                index[current] = lowlink[current] = len(index)
+                stack.append(current)
+                on_stack.add(current)
+                edges[current] = self._references(current, builtins)
+            targets = edges[current] or ()
+            if edge < len(targets):
+                work.append((current, edge + 1))
+                target = targets[edge]
+                if target in self._digests:
+                    continue
+                if target not in index:
+                    work.append((target, 0))
+                elif target in on_stack:
+                    lowlink[current] = min(lowlink[current], index[target])
+                continue
+            if lowlink[current] == index[current]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member is current:
+                        break
+                self._digest_component(component, edges)
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[current])
+        return self._digests[node]
+
+    def _digest_component(self, component, edges):
+        members = set(component)
+        own = {}
+        deps = []
+        shareable = True
+        for node in component:
+            targets = edges[node]
+            if targets is None:
+                shareable = False
+                break
+            for target in targets:
+                if target in members:
+                    continue
+                digest = self._digests[target]
+                if digest is None:
+                    shareable = False
+                    break
+                deps.append(digest)
+            if not shareable:
+                break
+            # the content of the definition; references in it are by
+            # local name, which is all that is used to resolve them
+            own[node] = sha1(etree.tostring(node, method='c14n',
+                                            exclusive=True)).hexdigest()
+        if not shareable:
+            for node in component:
+                self._digests[node] = None
+            return
+        shared = sha1(''.join(sorted(own.values()) + sorted(deps)))
+        for node in component:
+            digest = shared.copy()
+            digest.update(own[node])
+            self._digests[node] = digest.hexdigest()
+
+    def _references(self, node, builtins):
+        # the definitions a definition refers to, or None if it can't
+        # be shared
+        context = [node]
+        if node.get('name') is None and node.getparent() is not None:
+            # an anonymous type is made with its element's name
+            context.append(node.getparent())
+        for definition in context:
+            if (definition.get('abstract') == 'true' or
+                definition.get('substitutionGroup') or
+                definition.get('name') in self.substitutions):
+                return None
+        targets = []
+        for value in self._reference_path(node):
+            attr = value.attrname
+            if attr == 'abstract':
+                if value == 'true':
+                    return None
+                continue
+            if attr == 'substitutionGroup':
+                return None
+            if attr == 'memberTypes':
+                names = value.split()
+            elif attr == self._array_type_attr:
+                names = [value.split('[', 1)[0]]
+            else:
+                names = [value]
+            for name in names:
+                name = local_attr(name)
+                if name in builtins or name in self._encoding_names:
+                    continue
+                if name == 'anyType':
+                    return None
+                target = self._definition(name)
+                if target is None:
+                    return None
+                targets.append(target)
+        return targets
+
+    def _definition(self, name):
+        # the definition a factory makes for a reference by local name:
+        # a type, or failing that an element
+        type_ = self._type_names.get(name)
+        element = self._element_names.get(name)
+        if type_ is None:
+            return element
+        if (element is not None and
+            local_attr(element.get('type') or '') != name):
+            # which of the two is made depends on which comes first
+            return None
+        return type_
+
+
+class TypePool(object):
+    """
+    Classes for types, shared between the clients built with the pool.
+
+    Each class is kept under a key made from the definition of its type
+    and the definitions that type refers to, directly or not, so that a
+    client finds a class in the pool only where the class it would make
+    itself would be the same. Members of a substitution group, abstract
+    types and types that refer to anyType are never shared. The class
+    made first is the one that is kept.
+
+    Classes in the pool do not refer to the client that made them, so
+    that the client can be collected while its classes are still in
+    use: the schemas they refer to are frozen (see
+    :meth:`Schema.freeze`), and in place of the client they have a
+    :class:`PooledClient`.
+    """
+    def __init__(self):
+        self._classes = {}
+        self._lock = RLock()
+
+    def __len__(self):
+        return len(self._classes)
+
+    def get(self, key):
+        """
+        The class kept under a key, or None.
+        """
+        return self._classes.get(key)
+
+    def add(self, key, cls):
+        """
+        Keep a class under a key, unless there is already a class under
+        that key. Returns the class that is kept.
+        """
+        self._lock.acquire()
+        try:
+            return self._classes.setdefault(key, cls)
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        """
+        Forget every class in the pool.
+        """
+        self._lock.acquire()
+        try:
+            self._classes.clear()
+        finally:
+            self._lock.release()
+
+
+class PooledClient(object):
+    """
+    Stands in for the client of the classes in a :class:`TypePool`,
+    which is needed only for its ``reduce_callback``, when they are
+    pickled.
+    """
+    def __init__(self, reduce_callback):
+        self.reduce_callback = reduce_callback
+
+
 class NSStack(object):
 
     def __init__(self, schema=None):
@@ -2142,6 +4191,7 @@ class NSStack(object):
 class Schema(object):
     def __init__(self, element):
         self.element = element
+        self._nsmaps = {}
 
     @property
     def nsmap(self):
@@ -2157,21 +4207,71 @@ class Schema(object):
 
     @property
     def short_nsmap(self):
+        # worked out once; the same dict is returned each time, so
+        # don't modify it
+        try:
+            return self._nsmaps[()]
+        except KeyError:
+            pass
         nsmap = {}
         globalns = set(SOAPNS.values())
-        for k, v in self.element.nsmap.items():
+        for k, v in self.nsmap.items():
             if self.qualified and v == self.targetNamespace:
                 nsmap[None] = v
             elif v in globalns:
                 continue
             else:
                 nsmap[k] = v
+        self._nsmaps[()] = nsmap
         return nsmap
 
     def minimal_nsmap(self, targetNamespace):
+        # as with short_nsmap, don't modify the dict returned
+        try:
+            return self._nsmaps[targetNamespace]
+        except KeyError:
+            pass
         if self.qualified:
-            return {None: targetNamespace}
-        return self.short_nsmap
+            nsmap = {None: targetNamespace}
+        else:
+            nsmap = self.short_nsmap
+        self._nsmaps[targetNamespace] = nsmap
+        return nsmap
+
+    def freeze(self):
+        """
+        Return a copy of the schema that holds plain values rather than
+        referring to the schema element.
+        """
+        try:
+            targetNamespace = self.targetNamespace
+        except KeyError:
+            targetNamespace = None
+        return FrozenSchema(dict(self.nsmap), targetNamespace,
+                            self.qualified)
+
+
+class FrozenSchema(Schema):
+    def __init__(self, nsmap, targetNamespace, qualified):
+        self._nsmap = nsmap
+        self._targetNamespace = targetNamespace
+        self._qualified = qualified
+        self._nsmaps = {}
+
+    @property
+    def nsmap(self):
+        return self._nsmap
+
+    @property
+    def targetNamespace(self):
+        return self._targetNamespace
+
+    @property
+    def qualified(self):
+        return self._qualified
+
+    def freeze(self):
+        return self
 
 
 def backmap(dct):
@@ -25,54 +25,345 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 from __future__ import with_statement
+from hashlib import sha1
+import heapq
+import itertools
 import logging
+from optparse import OptionParser
 import os
+import re
+from StringIO import StringIO
 import sys
+try:
+    import multiprocessing
+except ImportError:
+    # python < 2.6: generate modules one at a time
+    multiprocessing = None
 
 import jinja2
 
 import scio.client
-from scio import static
+from scio import ir, static
+from scio.util import atomic_write
 
 log = logging.getLogger(__name__)
 TEMPLATE = os.path.abspath(
     os.path.join(os.path.dirname(__file__), 'static_client.tpl'))
+STAMP = '# scio_generate_client input %s\n'
+_stamp_re = re.compile(r'^# scio_generate_client input ([0-9a-f]+)$')
+_module_name_re = re.compile(r'\W')
+_templates = {}
+_template_sources = {}
 
 def main():
     """Generate client classes
 
     Generate client classes for all WSDL files listed on the command line.
-    Note that the class name generated is always "Client", so if you
+    IR files written by scio_write_ir may be listed in place of WSDL
+    files. Note that the class name generated is always "Client", so if you
     generate more than one, you should split the output up into
     multiple modules.
 
+    Pass -o/--operation (as many times as needed) to generate only
+    those operations and the types they use.
+
+    Pass -l/--lazy to generate a module whose types are made the
+    first time they are used, rather than when it is imported.
+
+    Pass -m/--marshal to generate code specific to each array of
+    simple values for making its items.
+
+    Pass -s/--shared to generate modules that share the classes of
+    types defined in the same way with the other modules generated
+    with -s.
+
+    Pass -d/--output-dir to write one module per WSDL file into a
+    directory instead, generating them in parallel (-j/--jobs sets
+    how many at once). A module is not generated again if it was
+    generated from the same WSDL file, template and operations,
+    unless -f/--force is given.
+
     """
+    parser = OptionParser(usage="%prog [options] wsdl_file [wsdl_file ...]")
+    parser.add_option('-o', '--operation', action='append',
+                      dest='operations', metavar='NAME',
+                      help="Generate only this operation, and the types "
+                      "it uses. May be given more than once.")
+    parser.add_option('-l', '--lazy', action='store_true', default=False,
+                      help="Make each type the first time it is used, "
+                      "rather than when the module is imported.")
+    parser.add_option('-m', '--marshal', action='store_true',
+                      default=False,
+                      help="Generate code specific to each type for "
+                      "converting it from and to xml.")
+    parser.add_option('-s', '--shared', action='store_true',
+                      default=False,
+                      help="Share the classes of types defined in the "
+                      "same way with other modules generated with -s.")
+    parser.add_option('-d', '--output-dir', dest='output_dir',
+                      metavar='DIR',
+                      help="Write a module for each wsdl file into DIR, "
+                      "named after the wsdl file.")
+    parser.add_option('-j', '--jobs', type='int', default=None,
+                      metavar='N',
+                      help="With -d, generate N modules at once "
+                      "(default: the number of cpus).")
+    parser.add_option('-f', '--force', action='store_true', default=False,
+                      help="With -d, generate modules even if they are "
+                      "up to date.")
+    options, args = parser.parse_args()
+    if options.output_dir is not None:
+        logging.basicConfig(level=logging.INFO)
+        outputs = {}
+        for wsdl_file in args:
+            output = module_path(options.output_dir, wsdl_file)
+            if output in outputs:
+                parser.error("%s and %s would both be written to %s" %
+                             (outputs[output], wsdl_file, output))
+            outputs[output] = wsdl_file
+        generate_files(args, options.output_dir, jobs=options.jobs,
+                       operations=options.operations, force=options.force,
+                       lazy=options.lazy, marshal=options.marshal,
+                       shared=options.shared)
+        return
     logging.basicConfig(level=logging.DEBUG)
-    for wsdl_file in sys.argv[1:]:
-        with open(wsdl_file, 'r') as fh:
-            client = scio.client.Client(fh)
-            print gen(client)
+    for wsdl_file in args:
+        description = describe(ir.read_file(wsdl_file), options.operations,
+                               options.shared)
+        print gen(description, operations=options.operations,
+                  lazy=options.lazy, marshal=options.marshal,
+                  shared=options.shared)
+
+
+def generate_files(wsdl_files, output_dir, template=TEMPLATE, jobs=None,
+                   operations=None, force=False, lazy=False,
+                   marshal=False, shared=False):
+    """Generate a module for each of some WSDL files.
+
+    Modules are written into ``output_dir`` (see :func:`module_path`)
+    by :func:`generate_file`, using a pool of ``jobs`` processes
+    (default: one per cpu). Without multiprocessing, or with one job,
+    modules are generated one at a time.
+
+    :returns: A list of the paths of the modules that were written,
+              leaving out those that were up to date.
+
+    """
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    work = [(wsdl_file, module_path(output_dir, wsdl_file), template,
+             operations, force, lazy, marshal, shared)
+            for wsdl_file in wsdl_files]
+    if multiprocessing is None or jobs == 1 or len(work) < 2:
+        results = map(_generate_file, work)
+    else:
+        if jobs is None:
+            jobs = multiprocessing.cpu_count()
+        pool = multiprocessing.Pool(min(jobs, len(work)))
+        try:
+            results = pool.map(_generate_file, work)
+        finally:
+            pool.close()
+            pool.join()
+    written = []
+    for args, result in zip(work, results):
+        output = args[1]
+        if result:
+            log.info("Wrote %s", output)
+            written.append(output)
+        else:
+            log.info("%s is up to date", output)
+    return written
+
+
+def _generate_file(args):
+    # top-level, so that the pool can pickle it
+    return generate_file(*args)
+
+
+def generate_file(wsdl_file, output, template=TEMPLATE, operations=None,
+                  force=False, lazy=False, marshal=False, shared=False):
+    """Generate a module for a WSDL file and write it to ``output``.
+
+    The module is stamped with a hash of its inputs: the WSDL file,
+    the template, the operations and the ``lazy``, ``marshal`` and
+    ``shared`` options. If ``output`` already has the
+    same stamp, it is left alone, unless ``force`` is true. Documents
+    the WSDL file imports are not part of the hash. ``wsdl_file`` may
+    also be an IR file (see :mod:`scio.ir`).
+
+    :returns: True if the module was written.
+
+    """
+    data = ir.read_file(wsdl_file)
+    stamp = input_hash(data, template, operations, lazy, marshal, shared)
+    if not force and read_stamp(output) == stamp:
+        return False
+    description = describe(data, operations, shared)
+    code = gen(description, template, operations, lazy, marshal, shared)
+    # an interrupted build must never leave a partial module with a
+    # good stamp
+    atomic_write(output, (STAMP % stamp) + code.encode('utf-8'))
+    return True
 
 
-def gen(client, template=TEMPLATE):
+def describe(data, operations=None, shared=False):
+    """Describe the types and methods to generate code from, given the
+    content of a WSDL file or an IR file (see :mod:`scio.ir`). No
+    classes are made. The description of a WSDL file covers only the
+    ``operations`` given, if any, and the types they use; if ``shared``
+    is true, it has the keys under which types can be shared. An IR
+    file is read without parsing any xml, but can't share types, and
+    must come from a trusted source (see :func:`scio.ir.load`).
+
+    """
+    if ir.is_ir(data):
+        return ir.load(StringIO(data))
+    pool = None
+    if shared:
+        pool = scio.client.TypePool()
+    factory = scio.client.Factory(StringIO(data), operations=operations,
+                                  pool=pool)
+    return factory.describe()
+
+
+def module_path(output_dir, wsdl_file):
+    """Path of the module generated for a WSDL file: the file's name,
+    without its extension, made into a valid module name.
+
+    """
+    name = os.path.splitext(os.path.basename(wsdl_file))[0]
+    return os.path.join(output_dir, '%s.py' % _module_name_re.sub('_', name))
+
+
+def input_hash(data, template=TEMPLATE, operations=None, lazy=False,
+               marshal=False, shared=False):
+    """Hash of the inputs to generating a module: the content of the
+    WSDL file and the template, the operations, and the ``lazy``,
+    ``marshal`` and ``shared`` options.
+
+    """
+    digest = sha1(data)
+    digest.update(_template_source(template))
+    if operations is not None:
+        digest.update(repr(sorted(operations)))
+    if lazy:
+        digest.update('lazy')
+    if marshal:
+        digest.update('marshal')
+    if shared:
+        digest.update('shared')
+    return digest.hexdigest()
+
+
+def read_stamp(output):
+    """The input hash stamped on a generated module, or None if the
+    module doesn't exist or has no stamp.
+
+    """
+    try:
+        fh = open(output, 'r')
+    except IOError:
+        return None
+    try:
+        match = _stamp_re.match(fh.readline())
+    finally:
+        fh.close()
+    if match:
+        return match.group(1)
+
+
+def _template_source(path):
+    try:
+        return _template_sources[path]
+    except KeyError:
+        fh = open(path, 'r')
+        try:
+            source = _template_sources[path] = fh.read()
+        finally:
+            fh.close()
+        return source
+
+
+def _template(path):
+    # templates are compiled once per process
+    try:
+        return _templates[path]
+    except KeyError:
+        template = _templates[path] = jinja2.Template(_template_source(path))
+        return template
+
+
+def gen(description, template=TEMPLATE, operations=None, lazy=False,
+        marshal=False, shared=False):
     """Generate code for a :class:`scio.client.Client` class.
 
-    :param client: A `scio.client.Client` class generated from a
-                   WSDL file.
+    :param description: The IR of a WSDL file: a description made by
+                        :meth:`scio.client.Factory.describe` or
+                        :func:`describe`, or read by
+                        :func:`scio.ir.load`. A :class:`scio.client.Client`
+                        may be given instead, for the description its
+                        factory built it from.
     :param template: The jinja2 template to use for code generation.
+    :param operations: A list of operation names. If supplied, only
+                       those operations, and the types that they use,
+                       are included in the generated code.
+    :param lazy: If true, the generated module defines each type with
+                 a function that makes its class, which is called the
+                 first time the type is used, instead of making every
+                 class when the module is imported.
+    :param marshal: If true, each array of simple values gets code
+                    specific to it for making its items.
+    :param shared: If true, each type that a client would share
+                   through a :class:`scio.client.TypePool` is
+                   registered with a key, and the generated module uses
+                   the class kept under that key in
+                   :data:`scio.static.pool` by a module imported before
+                   it, if there is one. The description must have been
+                   made by a factory with a pool.
     :returns: Code string.
 
     """
-    template = jinja2.Template(open(template, 'r').read())
+    if isinstance(description, scio.client.Client):
+        description = description.wsdl.describe()
+    if not isinstance(description, ir.Description):
+        description = ir.Description(description)
+    if shared and not description.pool:
+        raise ValueError("Only a description made with a pool can be "
+                         "generated with shared types")
+    template_source = _template_source(template)
+    template = _template(template)
     ctx = {}
-    ctx['methods'] = [methodinfo(getattr(client.service, s).method)
-                      for s in dir(client.service)
-                      if (not s.startswith('_') and not
-                          s == 'method_class')]
+    methods = description.methods
+    client_types = description.types
+    if operations is not None:
+        missing = set(operations) - set([m.name for m in methods])
+        if missing:
+            raise ValueError("No operation named %s" %
+                             ', '.join(sorted(missing)))
+        methods = [m for m in methods if m.name in operations]
+        used = used_types(methods)
+        client_types = [(name, typecls) for name, typecls in client_types
+                        if id(typecls) in used]
+    ctx['methods'] = [methodinfo(m) for m in methods]
+    ctx['lazy'] = lazy
+    ctx['marshal'] = marshal
+    types = [typeinfo(name, typecls) for name, typecls in client_types]
+    if marshal:
+        for t, (name, typecls) in zip(types, client_types):
+            t['marshal'] = marshalinfo(typecls)
+    if shared:
+        for t, (name, typecls) in zip(types, client_types):
+            t['pool_key'] = pool_key(typecls, name, template_source,
+                                     marshal)
+    if lazy:
+        # types are made in any order, so every type they use is
+        # looked up in the registry
+        mark_lazy_refs(types)
+        ctx['types'] = types
+        return template.render(**ctx)
     # this will fail if any base classes are in circular relationships
-    types = list(sort_deps([typeinfo(entry, getattr(client.type, entry))
-                            for entry in dir(client.type)
-                            if not entry.startswith('_')]))
+    types = list(sort_deps(types))
     # now sort again to catch circular refs in attributes
     types = list(sort_deps(types,
                            key=lambda t: t['deps'] + t['refs'],
@@ -84,29 +375,38 @@ def gen(client, template=TEMPLATE):
 
 
 def typeinfo(name, typecls):
+    """Information for generating the class of a type, from its view
+    in a :class:`scio.ir.Description`.
+
+    """
     info = {}
     info['name'] = name
     info['deps'] = []  # classes this class absolutely depends on
-    info['class_name'] = static.safe_id(typecls.__name__)
+    info['class_name'] = static.safe_id(typecls.name)
     # is this class just an alias to another class?
     # eg 'char' being another name for StringType
-    info['is_alias'] = name != typecls.__name__
+    info['is_alias'] = name != typecls.name
     info['qualified_name'] = svc_qual_classname(typecls)
-    info['bases'] = [dep_class(x, info['deps']) for x in typecls.__bases__]
+    info['bases'] = [dep_class(x, info['deps']) for x in typecls.bases]
     info['refs'] = []  # other type classes I refer to
     info['unresolved'] = set()  # class references not resolved by sorting
     info['fields'] = fields = []
-    if hasattr(typecls, '_schema'):
-        info['schema'] = typecls._schema
+    schema = typecls.get('_schema')
+    if schema is not None:
+        # written in the order of the wsdl, as repr() of its nsmap would
+        nsmap = ', '.join(['%r: %r' % item for item in schema.items])
+        info['schema'] = {'nsmap': nsmap and '{%s}' % nsmap,
+                          'targetNamespace': schema.targetNamespace,
+                          'qualified': schema.qualified}
     quoted_fields = ('xsd_type', '_tag', '_namespace', '_values',
                      '_type_attr', '_type_value', '_abstract', 'any_attribute')
     for field in quoted_fields:
-        if field in typecls.__dict__:
-            fields.append((field, repr(getattr(typecls, field))))
+        if typecls.has_own(field):
+            fields.append((field, repr(typecls.get(field))))
 
     children = []
-    if hasattr(typecls, '_children'):
-        for ch in typecls._children:
+    if typecls.has('_children'):
+        for ch in typecls.get('_children'):
             children.append(static.safe_id(ch.name))
             fields.append((static.safe_id(ch.name),
                            Attr(ch.name, Ref(dep_class(ch.type, info['refs'])),
@@ -116,8 +416,8 @@ def typeinfo(name, typecls):
         fields.append(('_children', '[%s]' % ', '.join(children)))
 
     attributes = []
-    if hasattr(typecls, '_attributes'):
-        for ch in typecls._attributes:
+    if typecls.has('_attributes'):
+        for ch in typecls.get('_attributes'):
             attributes.append(static.safe_id(ch.name))
             fields.append((static.safe_id(ch.name),
                            Attr(ch.name, Ref(dep_class(ch.type, info['refs'])),
@@ -126,27 +426,114 @@ def typeinfo(name, typecls):
     if attributes:
         fields.append(('_attributes', '[%s]' % ', '.join(attributes)))
 
-    if hasattr(typecls, '_substitutions'):
+    if typecls.has('_substitutions'):
         subs = {}
-        for name, scls in typecls._substitutions.items():
+        for name, scls in (typecls.get('_substitutions') or {}).items():
             subs[name] = Ref(dep_class(scls, info['refs']))
         if subs:
             fields.append(('_substitutions', subs))
 
     type_fields = ('_content_type', '_arrayType')
     for field in type_fields:
-        if hasattr(typecls, field) and getattr(typecls, field) is not None:
-            info[field] = Ref(dep_class(getattr(typecls, field), info['refs']))
+        if typecls.get(field) is not None:
+            info[field] = Ref(dep_class(typecls.get(field), info['refs']))
             fields.append((field, info[field]))
 
     # enum values
-    if hasattr(typecls, '_values'):
-        for val in typecls._values:
+    if typecls.has('_values'):
+        for val in typecls.get('_values'):
             fields.append((static.safe_id(val), repr(val)))
 
     return info
 
 
+# constructors of the python types that simple types extend, for
+# simple types that make their values in the usual way
+_simple_bases = {unicode: 'unicode', int: 'int', long: 'long',
+                 float: 'float', scio.client.Decimal: 'client.Decimal'}
+
+
+def simple_base(cls):
+    """The constructor that makes values of a simple type class from
+    text, as code, or None if the class makes its values some other
+    way (as dates and booleans do).
+
+    """
+    if cls is None:
+        return None
+    return _simple_bases.get(cls.simple_base())
+
+
+def marshalinfo(typecls):
+    """Information for generating the marshalling code of a type: for
+    an array, the constructor of its items if they are plain simple
+    values, or None. Other types have no marshalling code of their
+    own; complex types read and write xml with the plans
+    (:class:`scio.client.UnmarshalPlan` and
+    :class:`scio.client.MarshalPlan`) that every client works out once
+    per class, which find each child with one lookup by its tag.
+
+    """
+    if not typecls.is_a(scio.client.ArrayType):
+        return None
+    return {'kind': 'array', 'base': simple_base(typecls.get('_arrayType'))}
+
+
+def pool_key(typecls, name, template_source, marshal=False):
+    """Key under which the class generated for a type is shared with
+    other generated modules, or None if a client doesn't share the
+    class. The key is the one a client's pool keeps the class under,
+    combined with what else changes the generated class: the template
+    and the ``marshal`` option.
+
+    :param typecls: The type's view in a :class:`scio.ir.Description`.
+    :param name: The name of the type.
+
+    """
+    key = typecls.pool_key
+    if key is None or name != typecls.name:
+        return None
+    digest = sha1(key)
+    digest.update(template_source)
+    if marshal:
+        digest.update('marshal')
+    return digest.hexdigest()
+
+
+def used_types(methods):
+    """Find the types used by some methods.
+
+    Follows message parts and headers, then base classes, children,
+    attributes, substitutions, content and array types. Classes
+    defined by scio itself, such as StringType, are not included.
+
+    :param methods: A list of :class:`scio.ir.MethodView` instances.
+    :returns: A dict of the views of the used types, keyed by id.
+
+    """
+    builtin = set(dir(scio.client))
+    used = {}
+    todo = []
+    for m in methods:
+        for msg in (m.input, m.output):
+            todo.extend([cls for name, cls in msg.parts])
+            todo.extend([cls for name, cls in msg.headers])
+    while todo:
+        cls = todo.pop()
+        if (cls is None or isinstance(cls, ir.AnyTypeView) or
+            id(cls) in used or cls.name in builtin):
+            continue
+        used[id(cls)] = cls
+        todo.extend(cls.bases)
+        for desc in itertools.chain(cls.get('_children', ()),
+                                    cls.get('_attributes', ())):
+            todo.append(desc.type)
+        todo.extend((cls.get('_substitutions') or {}).values())
+        todo.append(cls.get('_content_type'))
+        todo.append(cls.get('_arrayType'))
+    return used
+
+
 def mark_resolved_refs(types):
     unresolved = False
     for t in types:
@@ -167,6 +554,28 @@ def mark_resolved_refs(types):
     return unresolved
 
 
+def mark_lazy_refs(types):
+    """Make every reference to a generated class in some types a
+    registry lookup, for a module whose types are lazy.
+
+    """
+    for t in types:
+        refs = set(t['refs'])
+        t['bases'] = [base in t['deps'] and
+                      'Client._types._find(%r)' % base or base
+                      for base in t['bases']]
+        for field, val in t['fields']:
+            if isinstance(val, Attr):
+                val = val.ref_type
+            if isinstance(val, Ref):
+                val.resolved = val.ref_type not in refs
+            elif isinstance(val, dict):
+                # _substitutions
+                for v in val.values():
+                    if isinstance(v, Ref):
+                        v.resolved = v.ref_type not in refs
+
+
 class Ref(object):
     def __init__(self, ref_type):
         self.ref_type = ref_type
@@ -231,18 +640,37 @@ def svc_qual_classname(cls):
 def qualifed_classname(cls):
     if cls is None:
         return 'None'
-    if isinstance(cls, scio.client.AnyType):
+    if isinstance(cls, ir.AnyTypeView):
         # special case, these are instances not subclasses
         return 'Client._types.AnyType'
-    if cls.__name__ in dir(scio.client):
-        return "client.%s" % cls.__name__
-    return static.safe_id(cls.__name__)
+    if cls.name in dir(scio.client):
+        return "client.%s" % cls.name
+    return static.safe_id(cls.name)
 
 
 def sort_deps(types, key=lambda t: t['deps'], allow_refs=False):
+    """Sort types so that each comes after the types it depends on.
+
+    A topological sort (Kahn's algorithm): each type is indexed under
+    the class names it depends on, and becomes ready to output when the
+    last of them has been output. Of the types that are ready, the one
+    latest in the input is output first; types without dependencies
+    are output, last first, when no other type is ready.
+
+    Types left over are in, or depend on, cycles. If ``allow_refs`` is
+    true they are output after the others, one strongly connected
+    component at a time, each component after the components it
+    depends on. Each left-over type's ``unresolved`` is set to the
+    class names it depends on that have not been output before it.
+    Otherwise RuntimeError is raised.
+
+    :param types: A list of type info dicts, as made by :func:`typeinfo`.
+    :param key: Function giving the class names a type depends on.
+    :param allow_refs: Whether to allow cycles.
+
+    """
     ready = []
     deps = []
-    pushed = set()
     for t in types:
         if key(t):
             deps.append(t)
@@ -253,40 +681,108 @@ def sort_deps(types, key=lambda t: t['deps'], allow_refs=False):
             yield t
         return
 
-    while ready:
-        t = ready.pop()
-        if not t['class_name'] in pushed:
-            yield t
-            pushed.add(t['class_name'])
-            log.debug(" * %s" % t['class_name'])
-        for dt in deps:
-            if dt['class_name'] in pushed:
-                continue
-            if _ready(dt, key, pushed):
-                ready.append(dt)
-                log.debug("  -> %s" % dt['class_name'])
+    # how many of the names each type depends on have not been output,
+    # and the types depending on each name
+    waiting = []
+    dependents = {}
+    for i, t in enumerate(deps):
+        names = set(key(t))
+        waiting.append(len(names))
+        for name in names:
+            dependents.setdefault(name, []).append(i)
+
+    pushed = set()
+    heap = []
+    while heap or ready:
+        if heap:
+            t = deps[-heapq.heappop(heap)]
+        else:
+            t = ready.pop()
+        name = t['class_name']
+        if name in pushed:
+            continue
+        yield t
+        pushed.add(name)
+        log.debug(" * %s" % name)
+        for i in dependents.get(name, ()):
+            waiting[i] -= 1
+            if not waiting[i]:
+                # indexes are negated to pop the latest ready type first
+                heapq.heappush(heap, -i)
+                log.debug("  -> %s" % deps[i]['class_name'])
     # check for unresolved refs (cycles in the graph)
-    not_pushed = set([t['class_name'] for t in deps]) - pushed
-    if not_pushed:
-        log.debug("Some classes not pushed: %s", set(not_pushed))
+    if not set([t['class_name'] for t in deps]) - pushed:
+        return
+    missing_types = []
+    for i, t in enumerate(deps):
+        if waiting[i]:
+            missing_types.append(t)
+    if not missing_types:
+        return
+    log.debug("Some classes not pushed: %s",
+              set([t['class_name'] for t in missing_types]))
+    if not allow_refs:
         unresolved = {}
-        missing_types = []
-        for t in deps:
-            missing = set(key(t)) - pushed
-            if missing:
-                t['unresolved'] = missing
-                unresolved[t['class_name']] = sorted(list(missing))
-                missing_types.append(t)
-        if not allow_refs:
-            raise RuntimeError("Unresolved class dependencies: %s" % unresolved)
         for t in missing_types:
+            unresolved[t['class_name']] = sorted(set(key(t)) - pushed)
+        raise RuntimeError("Unresolved class dependencies: %s" % unresolved)
+    for component in _components(missing_types, key):
+        for t in component:
+            t['unresolved'] = set(key(t)) - pushed
             yield t
+            pushed.add(t['class_name'])
 
 
-def _ready(t, key, pushed):
-    if set(key(t)) - pushed:
-        return False
-    return True
+def _components(types, key):
+    # Tarjan's algorithm, without recursion: strongly connected
+    # components of the graph of types and the class names they depend
+    # on, each after the components it depends on. Types within a
+    # component keep their order.
+    by_name = {}
+    for i, t in enumerate(types):
+        by_name.setdefault(t['class_name'], []).append(i)
+    edges = []
+    for t in types:
+        targets = []
+        for name in key(t):
+            targets.extend(by_name.get(name, ()))
+        edges.append(targets)
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+    for root in range(len(types)):
+        if root in index:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, edge = work.pop()
+            if edge == 0:
+                index[node] = lowlink[node] = len(index)
+                stack.append(node)
+                on_stack.add(node)
+            if edge < len(edges[node]):
+                work.append((node, edge + 1))
+                target = edges[node][edge]
+                if target not in index:
+                    work.append((target, 0))
+                elif target in on_stack:
+                    lowlink[node] = min(lowlink[node], index[target])
+                continue
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append([types[i] for i in sorted(component)])
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+    return components
 
 
 def methodinfo(m):
@@ -0,0 +1,450 @@
+# ir.py -- intermediate representation of the types and methods in a wsdl
+#
+# Copyright (c) 2011, Leapfrog Online, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the Leapfrog Online, LLC nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+The intermediate representation (IR) of a wsdl file describes the
+classes and methods made for it, as plain data: tuples, lists, dicts
+and strings. It covers every type, with its bases, children,
+attributes, substitutions and schema, and every method, with its
+binding's location, action, style and messages.
+
+A :class:`scio.client.Factory` reads the wsdl once to produce the IR,
+which :meth:`scio.client.Factory.describe` returns, and then makes the
+classes and methods of the client it builds from the IR. Code
+generation and the ``autowsdl`` Sphinx directive read the IR through
+:class:`Description`, without making any classes. The IR can be saved
+to a file with :func:`write` or :func:`save`; a client built from an IR
+file with :class:`IRFactory` needs no xml parsing at all::
+
+  client = scio.Client(open('service.ir', 'rb'), factory_class=IRFactory)
+
+``scio_generate_client`` and the ``autowsdl`` Sphinx directive accept
+IR files wherever they accept wsdl files, and
+:class:`scio.cache.WsdlCache` stores the IR of the clients it caches.
+
+.. warning ::
+
+   IR files are pickles, and loading one can run any code. Only load
+   IR files that you wrote, or that come from someone you trust. On
+   posix systems, IR files owned by another user, or writable by
+   other users, are not loaded.
+"""
+from cPickle import dump, loads, HIGHEST_PROTOCOL
+import gc
+from optparse import OptionParser
+import logging
+import os
+
+from scio import client
+from scio.util import trusted
+
+log = logging.getLogger(__name__)
+
+# Bump this whenever the format of descriptions changes, so that
+# descriptions written by older versions are not used.
+FORMAT_VERSION = 3
+
+# first line of an IR file
+MAGIC = '# scio ir\n'
+
+
+def main():
+    """Write IR files
+
+    Describe each WSDL file listed on the command line, and write its
+    IR into the directory given with -d/--output-dir (by default, the
+    current directory), in a file named after the WSDL file with the
+    extension .ir.
+
+    """
+    parser = OptionParser(usage="%prog [options] wsdl_file [wsdl_file ...]")
+    parser.add_option('-d', '--output-dir', dest='output_dir',
+                      metavar='DIR', default='.',
+                      help="Write IR files into DIR.")
+    options, args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    for wsdl_file in args:
+        output = ir_path(options.output_dir, wsdl_file)
+        fh = open(wsdl_file, 'r')
+        try:
+            description = client.Factory(fh).describe()
+        finally:
+            fh.close()
+        fh = open(output, 'wb')
+        try:
+            write(description, fh)
+        finally:
+            fh.close()
+        log.info("Wrote %s", output)
+
+
+def ir_path(output_dir, wsdl_file):
+    """Path of the IR file written for a WSDL file: the file's name,
+    with the extension .ir.
+
+    """
+    name = os.path.splitext(os.path.basename(wsdl_file))[0]
+    return os.path.join(output_dir, '%s.ir' % name)
+
+
+def write(description, fh):
+    """
+    Write a description made by :meth:`scio.client.Factory.describe`
+    to a file opened for writing in binary mode.
+    """
+    fh.write(MAGIC)
+    dump({'version': FORMAT_VERSION, 'description': description},
+         fh, HIGHEST_PROTOCOL)
+
+
+def save(client_, fh):
+    """
+    Write the IR of a client to a file opened for writing in binary
+    mode. Raises ValueError if the client was built lazily, since it
+    may not have all of its types, and if it took classes from a pool.
+    """
+    if client_.wsdl.lazy:
+        raise ValueError("The IR of a lazy client is incomplete")
+    write(client_.wsdl.describe(), fh)
+
+
+def load(fh):
+    """
+    Read the description in an IR file written by :func:`write` or
+    :func:`save`. Raises ValueError if the file is not an IR file, was
+    written in an older format, or is a file on disk that is not
+    trusted (see :func:`scio.util.trusted`). Loading an IR file runs
+    any code it holds, so a file-like object that is not a file on
+    disk, such as a StringIO, must only hold data from a trusted
+    source; :func:`read_file` checks files read that way.
+    """
+    if hasattr(fh, 'fileno') and not trusted(fh):
+        raise ValueError("IR file may be written by other users")
+    if fh.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not an IR file")
+    # loading creates many container objects, none of them
+    # cyclic garbage; don't let the collector run over them
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        entry = loads(fh.read())
+    finally:
+        if gc_enabled:
+            gc.enable()
+    if entry.get('version') != FORMAT_VERSION:
+        raise ValueError("IR file is in an older format")
+    return entry['description']
+
+
+def read_file(path):
+    """
+    Read the content of a wsdl or IR file. Raises ValueError if it is
+    an IR file that is not trusted (see :func:`scio.util.trusted`),
+    since loading the content would run any code it holds.
+    """
+    fh = open(path, 'rb')
+    try:
+        data = fh.read()
+        if is_ir(data) and not trusted(fh):
+            raise ValueError("IR file %s may be written by other users"
+                             % path)
+        return data
+    finally:
+        fh.close()
+
+
+def is_ir(data):
+    """
+    Is some file content an IR file?
+    """
+    return data.startswith(MAGIC)
+
+
+class IRFactory(client.Factory):
+    """
+    Factory that builds types and methods from an IR file rather than
+    from a wsdl file. Since there is no wsdl tree, the ``wsdl``
+    attribute of the factory is None. All types are made when the
+    client is built, whether or not it is lazy; if ``operations`` are
+    given, the client has methods for only those operations.
+    """
+    def __init__(self, ir_file, lazy=False, operations=None, resolver=None,
+                 compact=False, pool=None):
+        if pool is not None:
+            raise ValueError("A client built from IR can't share classes "
+                             "through a pool")
+        self._setup(load(ir_file), operations)
+
+    def _setup(self, description, operations=None):
+        self._init_state(None, description['name'], client.NSStack(),
+                         False, operations, None, True, None)
+        self._read_description(description, operations)
+
+
+class Description(object):
+    """
+    Read-only view of a description made by
+    :meth:`scio.client.Factory.describe`, for generating code or
+    documentation without making any classes.
+
+    :ivar name: The name of the service.
+    :ivar pool: Whether the description has the keys under which
+                classes are shared through a :class:`scio.client.TypePool`.
+    :ivar types: A list of (name, type) for the types of a client built
+                 from the description, sorted by name.
+    :ivar methods: A list of :class:`MethodView`, sorted by name.
+
+    Types are :class:`ClassView` for the classes described, and
+    :class:`BuiltinView` for classes that scio defines.
+    """
+    def __init__(self, description):
+        self.name = description['name']
+        self.pool = description['pool']
+        self._description = description
+        self._views = {}
+        self.types = [(name, self.value(value))
+                      for name, value in description['types']]
+        self.methods = [MethodView(self, method)
+                        for method in description['methods']]
+
+    def value(self, value):
+        """
+        The view of a value in the description.
+        """
+        t = type(value)
+        if t is list:
+            return [self.value(v) for v in value]
+        elif t is not tuple:
+            return value
+        kind, payload = value
+        if kind == 'tuple':
+            return tuple([self.value(v) for v in payload])
+        elif kind == 'dict':
+            return dict([(k, self.value(v)) for k, v in payload])
+        elif kind == 'client':
+            return None
+        elif kind == 'scio':
+            return self.builtin(getattr(client, payload))
+        try:
+            return self._views[value]
+        except KeyError:
+            pass
+        if kind == 'class':
+            view = ClassView(self, *self._description['classes'][payload])
+        elif kind == 'desc':
+            view = DescriptorView(
+                self, *self._description['descriptors'][payload])
+        elif kind == 'schema':
+            nsmap, targetNamespace, qualified = \
+                self._description['schemas'][payload]
+            view = SchemaView(nsmap, targetNamespace, qualified)
+        elif kind == 'anytype':
+            view = AnyTypeView()
+        else:
+            raise ValueError("Unknown value kind %s" % kind)
+        self._views[value] = view
+        return view
+
+    def builtin(self, cls):
+        """
+        The view of a class that scio defines.
+        """
+        try:
+            return self._views[cls]
+        except KeyError:
+            view = self._views[cls] = BuiltinView(self, cls)
+            return view
+
+
+class ClassView(object):
+    """
+    A class described in a :class:`Description`, with what it would
+    have from its own body and from its bases.
+    """
+    def __init__(self, description, name, bases, body, pool_key):
+        self.name = name
+        self.pool_key = pool_key
+        self._description = description
+        self._bases = bases
+        self._body = dict(body)
+
+    @property
+    def bases(self):
+        return [self._description.value(base) for base in self._bases]
+
+    def has(self, key):
+        if key in self._body:
+            return True
+        for base in self.bases:
+            if base.has(key):
+                return True
+        return False
+
+    def has_own(self, key):
+        return key in self._body
+
+    def get(self, key, default=None):
+        if key in self._body:
+            return self._description.value(self._body[key])
+        for base in self.bases:
+            if base.has(key):
+                return base.get(key)
+        return default
+
+    def is_a(self, cls):
+        for base in self.bases:
+            if base.is_a(cls):
+                return True
+        return False
+
+    def simple_base(self):
+        """
+        As :func:`scio.client.simple_base`; simple types are made from
+        text the same way as the scio class they derive from.
+        """
+        return self.bases[-1].simple_base()
+
+
+class BuiltinView(object):
+    """
+    A class that scio defines, seen the way :class:`ClassView` sees
+    the classes described.
+    """
+    pool_key = None
+
+    def __init__(self, description, cls):
+        self.name = cls.__name__
+        self.cls = cls
+        self._description = description
+
+    @property
+    def bases(self):
+        return [self._description.builtin(base)
+                for base in self.cls.__bases__]
+
+    def has(self, key):
+        return hasattr(self.cls, key)
+
+    def has_own(self, key):
+        return key in self.cls.__dict__
+
+    def get(self, key, default=None):
+        return getattr(self.cls, key, default)
+
+    def is_a(self, cls):
+        return issubclass(self.cls, cls)
+
+    def simple_base(self):
+        return client.simple_base(self.cls)
+
+
+class SchemaView(client.FrozenSchema):
+    """
+    A schema in a :class:`Description`, which keeps the items of its
+    nsmap in the order the wsdl's element had them.
+    """
+    def __init__(self, items, targetNamespace, qualified):
+        client.FrozenSchema.__init__(self, dict(items), targetNamespace,
+                                     qualified)
+        self.items = list(items)
+
+
+class AnyTypeView(object):
+    """
+    Stands for anyType, which a client binds to each value by its
+    xsi:type when it reads it.
+    """
+    name = '<AnyType>'
+    pool_key = None
+    bases = ()
+
+    def has(self, key):
+        return False
+
+    def has_own(self, key):
+        return False
+
+    def get(self, key, default=None):
+        return default
+
+    def is_a(self, cls):
+        return False
+
+    def simple_base(self):
+        return None
+
+
+class DescriptorView(object):
+    """
+    An attribute or child of a class described in a
+    :class:`Description`, as :class:`scio.client.AttributeDescriptor`
+    would have it.
+    """
+    def __init__(self, description, name, type_, required, min, max,
+                 namespace, doc):
+        self.name = name
+        self.required = required
+        self.min = min
+        self.max = max
+        self.namespace = namespace
+        self.doc = doc
+        self._description = description
+        self._type = type_
+
+    @property
+    def type(self):
+        if self._type is None:
+            return self._description.builtin(client.StringType)
+        return self._description.value(self._type)
+
+
+class MethodView(object):
+    """
+    A method described in a :class:`Description`, as
+    :class:`scio.client.Method` would have it.
+    """
+    def __init__(self, description, method):
+        self.name = method['name']
+        self.location = method['location']
+        self.action = method['action']
+        self.input = MessageView(description, method['input'])
+        self.output = MessageView(description, method['output'])
+
+
+class MessageView(object):
+    """
+    The input or output message of a :class:`MethodView`. Parts and
+    headers are lists of (name, type).
+    """
+    def __init__(self, description, message):
+        self.tag = message['tag']
+        self.namespace = message['namespace']
+        self.style = message.get('style')
+        self.literal = message.get('literal')
+        self.parts = [(name, description.value(value))
+                      for name, value in message['parts']]
+        self.headers = [(name, description.value(value))
+                        for name, value in message['headers']]
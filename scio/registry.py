@@ -0,0 +1,147 @@
+# registry.py -- process-wide registry of clients built from wsdl files
+#
+# Copyright (c) 2011, Leapfrog Online, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the Leapfrog Online, LLC nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+A registry of clients built from wsdl files, so that a process builds
+the types and methods for each wsdl only once, however many clients
+it uses for it.
+"""
+from hashlib import sha1
+from StringIO import StringIO
+from threading import RLock
+from urllib2 import urlopen
+import logging
+
+from scio import client
+
+log = logging.getLogger(__name__)
+
+
+class Registry(object):
+    """
+    Registry of clients built from wsdl files.
+
+    The first time a client is asked for, a client is built for the
+    wsdl as usual and kept in the registry. Clients asked for later are
+    copies of that client (see :meth:`scio.client.Client.copy`): they
+    share its types and methods, and differ only in their transport
+    and in how they send requests and read responses
+    (``stream_requests`` and ``lazy_responses``), which are always
+    those asked for.
+
+    Clients are keyed by a hash of the wsdl file's content (or a key
+    given for the wsdl), along with every other option passed to the
+    client class, since those change what is built: ``client_class``,
+    ``service_class``, ``type_class``, ``reduce_callback``, ``lazy``,
+    ``operations`` and any other keyword arguments.
+    """
+    def __init__(self):
+        self._clients = {}
+        self._lock = RLock()
+
+    def client(self, wsdl_fp, transport=None, client_class=None,
+               service_class=None, type_class=None, reduce_callback=None,
+               lazy=False, operations=None, key=None, stream_requests=None,
+               lazy_responses=False, **kw):
+        """
+        Return a client for the given wsdl file that sends requests with
+        ``transport``. Other keyword arguments are passed to the client
+        class when the wsdl's client is first built, and are part of
+        the key the built client is kept under, so they must be
+        hashable.
+
+        :param client_class: The class of client to build. Default:
+                             :class:`scio.client.Client`.
+        :param key: An identity for the wsdl, such as its url, to use
+                    instead of a hash of its content. The wsdl file is
+                    then only read if the wsdl's client has not been
+                    built yet.
+        """
+        if client_class is None:
+            client_class = client.Client
+        data = None
+        if key is None:
+            data = wsdl_fp.read()
+            key = self.key(data)
+        if operations is not None:
+            operations = tuple(sorted(operations))
+        options = (key, client_class, service_class, type_class,
+                   reduce_callback, lazy, operations,
+                   tuple(sorted(kw.items())))
+        self._lock.acquire()
+        try:
+            try:
+                built = self._clients[options]
+            except KeyError:
+                log.debug("Building client for %s", key)
+                if data is None:
+                    data = wsdl_fp.read()
+                built = client_class(StringIO(data), transport=transport,
+                                     service_class=service_class,
+                                     type_class=type_class,
+                                     reduce_callback=reduce_callback,
+                                     lazy=lazy, operations=operations,
+                                     **kw)
+                self._clients[options] = built
+        finally:
+            self._lock.release()
+        if transport is None:
+            # not the transport of whichever client was built first
+            transport = urlopen
+        new = built.copy(transport)
+        # nor the settings of whichever client was built first
+        new.stream_requests = stream_requests
+        new.lazy_responses = lazy_responses
+        return new
+
+    def key(self, data):
+        """
+        Registry key for wsdl content.
+        """
+        return sha1(data).hexdigest()
+
+    def clear(self):
+        """
+        Forget all clients, so that clients asked for later are built
+        again. Clients already handed out are not affected.
+        """
+        self._lock.acquire()
+        try:
+            self._clients.clear()
+        finally:
+            self._lock.release()
+
+
+#: The process-wide registry used by :func:`get_client`.
+registry = Registry()
+
+
+def get_client(wsdl_fp, transport=None, **kw):
+    """
+    Return a client for the given wsdl file from the process-wide
+    registry. See :meth:`Registry.client`.
+    """
+    return registry.client(wsdl_fp, transport, **kw)
@@ -0,0 +1,260 @@
+# report.py -- reports on where the time building a client goes
+#
+# Copyright (c) 2011, Leapfrog Online, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the Leapfrog Online, LLC nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Reports on building clients: how long each phase of a build takes, how
+many classes of each kind are made, and which classes are slowest to
+make. Build a client with :class:`ReportingFactory` to get a report::
+
+  client = scio.Client(fh, factory_class=ReportingFactory)
+  print client.wsdl.report
+
+or run ``scio_build_report wsdl_file``.
+"""
+from optparse import OptionParser
+from threading import Lock, local
+import logging
+import time
+
+import scio.client
+from scio.client import ArrayType, ComplexType, EnumType, Factory, UnionType
+
+log = logging.getLogger(__name__)
+
+PHASES = ('parse', 'imports', 'types', 'resolve_refs', 'methods')
+KINDS = ('enum', 'array', 'union', 'simple', 'complex')
+
+
+class BuildReport(object):
+    """
+    Timings and counts for one client build.
+
+    :ivar total: Seconds spent creating and building the factory.
+    :ivar phases: Dict of seconds spent in each phase, not counting time
+                  spent in other phases within it. Documents imported
+                  by the wsdl are parsed on several threads at once,
+                  so phases can add up to more than the total.
+    :ivar refs_created: The number of type references created for
+                        types not made yet.
+    :ivar refs_resolved: The number of type references resolved.
+    :ivar calls: A list of (seconds, name) for each class described,
+                 including the time describing any classes it needs.
+                 Making the classes from their description is timed
+                 in the types phase.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        self.total = 0.0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.refs_created = 0
+        self.refs_resolved = 0
+        self.calls = []
+        self._lock = Lock()
+        self._local = local()
+
+    @property
+    def classes(self):
+        """
+        Dict of the number of classes of each kind the factory has made.
+        """
+        counts = dict.fromkeys(KINDS, 0)
+        builtin = Factory._typemap
+        for name, cls in self.factory._typemap.items():
+            if builtin.get(name, None) is cls:
+                continue
+            counts[_kind(cls)] += 1
+        return counts
+
+    def slowest(self, n=10):
+        """
+        The n slowest classes to make, as (seconds, name), slowest first.
+        """
+        return sorted(self.calls, reverse=True)[:n]
+
+    def timed(self, phase, func, *arg, **kw):
+        """
+        Call func, timing it as part of the given phase.
+        """
+        # each thread keeps a stack of [phase, time of last switch],
+        # so that time is charged only to the innermost phase
+        try:
+            stack = self._local.stack
+        except AttributeError:
+            stack = self._local.stack = []
+        start = time.time()
+        if stack:
+            self._add(stack[-1][0], start - stack[-1][1])
+        stack.append([phase, start])
+        try:
+            return func(*arg, **kw)
+        finally:
+            end = time.time()
+            self._add(phase, end - stack.pop()[1])
+            if stack:
+                stack[-1][1] = end
+
+    def _add(self, phase, seconds):
+        self._lock.acquire()
+        try:
+            self.phases[phase] += seconds
+        finally:
+            self._lock.release()
+
+    def format(self, slowest=10):
+        """
+        Format the report as text, listing the ``slowest`` slowest
+        classes to make.
+        """
+        lines = ['Total: %8.1fms' % (self.total * 1000), '', 'Phases:']
+        for phase in PHASES:
+            lines.append('  %-14s %8.1fms' % (phase,
+                                              self.phases[phase] * 1000))
+        lines.extend(['', 'Classes:'])
+        classes = self.classes
+        for name in KINDS:
+            lines.append('  %-14s %8d' % (name, classes[name]))
+        lines.extend(['', 'Type references:',
+                      '  %-14s %8d' % ('created', self.refs_created),
+                      '  %-14s %8d' % ('resolved', self.refs_resolved)])
+        calls = self.slowest(slowest)
+        if calls:
+            lines.extend(['', 'Slowest classes:'])
+            for seconds, name in calls:
+                lines.append('  %-40s %8.2fms' % (name, seconds * 1000))
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.format()
+
+
+class ReportingFactory(Factory):
+    """
+    Factory that keeps a :class:`BuildReport` of its build as its
+    ``report`` attribute. A lazy factory goes on adding to its report
+    as it makes types and methods on demand.
+    """
+    def __init__(self, *arg, **kw):
+        self.report = BuildReport(self)
+        start = time.time()
+        super(ReportingFactory, self).__init__(*arg, **kw)
+        self.report.total += time.time() - start
+
+    def build(self, client):
+        start = time.time()
+        try:
+            return super(ReportingFactory, self).build(client)
+        finally:
+            self.report.total += time.time() - start
+
+    def _parse(self, fh):
+        return self.report.timed(
+            'parse', super(ReportingFactory, self)._parse, fh)
+
+    def _prefetch(self):
+        return self.report.timed(
+            'imports', super(ReportingFactory, self)._prefetch)
+
+    def _fetch(self, url):
+        return self.report.timed(
+            'imports', super(ReportingFactory, self)._fetch, url)
+
+    def _process_types(self, wsdl):
+        return self.report.timed(
+            'types', super(ReportingFactory, self)._process_types, wsdl)
+
+    def _make_classes(self):
+        return self.report.timed(
+            'types', super(ReportingFactory, self)._make_classes)
+
+    def _resolve_refs(self):
+        return self.report.timed(
+            'resolve_refs', super(ReportingFactory, self)._resolve_refs)
+
+    def _process_methods(self, wsdl):
+        return self.report.timed(
+            'methods', super(ReportingFactory, self)._process_methods, wsdl)
+
+    def _describe_class(self, type_, name=None, *arg, **kw):
+        described = len(self._records)
+        start = time.time()
+        value = super(ReportingFactory, self)._describe_class(
+            type_, name, *arg, **kw)
+        # calls that only look up a class already described don't count
+        if len(self._records) > described:
+            if type(value) is tuple and value[0] == 'class':
+                name = self._records[value[1]][0]
+            self.report.calls.append((time.time() - start, name))
+        return value
+
+    def _ref(self, name):
+        self.report.refs_created += 1
+        return super(ReportingFactory, self)._ref(name)
+
+    def _resolve_ref(self, name):
+        self.report.refs_resolved += 1
+        return super(ReportingFactory, self)._resolve_ref(name)
+
+
+def _kind(cls):
+    for base, name in ((EnumType, 'enum'),
+                       (ArrayType, 'array'),
+                       (UnionType, 'union'),
+                       (ComplexType, 'complex')):
+        if issubclass(cls, base):
+            return name
+    return 'simple'
+
+
+def main():
+    """Report on building clients
+
+    Build a client for each WSDL file listed on the command line, and
+    print a report of where the time went.
+
+    """
+    parser = OptionParser(usage="%prog [options] wsdl_file [wsdl_file ...]")
+    parser.add_option('-n', '--slowest', type='int', default=10,
+                      metavar='N',
+                      help="List the N slowest classes to make "
+                      "(default %default).")
+    parser.add_option('-o', '--operation', action='append',
+                      dest='operations', metavar='NAME',
+                      help="Build only this operation, and the types "
+                      "it uses. May be given more than once.")
+    parser.add_option('--lazy', action='store_true', default=False,
+                      help="Build a lazy client.")
+    options, args = parser.parse_args()
+    if not args:
+        parser.error("no wsdl files given")
+    logging.basicConfig(level=logging.WARNING)
+    for wsdl_file in args:
+        with open(wsdl_file, 'r') as fh:
+            client = scio.client.Client(fh, lazy=options.lazy,
+                                        operations=options.operations,
+                                        factory_class=ReportingFactory)
+        print wsdl_file
+        print client.wsdl.report.format(options.slowest)
+        print
@@ -0,0 +1,291 @@
+# resolver.py -- fetching the documents imported by wsdl files
+#
+# Copyright (c) 2011, Leapfrog Online, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the Leapfrog Online, LLC nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Resolvers fetch the documents that a wsdl file imports. A resolver is
+any callable that takes the url of an imported document and returns
+a file-like object containing the document; pass one to
+:class:`scio.client.Client` as ``resolver``.
+"""
+from email.Utils import parsedate_tz, mktime_tz
+from hashlib import sha1
+from StringIO import StringIO
+from urllib2 import urlopen, Request, HTTPError, URLError
+import json
+import logging
+import os
+import re
+import time
+
+from lxml import etree
+
+from scio.util import atomic_write
+
+log = logging.getLogger(__name__)
+
+NS_CATALOG = 'urn:oasis:names:tc:entity:xmlns:xml:catalog'
+
+
+class Resolver(object):
+    """
+    Fetch documents with a transport.
+
+    :param transport: A callable compatible with :func:`urllib2.urlopen`,
+                      which will be passed a :class:`urllib2.Request`.
+                      Default: :func:`urllib2.urlopen`.
+    """
+    def __init__(self, transport=None):
+        if transport is None:
+            transport = urlopen
+        self.transport = transport
+
+    def __call__(self, url):
+        return self.open(Request(url))
+
+    def open(self, request):
+        """
+        Send a request with the transport, and return the response.
+        """
+        return self.transport(request)
+
+
+class CatalogResolver(object):
+    """
+    Fetch documents from local copies named in a catalog, in the manner
+    of an XML catalog. Documents are mapped either by their full url,
+    or by replacing the start of their url. Mapped locations may be
+    file paths or urls. Documents not in the catalog are fetched with
+    the fallback resolver.
+
+    :param uris: A dict mapping urls to locations.
+    :param rewrites: A list of (url prefix, location prefix) pairs. The
+                     longest matching prefix is used.
+    :param resolver: Fallback resolver, for urls not in the catalog and
+                     mapped locations that are urls. Default:
+                     :class:`Resolver`.
+    """
+    _uri_tags = ('{%s}uri' % NS_CATALOG, '{%s}system' % NS_CATALOG)
+    _rewrite_tags = ('{%s}rewriteURI' % NS_CATALOG,
+                     '{%s}rewriteSystem' % NS_CATALOG)
+
+    def __init__(self, uris=None, rewrites=None, resolver=None):
+        if resolver is None:
+            resolver = Resolver()
+        self.uris = dict(uris or {})
+        self.rewrites = sorted(rewrites or [],
+                               key=lambda r: len(r[0]), reverse=True)
+        self.resolver = resolver
+
+    @classmethod
+    def load(cls, path, resolver=None):
+        """
+        Create a resolver from an OASIS XML catalog file. ``uri`` and
+        ``system`` entries map full urls; ``rewriteURI`` and
+        ``rewriteSystem`` entries map url prefixes. Relative locations
+        are relative to the directory containing the catalog.
+        """
+        root = etree.parse(path).getroot()
+        base = os.path.dirname(os.path.abspath(path))
+        uris = {}
+        rewrites = []
+        for node in root.iter():
+            if node.tag in cls._uri_tags:
+                name = node.get('name') or node.get('systemId')
+                uris[name] = cls._location(base, node.get('uri'))
+            elif node.tag in cls._rewrite_tags:
+                start = (node.get('uriStartString') or
+                         node.get('systemIdStartString'))
+                rewrites.append(
+                    (start, cls._location(base, node.get('rewritePrefix'))))
+        return cls(uris, rewrites, resolver)
+
+    @staticmethod
+    def _location(base, location):
+        if _is_url(location):
+            return location
+        return os.path.join(base, location)
+
+    def __call__(self, url):
+        location = self.find(url)
+        if location is None:
+            return self.resolver(url)
+        log.debug("Catalog maps %s to %s", url, location)
+        if _is_url(location):
+            return self.resolver(location)
+        return open(location, 'rb')
+
+    def find(self, url):
+        """
+        Find the location the catalog maps a url to, or None if the url
+        is not in the catalog.
+        """
+        try:
+            return self.uris[url]
+        except KeyError:
+            pass
+        for start, prefix in self.rewrites:
+            if url.startswith(start):
+                return prefix + url[len(start):]
+
+
+class CachingResolver(Resolver):
+    """
+    Fetch documents with a transport, keeping a copy of each in a cache
+    directory. A cached copy is used without any request while it is
+    fresh: for ``max_age`` seconds if that is given, otherwise for as
+    long as the response's Cache-Control max-age or Expires header
+    allows. After that, the copy is revalidated with a conditional
+    request (If-None-Match and If-Modified-Since), and only downloaded
+    again if it has changed. If a document can't be fetched at all, a
+    stale cached copy is used.
+
+    Each copy is kept as a line of JSON holding the url and response
+    headers, followed by the document as it was downloaded; loading a
+    copy runs no code.
+
+    :param directory: The directory in which to keep documents. It will
+                      be created, readable only by its owner, if it does
+                      not exist.
+    :param transport: A callable compatible with :func:`urllib2.urlopen`.
+                      Default: :func:`urllib2.urlopen`.
+    :param max_age: Seconds for which a cached copy is fresh. If None,
+                    freshness comes from the response headers.
+    """
+    _max_age_re = re.compile(r'max-age\s*=\s*(\d+)')
+
+    def __init__(self, directory, transport=None, max_age=None):
+        super(CachingResolver, self).__init__(transport)
+        self.directory = directory
+        self.max_age = max_age
+
+    def __call__(self, url):
+        entry = self.load(url)
+        if entry is not None and entry['expires'] > time.time():
+            log.debug("Using cached copy of %s", url)
+            return StringIO(entry['data'])
+        request = Request(url)
+        if entry is not None:
+            if entry['etag']:
+                request.add_header('If-None-Match', entry['etag'])
+            if entry['last_modified']:
+                request.add_header('If-Modified-Since',
+                                   entry['last_modified'])
+        try:
+            response = self.open(request)
+            data = response.read()
+        except HTTPError, e:
+            if e.code != 304 or entry is None:
+                raise
+            log.debug("Cached copy of %s is current", url)
+            entry['expires'] = self._expires(_headers(e))
+            self._write(url, entry)
+            return StringIO(entry['data'])
+        except URLError, e:
+            if entry is None:
+                raise
+            log.warning("Unable to fetch %s (%s), using cached copy",
+                        url, e)
+            return StringIO(entry['data'])
+        headers = _headers(response)
+        self._write(url, {'url': url,
+                          'data': data,
+                          'etag': headers.get('etag'),
+                          'last_modified': headers.get('last-modified'),
+                          'expires': self._expires(headers)})
+        return StringIO(data)
+
+    def path(self, url):
+        """
+        Path to the cached copy of a url.
+        """
+        return os.path.join(self.directory,
+                            '%s.doc' % sha1(url).hexdigest())
+
+    def load(self, url):
+        """
+        Load the cache entry for a url. Returns None if there is no
+        entry, or the entry can't be read.
+        """
+        try:
+            fh = open(self.path(url), 'rb')
+        except IOError:
+            return None
+        try:
+            try:
+                meta, data = fh.read().split('\n', 1)
+                entry = json.loads(meta)
+            except ValueError, e:
+                log.warning("Unable to load cached copy of %s: %s", url, e)
+                return None
+        finally:
+            fh.close()
+        if entry.get('url') != url:
+            return None
+        entry['data'] = data
+        return entry
+
+    def _expires(self, headers):
+        now = time.time()
+        if self.max_age is not None:
+            return now + self.max_age
+        cache_control = headers.get('cache-control') or ''
+        if 'no-cache' in cache_control or 'no-store' in cache_control:
+            return now
+        match = self._max_age_re.search(cache_control)
+        if match:
+            return now + int(match.group(1))
+        expires = headers.get('expires')
+        if expires:
+            parsed = parsedate_tz(expires)
+            if parsed is not None:
+                return mktime_tz(parsed)
+        return now
+
+    def _write(self, url, entry):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, 0700)
+        meta = dict((k, v) for k, v in entry.items() if k != 'data')
+        atomic_write(self.path(url),
+                     '%s\n%s' % (json.dumps(meta), entry['data']))
+
+
+def _is_url(location):
+    return '://' in location
+
+
+def _headers(response):
+    # lower-cased response headers; responses from transports that
+    # aren't urllib2 may not have any
+    try:
+        info = response.info()
+    except AttributeError:
+        return {}
+    if info is None:
+        return {}
+    headers = {}
+    for key in info.keys():
+        headers[key.lower()] = info.get(key)
+    return headers
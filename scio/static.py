@@ -25,7 +25,10 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+from threading import RLock
+from types import ModuleType
 from urllib2 import urlopen
+import sys
 
 from scio import client
 
@@ -38,6 +41,10 @@ class Client(client.Client):
 
     :param transport: The transport mechanism for communicating with
                       target services. Default: :func:`urlopen`.
+    :param stream_requests: A number of bytes. If supplied, requests are
+                            streamed as with :class:`scio.client.Client`.
+    :param lazy_responses: If true, the complex values in responses are
+                           read lazily, as with :class:`scio.client.Client`.
     """
     methodCallClass = client.MethodCall
     methodClass = client.Method
@@ -48,23 +55,65 @@ class Client(client.Client):
     # subclasses must set _types = static.TypeRegistry()
     _types = None
 
-    def __init__(self, transport=None):
+    def __init__(self, transport=None, stream_requests=None,
+                 lazy_responses=False):
         if transport is None:
             transport = urlopen
         self.transport = transport
+        self.stream_requests = stream_requests
+        self.lazy_responses = lazy_responses
+
+    def copy(self, transport=None):
+        """
+        Make a new client that sends requests with its own
+        ``transport`` (by default, this client's transport).
+        """
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        new.__dict__.pop('_service_container', None)
+        if transport is not None:
+            new.transport = transport
+        return new
 
     @property
     def service(self):
-        return self._service(self)
+        try:
+            return self.__dict__['_service_container']
+        except KeyError:
+            service = self._service(self)
+            self.__dict__['_service_container'] = service
+            return service
+
+    @property
+    def _methods(self):
+        # Method definitions are the same for every instance of a
+        # client class, so generated services make each one once per
+        # class. Subclasses may use other method, input or output
+        # classes, so each class has its own.
+        cls = self.__class__
+        try:
+            return cls.__dict__['_method_cache']
+        except KeyError:
+            cls._method_cache = {}
+            return cls._method_cache
 
     @property
     def type(self):
         return self._types(self)
 
     @classmethod
-    def register(cls, name, type_):
-        """Register a type under the given name"""
-        return cls._types.register(name, type_)
+    def register(cls, name, type_, key=None):
+        """Register a type under the given name. If a key is given,
+        and a class is already kept in the pool under that key, that
+        class is registered instead. Returns the registered class."""
+        return cls._types.register(name, type_, key)
+
+    @classmethod
+    def define(cls, name, factory, key=None):
+        """Define a type under the given name, made by calling factory
+        the first time it is used, unless a key is given and a class is
+        kept in the pool under that key"""
+        return cls._types.define(name, factory, key)
 
     @classmethod
     def ref(cls, name):
@@ -75,23 +124,11 @@ class Client(client.Client):
         cls._types.resolve_refs()
 
 
-class Schema(client.Schema):
-    def __init__(self, nsmap, targetNamespace, qualified):
-        self._nsmap = nsmap
-        self._targetNamespace = targetNamespace
-        self._qualified = qualified
-
-    @property
-    def nsmap(self):
-        return self._nsmap
-
-    @property
-    def targetNamespace(self):
-        return self._targetNamespace
+# the schemas of generated classes have only plain values
+Schema = client.FrozenSchema
 
-    @property
-    def qualified(self):
-        return self._qualified
+# classes shared between the modules generated with shared types
+pool = client.TypePool()
 
 
 class Ref(object):
@@ -100,35 +137,98 @@ class Ref(object):
 
 
 class TypeRegistry(object):
-    """Registry of types and references"""
+    """Registry of types and references
 
-    ref = Ref
+    References made with :meth:`ref` are placeholders in the class
+    body of the next type registered. When that type is registered,
+    the places in the class that hold them are noted, so that
+    resolving references only visits those places.
+    """
+
+    refClass = Ref
 
     def __init__(self):
         self._types = client.Factory._typemap.copy()
+        # (object, attribute or key) holding each reference
+        self._refs = []
+        self._new_refs = 0
 
     def __call__(self, client):
         return Types(client, self._types)
 
-    def register(self, name, cls):
+    def ref(self, name):
+        """Placeholder for the named type, to be resolved later"""
+        self._new_refs += 1
+        return self.refClass(name)
+
+    def register(self, name, cls, key=None):
+        if key is not None:
+            shared = pool.add(key, cls)
+            if shared is not cls:
+                # the new class and its references are dropped
+                self._types[name] = shared
+                self._new_refs = 0
+                return shared
         self._types[name] = cls
         cls._resolver = self
+        if self._new_refs:
+            self._refs.extend(self._find_refs(cls))
+            self._new_refs = 0
+        return cls
 
     def resolve_refs(self):
-        for cn, t in self._types.items():
-            for entry in dir(t):
-                item = getattr(t, entry)
-                if isinstance(item, self.ref):
-                    # example: _content_type
-                    setattr(t, entry, self._find(item.name))
-                elif hasattr(item, 'type'):
-                    # example: AttributeDescriptor.type
-                    if isinstance(item.type, self.ref):
-                        item.type = self._find(item.type.name)
-                elif entry == '_substitutions' and item:
-                    for k, v in item.items():
-                        if isinstance(v, self.ref):
-                            item[k] = self._find(v.name)
+        refs, self._refs = self._refs, []
+        self._resolve_refs(refs)
+        if self._new_refs:
+            # references made outside of any registered class body
+            # could be anywhere
+            for cn, t in self._types.items():
+                self._resolve(t)
+            self._new_refs = 0
+
+    def _find_refs(self, t):
+        # references in a class's own attributes; those in inherited
+        # attributes were found when its bases were registered
+        refs = []
+        for entry, item in t.__dict__.items():
+            if isinstance(item, self.refClass):
+                # example: _content_type
+                refs.append((t, entry))
+            elif isinstance(getattr(item, 'type', None), self.refClass):
+                # example: AttributeDescriptor.type
+                refs.append((item, 'type'))
+            elif entry == '_substitutions' and item:
+                for k, v in item.items():
+                    if isinstance(v, self.refClass):
+                        refs.append((item, k))
+        return refs
+
+    def _resolve_refs(self, refs):
+        for obj, key in refs:
+            if isinstance(obj, dict):
+                # example: _substitutions
+                ref = obj[key]
+                if isinstance(ref, self.refClass):
+                    obj[key] = self._find(ref.name)
+            else:
+                ref = getattr(obj, key)
+                if isinstance(ref, self.refClass):
+                    setattr(obj, key, self._find(ref.name))
+
+    def _resolve(self, t):
+        for entry in dir(t):
+            item = getattr(t, entry)
+            if isinstance(item, self.refClass):
+                # example: _content_type
+                setattr(t, entry, self._find(item.name))
+            elif hasattr(item, 'type'):
+                # example: AttributeDescriptor.type
+                if isinstance(item.type, self.refClass):
+                    item.type = self._find(item.type.name)
+            elif entry == '_substitutions' and item:
+                for k, v in item.items():
+                    if isinstance(v, self.refClass):
+                        item[k] = self._find(v.name)
 
     def _find(self, valtype):
         return self._types[valtype]
@@ -163,6 +263,149 @@ class AnyType(client.AnyType):
         return valcls(value, **kw)
 
 
+class LazyTypeRegistry(TypeRegistry):
+    """Registry of types that are made the first time they are used
+
+    Each type is defined with a factory that makes its class. When a
+    type is first looked up, its factory is called, and the references
+    in the new class are resolved, making the types they refer to. A
+    type's classes are only visible to other threads once all of them
+    are made and resolved.
+    """
+    def __init__(self):
+        super(LazyTypeRegistry, self).__init__()
+        self._factories = {}
+        self._keys = {}
+        self._building = None
+        self._lock = RLock()
+
+    def __call__(self, client):
+        return LazyTypes(client, self)
+
+    def define(self, name, factory, key=None):
+        self._factories[name] = factory
+        if key is not None:
+            self._keys[name] = key
+
+    def resolve_refs(self):
+        """Make every type not made yet"""
+        for name in sorted(self._factories):
+            self._find(name)
+
+    def _find(self, valtype):
+        try:
+            return self._types[valtype]
+        except KeyError:
+            pass
+        self._lock.acquire()
+        try:
+            # another thread may have made the type while this one
+            # waited for the lock
+            try:
+                return self._types[valtype]
+            except KeyError:
+                pass
+            if self._building is not None:
+                # a type being made refers to this one
+                try:
+                    return self._building[valtype]
+                except KeyError:
+                    return self._make(valtype)
+            self._building = {}
+            try:
+                cls = self._make(valtype)
+                self._types.update(self._building)
+                for name, made in self._building.items():
+                    del self._factories[name]
+                    key = self._keys.pop(name, None)
+                    if key is not None:
+                        pool.add(key, made)
+            finally:
+                self._building = None
+            return cls
+        finally:
+            self._lock.release()
+
+    def _make(self, valtype):
+        key = self._keys.get(valtype)
+        if key is not None:
+            cls = pool.get(key)
+            if cls is not None:
+                # made by another module
+                self._building[valtype] = cls
+                return cls
+        factory = self._factories[valtype]
+        cls = factory()
+        # visible to the types it refers to before its references
+        # are resolved, since they may refer back to it
+        self._building[valtype] = cls
+        cls._resolver = self
+        # its bases were made, and their references resolved, before
+        # its class body made its own references
+        if self._new_refs:
+            refs = self._find_refs(cls)
+            self._new_refs = 0
+            self._resolve_refs(refs)
+        return cls
+
+
+class LazyTypes(Types):
+    """Access to types in a client whose types are made on first use"""
+    def __init__(self, client, registry):
+        self._client = client
+        self._types = registry._types
+        self._registry = registry
+
+    def __getattr__(self, attr):
+        try:
+            return self._types[attr]
+        except KeyError:
+            pass
+        try:
+            return self._registry._find(attr)
+        except KeyError:
+            raise AttributeError("No %s in types registry" % attr)
+
+
+class LazyModule(ModuleType):
+    """Generated module whose type classes are made when looked up
+
+    Type classes in a module generated with lazy types are made by the
+    module's client class the first time they are used, so they are
+    not attributes of the module until then. Looking up a class in the
+    module, as pickle does, makes it.
+    """
+    def __init__(self, module):
+        ModuleType.__init__(self, module.__name__, module.__doc__)
+        self.__dict__.update(module.__dict__)
+        # the generated functions' globals are the original module's,
+        # which python clears when the module is freed
+        self.__module = module
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        try:
+            return self.__dict__['Client']._types._find(attr)
+        except KeyError:
+            raise AttributeError(attr)
+
+
+def lazy_module(namespace):
+    """Replace the module with the given namespace with a
+    :class:`LazyModule`.
+
+    Called at the end of generated modules with lazy types. Code that
+    was executed in a namespace rather than imported as a module is
+    left alone.
+    """
+    name = namespace.get('__name__')
+    module = sys.modules.get(name)
+    if module is None or module.__dict__ is not namespace:
+        return
+    sys.modules[name] = LazyModule(module)
+
+
 def safe_id(name):
     if name == 'None':
         return 'None_'
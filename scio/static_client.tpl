@@ -1,3 +1,19 @@
+{% macro marshal_methods(tp) -%}
+{%- if tp.marshal.base -%}
+def __init__(self, iterable=()):
+    cls = self._arrayType
+    append = self.append
+    for item in iterable:
+        if isinstance(item, client.etree._Element):
+            item = item.text
+            if item is None:
+                append(cls())
+                continue
+        append({{ tp.marshal.base }}.__new__(cls, item))
+{%- else -%}
+__init__ = client.ArrayType.__init__.im_func
+{%- endif -%}
+{%- endmacro -%}
 #
 # WARNING: this module is autogenerated. Do not edit this file!
 #
@@ -7,7 +23,11 @@ from scio import client, static
 # Client class
 #
 class Client(static.Client):
+{%- if lazy %}
+    _types = static.LazyTypeRegistry()
+{%- else %}
     _types = static.TypeRegistry()
+{%- endif %}
 
     class _service(object):
         def __init__(self, client_):
@@ -16,36 +36,63 @@ class Client(static.Client):
         @property
         def {{ meth.name }}(self):
             client_ = self._client
-            meth = client_.methodClass(
-                '{{ meth.location }}',
-                '{{ meth.name }}',
-                '{{ meth.action }}',
-                client_.inputClass('{{ meth.input.tag }}',
-                                   '{{ meth.input.namespace }}',
-                                   [{% for part in meth.input.parts -%}
-                                    ('{{ part.0 }}', {{ part.1 }}),
-                                    {% endfor %}],
-                                   '{{ meth.input.style }}',
-                                   '{{ meth.input.literal }}',
-                                   [{% for part in meth.input.headers -%}
-                                    ('{{ part.0 }}', {{ part.1 }}),
-                                    {% endfor %}]),
-                client_.outputClass('{{ meth.output.tag }}',
-                                    '{{ meth.output.namespace }}',
-                                    [{% for part in meth.output.parts -%}
-                                     ('{{ part.0 }}', {{ part.1 }}),
-                                     {% endfor %}],
-                                    [{% for part in meth.output.headers -%}
-                                     ('{{ part.0 }}', {{ part.1 }}),
-                                     {% endfor %}])
-                )
+            try:
+                meth = client_._methods['{{ meth.name }}']
+            except KeyError:
+                meth = client_.methodClass(
+                    '{{ meth.location }}',
+                    '{{ meth.name }}',
+                    '{{ meth.action }}',
+                    client_.inputClass('{{ meth.input.tag }}',
+                                       '{{ meth.input.namespace }}',
+                                       [{% for part in meth.input.parts -%}
+                                        ('{{ part.0 }}', {{ part.1 }}),
+                                        {% endfor %}],
+                                       '{{ meth.input.style }}',
+                                       '{{ meth.input.literal }}',
+                                       [{% for part in meth.input.headers -%}
+                                        ('{{ part.0 }}', {{ part.1 }}),
+                                        {% endfor %}]),
+                    client_.outputClass('{{ meth.output.tag }}',
+                                        '{{ meth.output.namespace }}',
+                                        [{% for part in meth.output.parts -%}
+                                         ('{{ part.0 }}', {{ part.1 }}),
+                                         {% endfor %}],
+                                        [{% for part in meth.output.headers -%}
+                                         ('{{ part.0 }}', {{ part.1 }}),
+                                         {% endfor %}])
+                    )
+                client_._methods['{{ meth.name }}'] = meth
             return client_.methodCallClass(client_, meth)
 {% endfor %}
 
 #
 # Types
 #{% for tp in types %}
-{% if not tp.is_alias %}
+{% if not tp.is_alias and lazy %}
+def _make_{{ tp.class_name }}():
+    class {{ tp.class_name }}({{ tp.bases|join(', ') }}):
+        {%- for name, val in tp.fields %}
+        {{ name }} = {{ val }}
+        {%- endfor %}
+        {%- if tp.schema and tp.schema.nsmap %}
+        _schema = static.Schema(
+            {{ tp.schema.nsmap }},
+            '{{ tp.schema.targetNamespace }}',
+            {{ tp.schema.qualified }})
+        {%- endif %}
+        {%- if tp.marshal %}
+
+        {{ marshal_methods(tp)|indent(8) }}
+        {%- endif %}
+    return {{ tp.class_name }}
+{% if tp.pool_key -%}
+Client.define("{{ tp.name }}", _make_{{ tp.class_name }},
+              '{{ tp.pool_key }}')
+{%- else -%}
+Client.define("{{ tp.name }}", _make_{{ tp.class_name }})
+{%- endif %}
+{% elif not tp.is_alias %}
 class {{ tp.class_name }}({{ tp.bases|join(', ') }}):
     {%- for name, val in tp.fields %}
     {{ name }} = {{ val }}
@@ -56,12 +103,24 @@ class {{ tp.class_name }}({{ tp.bases|join(', ') }}):
         '{{ tp.schema.targetNamespace }}',
         {{ tp.schema.qualified }})
     {%- endif %}
+    {%- if tp.marshal %}
+
+    {{ marshal_methods(tp)|indent(4) }}
+    {%- endif %}
+{% if tp.pool_key -%}
+{{ tp.class_name }} = Client.register(
+    "{{ tp.name }}", {{ tp.class_name }}, '{{ tp.pool_key }}')
+{%- else -%}
 Client.register("{{ tp.name }}", {{ tp.class_name }})
+{%- endif %}
 {% else %}
 # alias
 Client.register("{{ tp.name }}", {{ tp.qualified_name }})
 {% endif %}{% endfor %}
-{%- if circular_refs %}
+{%- if lazy %}
+# Types are made the first time they are used
+static.lazy_module(globals())
+{%- elif circular_refs %}
 # Client types contain circular references
 Client.resolve_refs()
 {%- endif -%}
@@ -0,0 +1,114 @@
+from hashlib import sha1
+import os
+import shutil
+import tempfile
+from StringIO import StringIO
+
+from nose.tools import eq_
+from docutils.statemachine import ViewList
+from sphinx.application import Sphinx
+
+import scio.client
+from scio import autowsdl
+import helpers
+
+PAGE = """\
+%(name)s
+%(underline)s
+
+.. autowsdl :: %(wsdl)s
+"""
+
+
+class TestAutoWsdl(object):
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        self.src = os.path.join(self.dir, 'src')
+        os.mkdir(self.src)
+        wsdls = ['lyrics.wsdl', 'zfapi.wsdl']
+        toc = []
+        for wsdl in wsdls:
+            name = os.path.splitext(wsdl)[0]
+            toc.append('   %s' % name)
+            self.write('%s.rst' % name, PAGE % {
+                'name': name, 'underline': '=' * len(name),
+                'wsdl': os.path.join(helpers._support, wsdl)})
+        self.write('conf.py', "extensions = ['scio.autowsdl']\n"
+                   "master_doc = 'index'\n")
+        self.write('index.rst', 'Services\n========\n\n.. toctree::\n\n%s\n'
+                   % '\n'.join(toc))
+        self.describe = autowsdl.AutoWsdl.describe
+
+    def teardown(self):
+        autowsdl.AutoWsdl.describe = self.describe
+        shutil.rmtree(self.dir)
+
+    def write(self, name, text):
+        fh = open(os.path.join(self.src, name), 'w')
+        try:
+            fh.write(text)
+        finally:
+            fh.close()
+
+    def build(self, parallel=0, out='out', **conf):
+        out = os.path.join(self.dir, out)
+        app = Sphinx(self.src, self.src, out, os.path.join(out, '.doctrees'),
+                     'text', confoverrides=conf, status=None, warning=None,
+                     freshenv=True, parallel=parallel)
+        app.build()
+        fh = open(os.path.join(out, 'lyrics.txt'))
+        try:
+            return fh.read()
+        finally:
+            fh.close()
+
+    def test_rst_cached_between_builds(self):
+        first = self.build()
+        cache = os.path.join(self.dir, 'out', '.doctrees', 'autowsdl')
+        eq_(len(os.listdir(cache)), 2)
+
+        def describe(self, data):
+            raise AssertionError("wsdl parsed again")
+        autowsdl.AutoWsdl.describe = describe
+        eq_(self.build(), first)
+        assert 'getArtist' in first
+
+    def test_no_cache(self):
+        self.build(autowsdl_cache_dir=False)
+        assert not os.path.exists(
+            os.path.join(self.dir, 'out', '.doctrees', 'autowsdl'))
+
+    def test_parallel_read(self):
+        eq_(self.build(parallel=2, out='parallel'), self.build())
+
+
+def test_cache_key():
+    cache = autowsdl.RstCache('unused')
+    eq_(cache.key('<wsdl/>', 'a'), cache.key('<wsdl/>', 'a'))
+    assert cache.key('<wsdl/>', 'a') != cache.key('<wsdl/>', 'b')
+    assert cache.key('<wsdl/>', 'a') != cache.key('<wsdl />', 'a')
+
+
+class TestRstCache(object):
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = autowsdl.RstCache(self.dir)
+        self.urlopen = scio.client.urlopen
+        self.imported = 'schema'
+        scio.client.urlopen = lambda url: StringIO(self.imported)
+
+    def teardown(self):
+        scio.client.urlopen = self.urlopen
+        shutil.rmtree(self.dir)
+
+    def test_changed_import_makes_entry_stale(self):
+        buf = ViewList(['Title', '====='], '<autowsdl>')
+        self.cache.store('key', buf, {'http://x/a.xsd':
+                                      sha1('schema').hexdigest()})
+        rst = self.cache.load('key')
+        eq_(list(rst.data), ['Title', '====='])
+        eq_(list(rst.items), [('<autowsdl>', 0), ('<autowsdl>', 1)])
+        self.imported = 'changed schema'
+        eq_(self.cache.load('key'), None)
@@ -0,0 +1,134 @@
+import os
+import shutil
+from StringIO import StringIO
+import tempfile
+
+from lxml import etree
+from nose.tools import eq_
+
+import scio.client
+from scio.cache import CachedFactory, WsdlCache
+import helpers
+
+
+def mock_urlopen(url):
+    fn = url.split('/')[-1]
+    return helpers.support(fn, 'r')
+
+
+class TestWsdlCache(object):
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = WsdlCache(self.dir)
+        self.urlopen = scio.client.urlopen
+        scio.client.urlopen = mock_urlopen
+
+    def teardown(self):
+        scio.client.urlopen = self.urlopen
+        shutil.rmtree(self.dir)
+
+    def test_second_client_is_built_from_cache(self):
+        cold = scio.Client(helpers.support('lyrics.wsdl', 'r'),
+                           cache=self.cache)
+        assert not isinstance(cold.wsdl, CachedFactory)
+        warm = scio.Client(helpers.support('lyrics.wsdl', 'r'),
+                           cache=self.cache)
+        assert isinstance(warm.wsdl, CachedFactory)
+        eq_(sorted(dir(cold.type)), sorted(dir(warm.type)))
+        eq_(sorted(dir(cold.service)), sorted(dir(warm.service)))
+
+    def test_cached_client_unmarshals_response(self):
+        scio.Client(helpers.support('lyrics.wsdl', 'r'), cache=self.cache)
+        lw = scio.Client(helpers.support('lyrics.wsdl', 'r'), cache=self.cache)
+        rsp = etree.fromstring(
+            helpers.support('lyric_rsp.xml', 'r').read())[0][0]
+        artist, albums = lw.service.getArtist.method.output(rsp)
+        eq_(len(albums), 22)
+        eq_(albums[0].album, u'Boy')
+        eq_(albums[0].year, 1980)
+        eq_(albums[0].songs[10], u'Shadows And Tall Trees')
+
+    def test_cached_client_serializes_request(self):
+        wsdl = 'adwords_trafficestimatorservice.wsdl'
+        cold = scio.Client(helpers.support(wsdl, 'r'), cache=self.cache)
+        warm = scio.Client(helpers.support(wsdl, 'r'), cache=self.cache)
+
+        def request(client):
+            cpg = client.type.CampaignRequest()
+            cpg.geoTargeting.cityTargets.cities = ['Houston', 'Ontario']
+            return etree.tostring(cpg.toxml(tag='CampaignRequest'))
+        eq_(request(cold), request(warm))
+
+    def test_changed_import_makes_entry_stale(self):
+        wsdl = 'CampaignManagementService.wsdl'
+        scio.Client(helpers.support(wsdl, 'r'), cache=self.cache)
+        key = self.cache.key(helpers.support(wsdl, 'r').read())
+        entry = self.cache.load(key)
+        assert entry['imports']
+        url = entry['imports'].keys()[0]
+        entry['imports'][url] = 'not the digest'
+        assert self.cache.is_stale(entry)
+        assert self.cache.is_stale(entry, age=30)
+        checking = WsdlCache(self.dir, max_age=60)
+        assert checking.is_stale(entry)
+        assert checking.is_stale(entry, age=120)
+        assert not checking.is_stale(entry, age=30)
+
+    def test_changed_import_rebuilds_client(self):
+        wsdl = 'CampaignManagementService.wsdl'
+        scio.Client(helpers.support(wsdl, 'r'), cache=self.cache)
+        changed = []
+
+        def resolver(url):
+            data = mock_urlopen(url).read()
+            if not changed:
+                changed.append(url)
+                data = data.replace('</xs:schema>',
+                                    '<!-- changed --></xs:schema>')
+            return StringIO(data)
+        lw = scio.Client(helpers.support(wsdl, 'r'), cache=self.cache,
+                         resolver=resolver)
+        assert changed
+        assert not isinstance(lw.wsdl, CachedFactory)
+
+    def test_max_age_limits_import_checks(self):
+        wsdl = 'CampaignManagementService.wsdl'
+        scio.Client(helpers.support(wsdl, 'r'), cache=self.cache)
+        fetched = []
+
+        def resolver(url):
+            fetched.append(url)
+            return mock_urlopen(url)
+        warm = scio.Client(helpers.support(wsdl, 'r'), cache=self.cache,
+                           resolver=resolver)
+        assert isinstance(warm.wsdl, CachedFactory)
+        assert fetched
+        del fetched[:]
+        checking = WsdlCache(self.dir, max_age=60)
+        key = self.cache.key(helpers.support(wsdl, 'r').read())
+        old = os.path.getmtime(self.cache.path(key)) - 120
+        os.utime(self.cache.path(key), (old, old))
+        scio.Client(helpers.support(wsdl, 'r'), cache=checking,
+                    resolver=resolver)
+        assert fetched
+        # checked now; not again until max_age has passed
+        del fetched[:]
+        scio.Client(helpers.support(wsdl, 'r'), cache=checking,
+                    resolver=resolver)
+        eq_(fetched, [])
+
+    def test_entry_writable_by_others_not_loaded(self):
+        scio.Client(helpers.support('lyrics.wsdl', 'r'), cache=self.cache)
+        key = self.cache.key(helpers.support('lyrics.wsdl', 'r').read())
+        assert self.cache.load(key) is not None
+        os.chmod(self.cache.path(key), 0666)
+        eq_(self.cache.load(key), None)
+
+    def test_unreadable_entry_is_rebuilt(self):
+        scio.Client(helpers.support('lyrics.wsdl', 'r'), cache=self.cache)
+        for fn in os.listdir(self.dir):
+            open(os.path.join(self.dir, fn), 'w').write('garbage')
+        lw = scio.Client(helpers.support('lyrics.wsdl', 'r'), cache=self.cache)
+        assert not isinstance(lw.wsdl, CachedFactory)
+        assert lw.type.AlbumResult
@@ -0,0 +1,74 @@
+from lxml import etree
+from nose.tools import eq_, raises
+
+import scio
+from scio.client import FrozenSchema
+import helpers
+from test_lazy import signature
+
+
+def test_compact_client_releases_documents():
+    client = scio.Client(helpers.support('CampaignService.wsdl', 'r'),
+                         compact=True)
+    assert client.wsdl.wsdl is None
+    eq_(client.wsdl._imports, {})
+    eq_(client.wsdl._index.types, {})
+    schemas = {}
+    for name, cls in vars(client.type).items():
+        schema = getattr(cls, '_schema', None)
+        if schema is not None:
+            assert isinstance(schema, FrozenSchema), name
+            schemas[id(schema)] = schema
+    # classes from the same schema share a frozen schema
+    assert 0 < len(schemas) < 5
+
+
+def test_compact_types_match():
+    for wsdl in ('shoppingservice.wsdl', 'zfapi.wsdl', 'jira.wsdl'):
+        client = scio.Client(helpers.support(wsdl, 'r'))
+        compact = scio.Client(helpers.support(wsdl, 'r'), compact=True)
+        for name, cls in sorted(vars(client.type).items()):
+            if name.startswith('_') or not hasattr(cls, '_children'):
+                continue
+            eq_(signature(getattr(compact.type, name)), signature(cls))
+
+
+def test_compact_client_formats_requests():
+    def request(client):
+        selector = client.type.Selector(
+            fields=['Id', 'Name'],
+            paging=client.type.Paging(startIndex=0, numberResults=10))
+        return etree.tostring(client.envelope(
+            client.service.get.method.input(serviceSelector=selector)))
+    client = scio.Client(helpers.support('CampaignService.wsdl', 'r'))
+    compact = scio.Client(helpers.support('CampaignService.wsdl', 'r'),
+                          compact=True)
+    eq_(request(compact), request(client))
+
+
+def test_compact_client_unmarshals_response():
+    compact = scio.Client(helpers.support('lyrics.wsdl', 'r'), compact=True)
+    response = etree.fromstring(
+        helpers.support('lyric_rsp.xml', 'r').read())[0][0]
+    artist, albums = compact.service.getArtist.method.output(response)
+    eq_(artist, u'U2')
+    eq_(albums[0].album, u'Boy')
+    eq_(len(albums[0].songs), 11)
+
+
+@raises(ValueError)
+def test_compact_client_cant_be_lazy():
+    scio.Client(helpers.support('lyrics.wsdl', 'r'), compact=True,
+                lazy=True)
+
+
+@raises(ValueError)
+def test_compact_client_cant_be_pruned():
+    scio.Client(helpers.support('lyrics.wsdl', 'r'), compact=True,
+                operations=['getArtist'])
+
+
+@raises(ValueError)
+def test_lazy_factory_cant_release():
+    client = scio.Client(helpers.support('lyrics.wsdl', 'r'), lazy=True)
+    client.wsdl.release()
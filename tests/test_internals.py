@@ -138,3 +138,15 @@ def test_fault_is_unpickleable():
         pf = pickle.dumps(f)
         upf = pickle.loads(pf)
         assert unicode(upf) == unicode(f)
+
+
+def test_definition_index():
+    lw = scio.client.Factory(helpers.support('lyrics.wsdl', 'r'))
+    tns = 'urn:LyricWiki'
+    aos = lw._index.find_type('ArrayOfstring')
+    eq_(aos.get('name'), 'ArrayOfstring')
+    assert lw._index.find_type('ArrayOfstring', tns) is aos
+    assert lw._index.find_type('ArrayOfstring', 'urn:nowhere') is None
+    assert lw._index.find_type('NoSuchType') is None
+    assert 'getArtistRequest' in lw._index.messages
+    assert ('LyricWikiPortType', 'getArtist') in lw._index.operations
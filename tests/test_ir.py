@@ -0,0 +1,148 @@
+from cPickle import dump
+import os
+import shutil
+from StringIO import StringIO
+import tempfile
+
+from lxml import etree
+from nose.tools import eq_, raises
+
+from scio import client, gen, ir
+import helpers
+
+
+def build(wsdl, **kw):
+    return client.Client(helpers.support(wsdl, 'r'), **kw)
+
+
+def write(client_):
+    buf = StringIO()
+    ir.save(client_, buf)
+    return buf.getvalue()
+
+
+def from_ir(data, **kw):
+    return client.Client(StringIO(data), factory_class=ir.IRFactory, **kw)
+
+
+def test_save_and_load():
+    data = write(build('lyrics.wsdl'))
+    assert ir.is_ir(data)
+    description = ir.load(StringIO(data))
+    eq_(description['name'], 'urn:LyricWiki')
+    assert [t for t, _ in description['types'] if t == 'AlbumResult']
+
+
+@raises(ValueError)
+def test_load_rejects_wsdl():
+    ir.load(helpers.support('lyrics.wsdl', 'rb'))
+
+
+@raises(ValueError)
+def test_load_rejects_older_format():
+    buf = StringIO()
+    buf.write(ir.MAGIC)
+    dump({'version': ir.FORMAT_VERSION - 1, 'description': {}}, buf)
+    ir.load(StringIO(buf.getvalue()))
+
+
+@raises(ValueError)
+def test_lazy_client_not_saved():
+    write(build('lyrics.wsdl', lazy=True))
+
+
+def test_client_from_ir_unmarshals_response():
+    lw = from_ir(write(build('lyrics.wsdl')))
+    assert lw.wsdl.wsdl is None
+    eq_(lw.wsdl.service_name, 'urn:LyricWiki')
+    rsp = etree.fromstring(
+        helpers.support('lyric_rsp.xml', 'r').read())[0][0]
+    artist, albums = lw.service.getArtist.method.output(rsp)
+    eq_(len(albums), 22)
+    eq_(albums[0].album, u'Boy')
+    eq_(albums[0].year, 1980)
+
+
+def test_client_from_ir_serializes_request():
+    wsdl = 'adwords_trafficestimatorservice.wsdl'
+    parsed = build(wsdl)
+    rebuilt = from_ir(write(parsed))
+
+    def request(client_):
+        cpg = client_.type.CampaignRequest()
+        cpg.geoTargeting.cityTargets.cities = ['Houston', 'Ontario']
+        return etree.tostring(cpg.toxml(tag='CampaignRequest'))
+    eq_(request(parsed), request(rebuilt))
+
+
+def test_client_from_ir_with_operations():
+    lw = from_ir(write(build('lyrics.wsdl')), operations=['getArtist'])
+    eq_([name for name in vars(lw.service) if not name.startswith('_')],
+        ['getArtist'])
+    # all types are still there
+    assert lw.type.LyricsResult
+
+
+@raises(ValueError)
+def test_client_from_ir_with_missing_operation():
+    from_ir(write(build('lyrics.wsdl')), operations=['noSuchOperation'])
+
+
+@raises(ValueError)
+def test_client_from_ir_with_pool():
+    from_ir(write(build('lyrics.wsdl')), pool=client.TypePool())
+
+
+def test_describe_makes_no_classes():
+    factory = client.Factory(helpers.support('lyrics.wsdl', 'r'))
+    description = factory.describe()
+    eq_(factory._classes, [])
+    eq_(description, ir.load(StringIO(write(build('lyrics.wsdl')))))
+
+
+def test_gen_from_ir():
+    for wsdl in ('lyrics.wsdl', 'boyzoid.wsdl', 'jira.wsdl'):
+        parsed = build(wsdl)
+        description = gen.describe(write(parsed))
+        eq_(description, parsed.wsdl.describe())
+        for kw in ({}, {'lazy': True}, {'marshal': True}):
+            eq_(gen.gen(parsed, **kw), gen.gen(description, **kw))
+
+
+def test_ir_path():
+    eq_(ir.ir_path('out', '/some/where/service.wsdl'), 'out/service.ir')
+
+
+def test_client_from_ir_saved_again():
+    data = write(build('lyrics.wsdl'))
+    eq_(ir.load(StringIO(write(from_ir(data)))), ir.load(StringIO(data)))
+
+
+def test_ir_factory_has_factory_state():
+    wsdl_client = build('lyrics.wsdl')
+    ir_client = from_ir(write(wsdl_client))
+    eq_(sorted(set(vars(wsdl_client.wsdl)) - set(vars(ir_client.wsdl))), [])
+
+
+def test_untrusted_ir_file_not_loaded():
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 'lyrics.ir')
+        fh = open(path, 'wb')
+        try:
+            fh.write(write(build('lyrics.wsdl')))
+        finally:
+            fh.close()
+        eq_(ir.load(open(path, 'rb'))['name'], 'urn:LyricWiki')
+        assert ir.is_ir(ir.read_file(path))
+        os.chmod(path, 0666)
+        for read in (lambda: ir.load(open(path, 'rb')),
+                     lambda: ir.read_file(path)):
+            try:
+                read()
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("untrusted IR file loaded")
+    finally:
+        shutil.rmtree(tmp)
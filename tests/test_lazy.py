@@ -0,0 +1,205 @@
+from StringIO import StringIO
+import threading
+
+from lxml import etree
+from nose.tools import eq_, raises
+
+import scio
+import helpers
+
+
+SUBSTITUTION_WSDL = """<?xml version="1.0" encoding="utf-8"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/"
+                  xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+                  xmlns:xs="http://www.w3.org/2001/XMLSchema"
+                  xmlns:tns="urn:shapes"
+                  targetNamespace="urn:shapes">
+  <wsdl:types>
+    <xs:schema targetNamespace="urn:shapes" elementFormDefault="qualified">
+      <xs:complexType name="ShapeType">
+        <xs:sequence>
+          <xs:element name="color" type="xs:string"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:element name="Shape" type="tns:ShapeType"/>
+      <xs:element name="Circle" substitutionGroup="tns:Shape">
+        <xs:complexType>
+          <xs:complexContent>
+            <xs:extension base="tns:ShapeType">
+              <xs:sequence>
+                <xs:element name="radius" type="xs:int"/>
+              </xs:sequence>
+            </xs:extension>
+          </xs:complexContent>
+        </xs:complexType>
+      </xs:element>
+      <xs:complexType name="Drawing">
+        <xs:sequence>
+          <xs:element ref="tns:Shape" maxOccurs="unbounded"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="Unused">
+        <xs:sequence>
+          <xs:element name="name" type="xs:string"/>
+        </xs:sequence>
+      </xs:complexType>
+    </xs:schema>
+  </wsdl:types>
+</wsdl:definitions>
+"""
+
+SUBSTITUTION_SERVICE = """
+  <wsdl:message name="drawRequest">
+    <wsdl:part name="drawing" type="tns:Drawing"/>
+  </wsdl:message>
+  <wsdl:message name="drawResponse"/>
+  <wsdl:portType name="ShapesPortType">
+    <wsdl:operation name="draw">
+      <wsdl:input message="tns:drawRequest"/>
+      <wsdl:output message="tns:drawResponse"/>
+    </wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="ShapesBinding" type="tns:ShapesPortType">
+    <soap:binding style="rpc" transport="http://schemas.xmlsoap.org/soap/http"/>
+    <wsdl:operation name="draw">
+      <soap:operation soapAction="urn:shapes#draw" style="rpc"/>
+      <wsdl:input><soap:body use="literal" namespace="urn:shapes"/></wsdl:input>
+      <wsdl:output><soap:body use="literal" namespace="urn:shapes"/></wsdl:output>
+    </wsdl:operation>
+  </wsdl:binding>
+  <wsdl:service name="Shapes">
+    <wsdl:port name="ShapesPort" binding="tns:ShapesBinding">
+      <soap:address location="http://example.com/shapes"/>
+    </wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>
+"""
+
+
+def signature(cls):
+    return (cls.__name__, [b.__name__ for b in cls.__bases__],
+            [(c.name, getattr(c.type, '__name__', None))
+             for c in cls._children],
+            [(a.name, getattr(a.type, '__name__', None))
+             for a in cls._attributes])
+
+
+def test_lazy_client_makes_types_on_access():
+    eager = scio.Client(helpers.support('CampaignService.wsdl', 'r'))
+    lazy = scio.Client(helpers.support('CampaignService.wsdl', 'r'),
+                       lazy=True)
+    assert len(vars(lazy.type)) < len(vars(eager.type))
+    assert 'BudgetOptimizer' not in vars(lazy.type)
+    eq_(signature(lazy.type.BudgetOptimizer),
+        signature(eager.type.BudgetOptimizer))
+    assert 'BudgetOptimizer' in vars(lazy.type)
+
+
+def test_lazy_types_match_eager_types():
+    for wsdl in ('shoppingservice.wsdl', 'zfapi.wsdl', 'jira.wsdl'):
+        eager = scio.Client(helpers.support(wsdl, 'r'))
+        lazy = scio.Client(helpers.support(wsdl, 'r'), lazy=True)
+        for name, cls in sorted(vars(eager.type).items()):
+            if name.startswith('_') or not hasattr(cls, '_children'):
+                continue
+            eq_(signature(getattr(lazy.type, name)), signature(cls))
+
+
+@raises(AttributeError)
+def test_lazy_client_unknown_type():
+    lazy = scio.Client(helpers.support('lyrics.wsdl', 'r'), lazy=True)
+    lazy.type.NoSuchType
+
+
+def test_lazy_client_makes_only_used_types():
+    lazy = scio.Client(StringIO(SUBSTITUTION_WSDL), lazy=True)
+    eq_([n for n in vars(lazy.type) if not n.startswith('_')], [])
+    lazy.type.Drawing
+    assert 'Unused' not in vars(lazy.type)
+
+
+def test_lazy_substitution_group_members_made_with_head():
+    lazy = scio.Client(StringIO(SUBSTITUTION_WSDL), lazy=True)
+    lazy.type.Drawing
+    eq_(lazy.type.Shape._substitutions.keys(), ['Circle'])
+    assert lazy.type.Shape._substitutions['Circle'] is lazy.type.Circle
+
+
+def test_lazy_client_unmarshals_response():
+    lazy = scio.Client(helpers.support('lyrics.wsdl', 'r'), lazy=True)
+    response = etree.fromstring(
+        helpers.support('lyric_rsp.xml', 'r').read())[0][0]
+    artist, albums = lazy.service.getArtist.method.output(response)
+    eq_(artist, u'U2')
+    eq_(albums[0].album, u'Boy')
+    eq_(albums[0].year, 1980)
+
+
+def test_lazy_client_resolves_types_at_run_time():
+    lazy = scio.Client(helpers.support('CampaignService.wsdl', 'r'),
+                       lazy=True)
+    cls = lazy.wsdl.resolve('BudgetOptimizer', allow_ref=False)
+    assert cls is lazy.type.BudgetOptimizer
+
+
+def test_lazy_client_makes_methods_on_access():
+    lazy = scio.Client(helpers.support('lyrics.wsdl', 'r'), lazy=True)
+    assert 'getArtist' not in vars(lazy.service)
+    assert 'getArtist' in dir(lazy.service)
+    call = lazy.service.getArtist
+    assert 'getArtist' in vars(lazy.service)
+    assert call is lazy.service.getArtist
+    eq_(call.method.name, 'getArtist')
+    eq_([name for name, cls in call.method.input.parts], ['artist'])
+    assert 'getSong' not in vars(lazy.service)
+
+
+@raises(AttributeError)
+def test_lazy_client_unknown_method():
+    lazy = scio.Client(helpers.support('lyrics.wsdl', 'r'), lazy=True)
+    lazy.service.noSuchMethod
+
+
+def test_lazy_methods_made_once_across_threads():
+    lazy = scio.Client(helpers.support('CampaignService.wsdl', 'r'),
+                       lazy=True)
+    calls = []
+    def get():
+        calls.append(lazy.service.mutate)
+    threads = [threading.Thread(target=get) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    eq_(len(calls), 8)
+    for call in calls:
+        assert call is calls[0]
+    eq_(len(lazy.service._methods), 1)
+
+
+def test_pruned_client_has_only_some_operations():
+    eager = scio.Client(helpers.support('CampaignService.wsdl', 'r'))
+    pruned = scio.Client(helpers.support('CampaignService.wsdl', 'r'),
+                         operations=['get'])
+    eq_([n for n in dir(pruned.service) if not n.startswith('_')],
+        ['get', 'method_class'])
+    assert 'get' in vars(pruned.service)
+    types = [n for n in vars(pruned.type) if not n.startswith('_')]
+    assert 0 < len(types) < len(vars(eager.type))
+    for name in types:
+        if hasattr(eager.type.__dict__[name], '_children'):
+            eq_(signature(pruned.type.__dict__[name]),
+                signature(eager.type.__dict__[name]))
+
+
+def test_pruned_client_includes_substitution_group_members():
+    pruned = scio.Client(StringIO(SUBSTITUTION_WSDL.replace(
+        '</wsdl:definitions>', SUBSTITUTION_SERVICE)), operations=['draw'])
+    eq_(sorted(n for n in vars(pruned.type) if not n.startswith('_')),
+        ['Circle', 'Drawing', 'Shape', 'ShapeType'])
+
+
+@raises(ValueError)
+def test_pruned_client_unknown_operation():
+    scio.Client(helpers.support('lyrics.wsdl', 'r'),
+                operations=['getArtist', 'noSuchMethod'])
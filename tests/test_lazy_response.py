@@ -0,0 +1,71 @@
+from cPickle import dumps, loads
+
+from lxml import etree
+from nose.tools import eq_
+
+import scio
+import helpers
+
+
+def lw_reviver(classname, proto=object, args=()):
+    return proto.__new__(getattr(lw.type, classname), *args)
+
+
+lw = scio.Client(helpers.support('lyrics.wsdl', 'r'),
+                 reduce_callback=lw_reviver)
+
+LYRICS = helpers.support('lyric_rsp.xml', 'r').read()
+ADWORDS = helpers.support('adwords_response_example.xml', 'r').read()
+
+
+def albums(lazy):
+    rsp = etree.fromstring(LYRICS)[0][0]
+    artist, albums = lw.service.getArtist.method.output(rsp, lazy=lazy)
+    return albums
+
+
+def test_same_as_eager():
+    eq_(repr(albums(True)), repr(albums(False)))
+    adwords = scio.Client(
+        helpers.support('adwords_trafficestimatorservice.wsdl', 'r'))
+    method = adwords.service.estimateKeywordList.method
+    eager = adwords.handle_response(method, ADWORDS)
+    adwords.lazy_responses = True
+    lazy = adwords.handle_response(method, ADWORDS)
+    eq_(repr(lazy), repr(eager))
+    eq_(lazy[1]['operations'], 1)
+
+
+def test_children_read_when_used():
+    boy = albums(True)[0]
+    pending = boy.__dict__['_pending_']
+    eq_(sorted(pending), ['album', 'amazonLink', 'songs', 'year'])
+    eq_(boy.year, 1980)
+    assert 'year' not in pending
+    assert 'album' in pending
+    eq_(boy.songs[0], u'I Will Follow')
+    assert boy
+
+
+def test_set_and_delete_read_first():
+    lazy, eager = albums(True)[0], albums(False)[0]
+    for boy in lazy, eager:
+        boy.album = 'Boy (Remastered)'
+        del boy.year
+    eq_(sorted(lazy.__dict__['_pending_']), ['amazonLink', 'songs'])
+    eq_(repr(lazy), repr(eager))
+
+
+def test_toxml_reads_all():
+    lazy, eager = albums(True)[0], albums(False)[0]
+    eq_(etree.tostring(lazy.toxml('item')),
+        etree.tostring(eager.toxml('item')))
+    assert '_pending_' not in lazy.__dict__
+
+
+def test_pickle_reads_all():
+    boy = albums(True)[0]
+    eq_(boy.album, u'Boy')
+    unpickled = loads(dumps(boy))
+    assert '_pending_' not in unpickled.__dict__
+    eq_(repr(unpickled), repr(albums(False)[0]))
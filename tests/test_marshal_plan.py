@@ -0,0 +1,91 @@
+from lxml import etree
+from nose.tools import eq_
+
+from scio import client
+
+
+def make_item():
+    class Item(client.ComplexType):
+        _namespace = 'urn:t'
+        first = client.AttributeDescriptor('first', namespace='urn:t')
+        many = client.AttributeDescriptor('many', client.IntType,
+                                          max='unbounded', namespace='urn:t')
+        last = client.AttributeDescriptor('last', namespace='urn:t')
+        id = client.AttributeDescriptor('id')
+        _children = [first, many, last]
+        _attributes = [id]
+    return Item
+
+
+def xml(value, tag='item'):
+    return etree.tostring(value.toxml(tag))
+
+
+def test_children_in_schema_order():
+    item = make_item()()
+    item.last = 'z'
+    item.many = [2, 3]
+    item.first = 'a'
+    eq_(xml(item), '<ns0:item xmlns:ns0="urn:t"><ns0:first>a</ns0:first>'
+        '<ns0:many>2</ns0:many><ns0:many>3</ns0:many>'
+        '<ns0:last>z</ns0:last></ns0:item>')
+
+
+def test_unset_children_and_attributes_left_alone():
+    Item = make_item()
+    item = Item(last='z')
+    eq_(xml(item), '<ns0:item xmlns:ns0="urn:t"><ns0:last>z</ns0:last>'
+        '</ns0:item>')
+    # writing didn't make the attribute
+    assert '_id_' not in item.__dict__
+    item.id = '1'
+    eq_(xml(item), '<ns0:item xmlns:ns0="urn:t" id="1">'
+        '<ns0:last>z</ns0:last></ns0:item>')
+
+
+def test_repeated_child_name():
+    Item = make_item()
+    again = client.AttributeDescriptor('first', namespace='urn:t')
+    Item._children = Item._children + [again]
+    item = Item(first='a')
+    eq_(xml(item), '<ns0:item xmlns:ns0="urn:t"><ns0:first>a</ns0:first>'
+        '<ns0:first>a</ns0:first></ns0:item>')
+
+
+def test_plan_kept_on_class():
+    Item = make_item()
+    xml(Item(first='a'))
+    assert Item._marshal_plan() is Item.__dict__['_marshal_plan_']
+
+
+def test_schema_nsmaps_made_once():
+    schema = client.FrozenSchema({'t': 'urn:t', 'xsd': client.NS_XSD},
+                                 'urn:t', False)
+    assert schema.short_nsmap is schema.short_nsmap
+    assert schema.minimal_nsmap('urn:t') is schema.short_nsmap
+    qualified = client.FrozenSchema({'t': 'urn:t'}, 'urn:t', True)
+    eq_(qualified.minimal_nsmap('urn:u'), {None: 'urn:u'})
+    assert qualified.minimal_nsmap('urn:u') is qualified.minimal_nsmap('urn:u')
+
+
+def test_repr_and_truth_of_sparse_values():
+    Item = make_item()
+    item = Item()
+    assert not item
+    eq_(repr(item), 'Item()')
+    item.last = 'z'
+    item.id = '1'
+    assert item
+    # schema order, attributes first
+    eq_(repr(item), "Item(id=u'1', last=u'z')")
+    eq_(item._items(), [('id', u'1'), ('last', u'z')])
+    # reading an unset child makes no value for it
+    eq_(item.first, None)
+    eq_(repr(item), "Item(id=u'1', last=u'z')")
+
+
+def test_truth_of_content():
+    Item = make_item()
+    item = Item()
+    item._content = u'text'
+    assert item
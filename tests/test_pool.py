@@ -0,0 +1,207 @@
+from cPickle import dumps, loads
+import gc
+import imp
+import os
+import sys
+import weakref
+
+from lxml import etree
+from nose.tools import eq_, raises
+
+from scio import client, gen, static
+import helpers
+
+HERE = os.path.dirname(__file__)
+
+
+def build(wsdl, **kw):
+    return client.Client(helpers.support(wsdl, 'r'), **kw)
+
+
+def index(xml):
+    idx = client.DefinitionIndex()
+    idx.add(etree.fromstring(xml))
+    return idx
+
+
+def schema(body):
+    return ('<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" '
+            'xmlns:tns="urn:test" targetNamespace="urn:test">%s'
+            '</xs:schema>' % body)
+
+
+def digest(idx, name):
+    return idx.digest(idx.find_type(name), client.Factory._typemap)
+
+
+A = ('<xs:complexType name="A"><xs:sequence>'
+     '<xs:element name="b" type="tns:B"/></xs:sequence></xs:complexType>')
+
+
+def test_same_wsdl_shares_every_class():
+    pool = client.TypePool()
+    one = build('lyrics.wsdl', pool=pool)
+    two = build('lyrics.wsdl', pool=pool)
+    names = [name for name in vars(one.type) if not name.startswith('_')]
+    assert names
+    for name in names:
+        assert getattr(one.type, name) is getattr(two.type, name), name
+    eq_(len(pool), len(names))
+
+
+def test_classes_not_shared_without_pool():
+    one = build('lyrics.wsdl')
+    two = build('lyrics.wsdl')
+    assert one.type.AlbumResult is not two.type.AlbumResult
+
+
+def test_imported_schemas_shared():
+    pool = client.TypePool()
+    campaign = build('CampaignService.wsdl', pool=pool)
+    info = build('InfoService.wsdl', pool=pool)
+    assert campaign.type.DateRange is info.type.DateRange
+    assert (campaign.type.ApplicationException is
+            info.type.ApplicationException)
+    # the shared class works in the client that didn't make it
+    isel = info.type.InfoSelector(
+        dateRange=info.type.DateRange(min='20111101', max='20111130'))
+    eq_(isel.dateRange.min, '20111101')
+
+
+def test_abstract_types_not_shared():
+    pool = client.TypePool()
+    campaign = build('CampaignService.wsdl', pool=pool)
+    info = build('InfoService.wsdl', pool=pool)
+    # abstract types find the classes of their values in their own
+    # client, and their subclasses depend on them
+    assert campaign.type.ApiError is not info.type.ApiError
+    assert (campaign.type.AuthenticationError is not
+            info.type.AuthenticationError)
+
+
+def test_shared_class_behaves_the_same():
+    plain = build('lyrics.wsdl')
+    pool = client.TypePool()
+    build('lyrics.wsdl', pool=pool)
+    pooled = build('lyrics.wsdl', pool=pool)
+    rsp = etree.parse(helpers.support('lyric_rsp.xml', 'r')).getroot()
+    body = rsp.find('{%s}Body' % client.NS_SOAP_ENV)[0]
+    results = [lw.type.LyricsResult(body[0]).toxml('LyricsResult')
+               for lw in (plain, pooled)]
+    eq_(etree.tostring(results[0]), etree.tostring(results[1]))
+
+
+def test_lazy_client_uses_pool():
+    pool = client.TypePool()
+    eager = build('lyrics.wsdl', pool=pool)
+    lazy = build('lyrics.wsdl', pool=pool, lazy=True)
+    assert lazy.type.AlbumResult is eager.type.AlbumResult
+
+
+def test_reduce_callback_not_shared():
+    pool = client.TypePool()
+    one = build('lyrics.wsdl', pool=pool)
+    two = build('lyrics.wsdl', pool=pool, reduce_callback=lambda *a: None)
+    assert one.type.AlbumResult is not two.type.AlbumResult
+
+
+def test_dropped_client_collected():
+    pool = client.TypePool()
+    one = build('lyrics.wsdl', pool=pool)
+    refs = [weakref.ref(one), weakref.ref(one.wsdl)]
+    AlbumResult = one.type.AlbumResult
+    del one
+    gc.collect()
+    eq_([ref() for ref in refs], [None, None])
+    # its classes still work, and are still shared
+    assert build('lyrics.wsdl', pool=pool).type.AlbumResult is AlbumResult
+    eq_(AlbumResult(album='Boy').toxml('AlbumResult')[0].text, 'Boy')
+
+
+def pool_reviver(classname, proto=object, args=()):
+    return proto.__new__(getattr(pooled.type, classname), *args)
+pool_reviver.__safe_for_unpickle__ = True
+
+
+pooled = build('lyrics.wsdl', pool=client.TypePool(),
+               reduce_callback=pool_reviver)
+
+
+def test_shared_class_pickles():
+    album = pooled.type.AlbumResult(album='Boy', year=1980)
+    eq_(repr(loads(dumps(album))), repr(album))
+
+
+@raises(ValueError)
+def test_pool_and_cache():
+    build('lyrics.wsdl', pool=client.TypePool(), cache=object())
+
+
+def test_digest_follows_references():
+    one = index(schema(A + '<xs:simpleType name="B">'
+                       '<xs:restriction base="xs:string"/></xs:simpleType>'))
+    two = index(schema(A + '<xs:simpleType name="B">'
+                       '<xs:restriction base="xs:int"/></xs:simpleType>'))
+    same = index(schema('<xs:simpleType name="B">'
+                        '<xs:restriction base="xs:string"/></xs:simpleType>'
+                        + A))
+    assert digest(one, 'A') is not None
+    assert digest(one, 'A') != digest(two, 'A')
+    eq_(digest(one, 'A'), digest(same, 'A'))
+
+
+def test_digest_of_recursive_types():
+    idx = index(schema(
+        '<xs:complexType name="A"><xs:sequence>'
+        '<xs:element name="b" type="tns:B"/></xs:sequence></xs:complexType>'
+        '<xs:complexType name="B"><xs:sequence>'
+        '<xs:element name="a" type="tns:A"/></xs:sequence></xs:complexType>'))
+    assert digest(idx, 'A') is not None
+    assert digest(idx, 'A') != digest(idx, 'B')
+
+
+def test_digest_unshareable():
+    for body in (
+        # unknown type
+        A,
+        # abstract type
+        A + '<xs:complexType name="B" abstract="true"/>',
+        # anyType
+        A.replace('tns:B', 'xs:anyType'),
+        # substitution group head
+        A + '<xs:complexType name="B"/>'
+        '<xs:element name="C" type="tns:B" substitutionGroup="tns:B"/>'):
+        eq_(digest(index(schema(body)), 'A'), None)
+
+
+def load(name, wsdl, **kw):
+    code = gen.gen(build(wsdl, pool=client.TypePool()), shared=True, **kw)
+    path = os.path.join(HERE, '%s.py' % name)
+    fh = open(path, 'w')
+    try:
+        fh.write(code)
+    finally:
+        fh.close()
+    sys.modules.pop(name, None)
+    fh, path, desc = imp.find_module(name, [HERE])
+    try:
+        imp.load_module(name, fh, path, desc)
+    finally:
+        fh.close()
+    return sys.modules[name]
+
+
+def test_static_modules_share_classes():
+    static.pool.clear()
+    campaign = load('cssharedclient', 'CampaignService.wsdl')
+    accounts = load('sasharedclient', 'ServicedAccountService.wsdl')
+    info = load('insharedclient', 'InfoService.wsdl', lazy=True)
+    assert (accounts.Client().type.ApplicationException is
+            campaign.ApplicationException)
+    assert info.Client().type.DateRange is campaign.DateRange
+    assert accounts.Client().type.ApiError is not campaign.ApiError
+
+
+@raises(ValueError)
+def test_shared_gen_needs_pool():
+    gen.gen(build('lyrics.wsdl'), shared=True)
@@ -0,0 +1,119 @@
+from StringIO import StringIO
+
+from nose.tools import eq_
+
+import scio
+from scio.registry import Registry
+import helpers
+from test_subclassing import FooingClient
+
+
+class Transport(object):
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        return helpers.support('lyric_rsp.xml', 'r')
+
+
+class TestRegistry(object):
+
+    def setup(self):
+        self.registry = Registry()
+
+    def client(self, transport=None, fn='lyrics.wsdl', **kw):
+        return self.registry.client(helpers.support(fn, 'r'), transport,
+                                    **kw)
+
+    def test_clients_share_types_and_methods(self):
+        one = self.client()
+        two = self.client()
+        assert one is not two
+        assert one.service is not two.service
+        assert one.type is two.type
+        assert one.wsdl is two.wsdl
+        assert one.service.getArtist.method is two.service.getArtist.method
+        assert one.service.getArtist.client is one
+        assert two.service.getArtist.client is two
+
+    def test_clients_use_their_own_transports(self):
+        first, second = Transport(), Transport()
+        one = self.client(first)
+        two = self.client(second)
+        two.service.getArtist('Wilco')
+        eq_(len(first.requests), 0)
+        eq_(len(second.requests), 1)
+        one.service.getArtist('Wilco')
+        eq_(len(first.requests), 1)
+
+    def test_options_build_separate_clients(self):
+        eager = self.client()
+        lazy = self.client(lazy=True)
+        assert eager.wsdl is not lazy.wsdl
+        assert lazy.wsdl.lazy
+        pruned = self.client(operations=['getArtist'])
+        assert pruned.wsdl is not lazy.wsdl
+        assert self.client(operations=['getArtist']).wsdl is pruned.wsdl
+
+    def test_keyword_options_build_separate_clients(self):
+        one = self.client()
+        resolver = lambda url: None
+        two = self.client(resolver=resolver)
+        assert one.wsdl is not two.wsdl
+        assert self.client(resolver=resolver).wsdl is two.wsdl
+
+    def test_runtime_settings_not_shared(self):
+        one = self.client(stream_requests=1024, lazy_responses=True)
+        eq_(one.stream_requests, 1024)
+        assert one.lazy_responses
+        two = self.client()
+        assert two.wsdl is one.wsdl
+        eq_(two.stream_requests, None)
+        assert not two.lazy_responses
+        eq_(self.client(lazy_responses=True).stream_requests, None)
+
+    def test_different_wsdls_build_separate_clients(self):
+        one = self.client()
+        data = helpers.support('lyrics.wsdl', 'r').read()
+        two = self.registry.client(StringIO(data + '\n'))
+        assert one.wsdl is not two.wsdl
+
+    def test_lazy_methods_made_once_for_all_clients(self):
+        one = self.client(lazy=True)
+        two = self.client(lazy=True)
+        assert 'getArtist' not in vars(two.service)
+        call = one.service.getArtist
+        assert two.service.getArtist.method is call.method
+        assert 'getArtist' in dir(self.client(lazy=True).service)
+
+    def test_key_given(self):
+        one = self.client(key='lyrics')
+        wsdl = StringIO('not read')
+        two = self.registry.client(wsdl, key='lyrics')
+        assert one.wsdl is two.wsdl
+        eq_(wsdl.tell(), 0)
+        assert self.client().wsdl is not one.wsdl
+
+    def test_client_class(self):
+        client = self.client(client_class=FooingClient)
+        assert isinstance(client, FooingClient)
+        assert self.client().wsdl is not client.wsdl
+
+    def test_clear(self):
+        one = self.client()
+        self.registry.clear()
+        assert self.client().wsdl is not one.wsdl
+
+
+def test_copy():
+    transport = Transport()
+    client = scio.Client(helpers.support('lyrics.wsdl', 'r'))
+    copy = client.copy(transport)
+    assert copy.transport is transport
+    assert client.transport is not transport
+    assert copy.type is client.type
+    eq_(sorted(vars(copy.service)), sorted(vars(client.service)))
+    copy.service.getArtist('Wilco')
+    eq_(len(transport.requests), 1)
+    assert copy.copy().transport is transport
@@ -0,0 +1,88 @@
+from StringIO import StringIO
+import os
+import shutil
+import sys
+import tempfile
+
+from nose.tools import eq_
+
+import scio
+from scio import report
+from scio.cache import WsdlCache
+from scio.report import ReportingFactory
+import helpers
+
+LYRICS = os.path.join(helpers._support, 'lyrics.wsdl')
+
+
+def support_resolver(url):
+    return helpers.support(url.split('/')[-1], 'r')
+
+
+def build(fn, **kw):
+    return scio.Client(helpers.support(fn, 'r'),
+                       factory_class=ReportingFactory, **kw)
+
+
+def test_report_phases():
+    client = build('CampaignManagementService.wsdl',
+                   resolver=support_resolver)
+    rpt = client.wsdl.report
+    eq_(sorted(rpt.phases), sorted(report.PHASES))
+    for phase in ('parse', 'imports', 'types', 'methods'):
+        assert rpt.phases[phase] > 0, phase
+    assert rpt.total > 0
+
+
+def test_report_classes():
+    client = build('lyrics.wsdl')
+    rpt = client.wsdl.report
+    eq_(rpt.classes, {'enum': 0, 'array': 3, 'union': 0, 'simple': 0,
+                      'complex': 5})
+    assert rpt.refs_created > 0
+    assert rpt.refs_resolved > 0
+    calls = rpt.slowest(3)
+    eq_(len(calls), 3)
+    eq_(calls, sorted(calls, reverse=True))
+    for seconds, name in calls:
+        assert hasattr(client.type, name), name
+
+
+def test_lazy_report_grows():
+    client = build('CampaignManagementService.wsdl', lazy=True,
+                   resolver=support_resolver)
+    rpt = client.wsdl.report
+    eq_(sum(rpt.classes.values()), 0)
+    client.type.MobileAd
+    assert sum(rpt.classes.values()) > 0
+    assert 'MobileAd' in [name for seconds, name in rpt.calls]
+
+
+def test_cache_builds_with_factory_class():
+    directory = tempfile.mkdtemp()
+    try:
+        client = build('lyrics.wsdl', cache=WsdlCache(directory))
+        assert isinstance(client.wsdl, ReportingFactory)
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_format():
+    text = build('lyrics.wsdl').wsdl.report.format(2)
+    for phase in report.PHASES:
+        assert phase in text, phase
+    eq_(len(text.split('Slowest classes:\n')[1].splitlines()), 2)
+
+
+def test_main():
+    argv, stdout = sys.argv, sys.stdout
+    sys.argv = ['scio_build_report', '-n', '1',
+                LYRICS]
+    sys.stdout = StringIO()
+    try:
+        report.main()
+        output = sys.stdout.getvalue()
+    finally:
+        sys.argv, sys.stdout = argv, stdout
+    assert output.startswith(LYRICS)
+    assert 'Slowest classes:' in output
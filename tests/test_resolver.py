@@ -0,0 +1,166 @@
+import json
+import os
+import shutil
+import tempfile
+from StringIO import StringIO
+from urllib2 import HTTPError, URLError
+
+from nose.tools import eq_, raises
+
+import scio.client
+from scio.resolver import CachingResolver, CatalogResolver, Resolver
+import helpers
+
+XSD_URL = ('https://adcenterapi.microsoft.com/Api/Advertiser/V8/'
+           'CampaignManagement/CampaignManagementService.svc?xsd=')
+
+
+class Response(StringIO):
+    def __init__(self, data, headers):
+        StringIO.__init__(self, data)
+        self.headers = headers
+
+    def info(self):
+        return self.headers
+
+
+class FakeTransport(object):
+    """Serves documents from tests/support, with etags, and records
+    the requests it is sent."""
+    def __init__(self, headers=None):
+        self.requests = []
+        self.changed = set()
+        self.down = False
+        self.headers = headers or {}
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if self.down:
+            raise URLError('down')
+        url = request.get_full_url()
+        data = helpers.support(url.split('/')[-1], 'r').read()
+        if url in self.changed:
+            data = data.replace('<', ' <', 1)
+        etag = '"%s"' % len(data)
+        headers = {'ETag': etag}
+        headers.update(self.headers)
+        if request.get_header('If-none-match') == etag:
+            raise HTTPError(url, 304, 'Not Modified', headers, None)
+        return Response(data, headers)
+
+
+class TestCachingResolver(object):
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        self.transport = FakeTransport()
+
+    def teardown(self):
+        shutil.rmtree(self.dir)
+
+    def test_fresh_copy_used_without_request(self):
+        resolver = CachingResolver(self.dir, self.transport, max_age=60)
+        first = resolver(XSD_URL + 'xsd0').read()
+        eq_(resolver(XSD_URL + 'xsd0').read(), first)
+        eq_(len(self.transport.requests), 1)
+
+    def test_stale_copy_revalidated(self):
+        resolver = CachingResolver(self.dir, self.transport, max_age=0)
+        first = resolver(XSD_URL + 'xsd0').read()
+        eq_(resolver(XSD_URL + 'xsd0').read(), first)
+        eq_(len(self.transport.requests), 2)
+        eq_(self.transport.requests[1].get_header('If-none-match'),
+            '"%s"' % len(first))
+
+    def test_changed_document_downloaded(self):
+        resolver = CachingResolver(self.dir, self.transport, max_age=0)
+        first = resolver(XSD_URL + 'xsd0').read()
+        self.transport.changed.add(XSD_URL + 'xsd0')
+        second = resolver(XSD_URL + 'xsd0').read()
+        assert second != first
+        eq_(resolver(XSD_URL + 'xsd0').read(), second)
+
+    def test_freshness_from_cache_control(self):
+        self.transport.headers['Cache-Control'] = 'public, max-age=600'
+        resolver = CachingResolver(self.dir, self.transport)
+        resolver(XSD_URL + 'xsd0')
+        resolver(XSD_URL + 'xsd0')
+        eq_(len(self.transport.requests), 1)
+
+    def test_stale_copy_used_when_fetch_fails(self):
+        resolver = CachingResolver(self.dir, self.transport, max_age=0)
+        first = resolver(XSD_URL + 'xsd0').read()
+        self.transport.down = True
+        eq_(resolver(XSD_URL + 'xsd0').read(), first)
+
+    def test_copies_are_plain_and_private(self):
+        directory = os.path.join(self.dir, 'docs')
+        resolver = CachingResolver(directory, self.transport, max_age=60)
+        data = resolver(XSD_URL + 'xsd0').read()
+        eq_(os.stat(directory).st_mode & 0777, 0700)
+        meta, copy = open(resolver.path(XSD_URL + 'xsd0'), 'rb').read(
+            ).split('\n', 1)
+        eq_(copy, data)
+        eq_(json.loads(meta)['url'], XSD_URL + 'xsd0')
+
+    @raises(URLError)
+    def test_fetch_failure_without_copy_raises(self):
+        self.transport.down = True
+        CachingResolver(self.dir, self.transport)(XSD_URL + 'xsd0')
+
+    def test_repeated_builds_make_no_requests(self):
+        def build():
+            resolver = CachingResolver(self.dir, self.transport, max_age=60)
+            return scio.client.Client(
+                helpers.support('CampaignManagementService.wsdl', 'r'),
+                resolver=resolver)
+        build()
+        eq_(len(self.transport.requests), 5)
+        client = build()
+        eq_(len(self.transport.requests), 5)
+        eq_(client.type.ApplicationToken('fred'), 'fred')
+
+
+class TestCatalogResolver(object):
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        self.transport = FakeTransport()
+
+    def teardown(self):
+        shutil.rmtree(self.dir)
+
+    def test_mapped_urls_read_from_files(self):
+        path = os.path.join(helpers._support,
+                            'CampaignManagementService.svc?xsd=xsd0')
+        resolver = CatalogResolver({XSD_URL + 'xsd0': path},
+                                   resolver=Resolver(self.transport))
+        eq_(resolver(XSD_URL + 'xsd0').read(), open(path).read())
+        eq_(self.transport.requests, [])
+        resolver(XSD_URL + 'xsd1')
+        eq_(len(self.transport.requests), 1)
+
+    def test_catalog_file(self):
+        catalog = os.path.join(self.dir, 'catalog.xml')
+        fh = open(catalog, 'w')
+        fh.write("""<?xml version="1.0"?>
+<catalog xmlns="urn:oasis:names:tc:entity:xmlns:xml:catalog">
+  <rewriteURI uriStartString="%s"
+              rewritePrefix="%s/CampaignManagementService.svc?xsd="/>
+</catalog>""" % (XSD_URL, os.path.relpath(helpers._support, self.dir)))
+        fh.close()
+        resolver = CatalogResolver.load(catalog, Resolver(self.transport))
+        client = scio.client.Client(
+            helpers.support('CampaignManagementService.wsdl', 'r'),
+            resolver=resolver)
+        eq_(client.type.ApplicationToken('fred'), 'fred')
+        eq_(self.transport.requests, [])
+
+
+def test_client_fetches_imports_with_transport():
+    transport = FakeTransport()
+    client = scio.client.Client(
+        helpers.support('CampaignManagementService.wsdl', 'r'),
+        transport=transport)
+    eq_(sorted([r.get_full_url() for r in transport.requests]),
+        [XSD_URL + 'xsd%s' % i for i in range(5)])
@@ -1,3 +1,5 @@
+import threading
+import time
 import unittest
 
 import scio.client
@@ -34,3 +36,68 @@ class TestSchemaImport(unittest.TestCase):
         tok = ns['Client']().type.ApplicationToken('fred')
         self.assertEqual(tok, 'fred')
         assert not 'StringType' in ns['Client']._types._types
+
+
+class TestImportResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.most_active = 0
+        self.fetched = []
+
+    def resolver(self, url):
+        self.lock.acquire()
+        try:
+            self.fetched.append(url)
+            self.active += 1
+            self.most_active = max(self.active, self.most_active)
+        finally:
+            self.lock.release()
+        # give the other fetches a chance to start
+        time.sleep(0.05)
+        self.lock.acquire()
+        try:
+            self.active -= 1
+        finally:
+            self.lock.release()
+        return mock_urlopen(url)
+
+    def test_imports_fetched_with_resolver(self):
+        client = scio.client.Client(
+            helpers.support('CampaignManagementService.wsdl', 'r'),
+            resolver=self.resolver)
+        self.assertEqual(client.type.ApplicationToken('fred'), 'fred')
+        self.assertEqual(len(self.fetched), 5)
+        self.assertEqual(sorted(client.wsdl._digests), sorted(self.fetched))
+
+    def test_imports_fetched_concurrently(self):
+        scio.client.Client(
+            helpers.support('CampaignManagementService.wsdl', 'r'),
+            resolver=self.resolver)
+        assert self.most_active > 1, self.most_active
+
+    def test_imports_processed_in_document_order(self):
+        client = scio.client.Client(
+            helpers.support('CampaignManagementService.wsdl', 'r'),
+            resolver=self.resolver)
+        expected = scio.client.Client(
+            helpers.support('CampaignManagementService.wsdl', 'r'),
+            resolver=mock_urlopen)
+        self.assertEqual(sorted(vars(client.type)),
+                         sorted(vars(expected.type)))
+        for name, cls in vars(expected.type).items():
+            if hasattr(cls, '_children'):
+                self.assertEqual(
+                    [c.name for c in vars(client.type)[name]._children],
+                    [c.name for c in cls._children])
+
+    def test_fetch_error_raised_when_import_is_processed(self):
+        def resolver(url):
+            if url.endswith('xsd=xsd3'):
+                raise IOError("Unable to fetch %s" % url)
+            return mock_urlopen(url)
+        self.assertRaises(
+            IOError, scio.client.Client,
+            helpers.support('CampaignManagementService.wsdl', 'r'),
+            resolver=resolver)
@@ -1,3 +1,9 @@
+import os
+import shutil
+import tempfile
+
+from nose.tools import eq_
+
 from scio import client, gen
 
 import helpers
@@ -14,3 +20,105 @@ def test_static_generation_does_not_raise_error():
                  'shoppingservice.wsdl', 'synxis.wsdl', 'zfapi.wsdl'):
         print wsdl
         yield check, wsdl
+
+
+def test_static_generation_of_some_operations():
+    lw = client.Client(helpers.support('lyrics.wsdl'))
+    code = gen.gen(lw, operations=['getArtist'])
+    ns = {}
+    exec code in ns
+    static = ns['Client']()
+    methods = [m for m in dir(static.service) if not m.startswith('_')]
+    assert methods == ['getArtist'], methods
+    assert hasattr(static.type, 'AlbumData')
+    assert not hasattr(static.type, 'LyricsResult')
+
+
+def _type(name, deps=(), refs=()):
+    return {'class_name': name, 'deps': list(deps), 'refs': list(refs),
+            'unresolved': set()}
+
+
+def test_sort_deps_orders_dependencies_first():
+    types = [_type('C', deps=['B']), _type('A'), _type('B', deps=['A']),
+             _type('D', deps=['A']), _type('E')]
+    order = [t['class_name'] for t in gen.sort_deps(types)]
+    assert order == ['E', 'A', 'D', 'B', 'C'], order
+
+
+def test_sort_deps_refs_in_cycles_left_unresolved():
+    types = [_type('A', refs=['B']), _type('B', refs=['A']),
+             _type('C', refs=['A']), _type('D'), _type('E', refs=['D'])]
+    key = lambda t: t['deps'] + t['refs']
+    order = list(gen.sort_deps(types, key=key, allow_refs=True))
+    assert [t['class_name'] for t in order] == ['D', 'E', 'A', 'B', 'C']
+    unresolved = [sorted(t['unresolved']) for t in order]
+    # only the reference that goes forward within the cycle needs to be
+    # resolved once all classes are defined
+    assert unresolved == [[], [], ['B'], [], []], unresolved
+
+
+def test_sort_deps_cycle_in_bases():
+    types = [_type('A', deps=['B']), _type('B', deps=['A']), _type('C')]
+    try:
+        list(gen.sort_deps(types))
+    except RuntimeError, e:
+        assert "'A': ['B']" in str(e), e
+    else:
+        assert False, "Cycle not found"
+
+
+class TestGenerateFiles(object):
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        self.wsdls = [os.path.join(helpers._support, fn)
+                      for fn in ('lyrics.wsdl', 'boyzoid.wsdl')]
+
+    def teardown(self):
+        shutil.rmtree(self.dir)
+
+    def test_modules_written_and_stamped(self):
+        written = gen.generate_files(self.wsdls, self.dir, jobs=2)
+        eq_(written, [os.path.join(self.dir, 'lyrics.py'),
+                      os.path.join(self.dir, 'boyzoid.py')])
+        for path, wsdl in zip(written, self.wsdls):
+            code = open(path).read()
+            eq_(gen.read_stamp(path),
+                gen.input_hash(open(wsdl, 'rb').read()))
+            ns = {}
+            exec code in ns
+            assert ns['Client']().service
+
+    def test_up_to_date_modules_skipped(self):
+        gen.generate_files(self.wsdls, self.dir, jobs=1)
+        path = os.path.join(self.dir, 'lyrics.py')
+        mtime = os.stat(path).st_mtime
+        eq_(gen.generate_files(self.wsdls, self.dir, jobs=1), [])
+        eq_(os.stat(path).st_mtime, mtime)
+        eq_(gen.generate_files(self.wsdls[:1], self.dir, force=True),
+            [path])
+
+    def test_operations_are_part_of_the_stamp(self):
+        path = os.path.join(self.dir, 'lyrics.py')
+        assert gen.generate_file(self.wsdls[0], path)
+        assert gen.generate_file(self.wsdls[0], path,
+                                 operations=['getArtist'])
+        assert not gen.generate_file(self.wsdls[0], path,
+                                     operations=['getArtist'])
+        assert 'def getSong' not in open(path).read()
+
+    def test_lazy_is_part_of_the_stamp(self):
+        path = os.path.join(self.dir, 'lyrics.py')
+        assert gen.generate_file(self.wsdls[0], path)
+        assert gen.generate_file(self.wsdls[0], path, lazy=True)
+        assert not gen.generate_file(self.wsdls[0], path, lazy=True)
+        assert 'LazyTypeRegistry' in open(path).read()
+
+    def test_module_path(self):
+        eq_(gen.module_path('out', 'a/b/Some-Service.v2.wsdl'),
+            os.path.join('out', 'Some_Service_v2.py'))
+
+
+def test_template_compiled_once():
+    assert gen._template(gen.TEMPLATE) is gen._template(gen.TEMPLATE)
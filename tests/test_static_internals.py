@@ -8,6 +8,7 @@ from nose.tools import raises, eq_
 import scio
 import scio.client
 import scio.gen
+from scio import static
 from scio.static import safe_id
 import helpers
 
@@ -146,3 +147,73 @@ def test_deserialize_boyzoid_response():
     quote = M['bz'].Client().service.getQuote.method.output(response)
     print quote, quote.item
     print quote.item[1].value
+
+
+def test_copy():
+    transport = lambda request: None
+    lw = M['lyr'].Client()
+    copy = lw.copy(transport)
+    assert isinstance(copy, M['lyr'].Client)
+    assert copy.transport is transport
+    assert lw.transport is not transport
+    assert copy.type.AlbumResult is lw.type.AlbumResult
+
+
+def test_methods_made_once_per_client_class():
+    lw = M['lyr'].Client()
+    call = lw.service.getArtist
+    assert lw.service is lw.service
+    assert lw.service.getArtist.method is call.method
+    assert M['lyr'].Client().service.getArtist.method is call.method
+    assert lw.copy().service.getArtist.client is not lw
+
+    class OtherMethod(scio.client.Method):
+        pass
+
+    class OtherClient(M['lyr'].Client):
+        methodClass = OtherMethod
+
+    other = OtherClient().service.getArtist.method
+    assert isinstance(other, OtherMethod)
+    assert not isinstance(call.method, OtherMethod)
+
+
+def test_all_refs_resolved_at_import():
+    registry = M['zf'].Client._types
+    eq_(registry._refs, [])
+    eq_(registry._new_refs, 0)
+    for name, t in registry._types.items():
+        for entry in dir(t):
+            item = getattr(t, entry)
+            assert not isinstance(item, static.Ref), (name, entry)
+            assert not isinstance(getattr(item, 'type', None),
+                                  static.Ref), (name, entry)
+            if entry == '_substitutions' and item:
+                for v in item.values():
+                    assert not isinstance(v, static.Ref), (name, entry)
+
+
+def test_refs_found_when_registered():
+    registry = static.TypeRegistry()
+    class Node(scio.client.ComplexType):
+        next = scio.client.AttributeDescriptor('next', registry.ref('Node'))
+        _substitutions = {'Leaf': registry.ref('Leaf')}
+    registry.register('Node', Node)
+    class Leaf(Node):
+        pass
+    registry.register('Leaf', Leaf)
+    eq_(len(registry._refs), 2)
+    registry.resolve_refs()
+    assert Node.next.type is Node
+    assert Node._substitutions['Leaf'] is Leaf
+    eq_(registry._refs, [])
+
+
+def test_refs_outside_registered_classes_resolved():
+    registry = static.TypeRegistry()
+    class Node(scio.client.ComplexType):
+        pass
+    registry.register('Node', Node)
+    Node.next = scio.client.AttributeDescriptor('next', registry.ref('Node'))
+    registry.resolve_refs()
+    assert Node.next.type is Node
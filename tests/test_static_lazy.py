@@ -0,0 +1,135 @@
+from cPickle import dumps, loads
+import imp
+import os
+import sys
+import threading
+
+from lxml import etree
+from nose.tools import eq_, raises
+
+from scio import client, gen, static
+import helpers
+
+HERE = os.path.dirname(__file__)
+
+M = {}
+
+
+def setup():
+    for name, wsdl in (('lwlazyclient', 'lyrics.wsdl'),
+                       ('zflazyclient', 'zfapi.wsdl')):
+        code = gen.gen(client.Client(helpers.support(wsdl, 'r')), lazy=True)
+        fh = open(os.path.join(HERE, '%s.py' % name), 'w')
+        try:
+            fh.write(code)
+        finally:
+            fh.close()
+    M['eager'] = helpers.generate_static_clients()[1]
+
+
+def load(name):
+    # a fresh copy of the module, with no types made yet
+    sys.modules.pop(name, None)
+    fh, path, desc = imp.find_module(name, [HERE])
+    try:
+        imp.load_module(name, fh, path, desc)
+    finally:
+        fh.close()
+    return sys.modules[name]
+
+
+def test_import_makes_no_types():
+    zf = load('zflazyclient')
+    assert zf.Client._types._factories
+    assert 'Address' not in zf.Client._types._types
+    assert isinstance(zf, static.LazyModule)
+
+
+def test_types_made_on_access():
+    zf = load('zflazyclient')
+    address = zf.Client().type.Address
+    assert zf.Client._types._types['Address'] is address
+    assert 'Address' not in zf.Client._types._factories
+    eq_(str(address(etree.fromstring(
+        '<Address><FirstName>Fred</FirstName></Address>')).FirstName),
+        'Fred')
+    # only the types used by Address
+    assert 'Photo' not in zf.Client._types._types
+
+
+def test_refs_resolved_when_made():
+    zf = load('zflazyclient')
+    types = zf.Client._types
+    for name in ('Photo', 'PhotoSet', 'User'):
+        cls = getattr(zf.Client().type, name)
+        for child in cls._children:
+            assert not isinstance(child.type, static.Ref), \
+                "%s.%s is %s" % (name, child.name, child.type)
+            if child.type.__module__ == zf.__name__:
+                assert types._types[child.type.__name__] is child.type
+
+
+def test_lazy_types_match_eager_types():
+    zf = load('zflazyclient')
+    zf.Client.resolve_refs()
+    eager = M['eager'].Client._types._types
+    lazy = zf.Client._types._types
+    eq_(sorted(lazy.keys()), sorted(eager.keys()))
+    assert not zf.Client._types._factories
+    for name, cls in eager.items():
+        if not hasattr(cls, '_children'):
+            continue
+        eq_([(c.name, c.type.__name__) for c in lazy[name]._children],
+            [(c.name, c.type.__name__) for c in cls._children])
+        eq_([b.__name__ for b in lazy[name].__bases__],
+            [b.__name__ for b in cls.__bases__])
+
+
+def test_method_output():
+    lw = load('lwlazyclient').Client()
+    rsp = etree.fromstring(helpers.support('lyric_rsp.xml', 'r').read())[0][0]
+    artist, albums = lw.service.getArtist.method.output(rsp)
+    eq_(len(albums), 22)
+    eq_(albums[0].album, u'Boy')
+    eq_(albums[0].songs[10], u'Shadows And Tall Trees')
+
+
+def test_pickle_unmade_type():
+    lw = load('lwlazyclient').Client()
+    pickled = dumps(lw.type.AlbumResult(album='Boy', year=1980))
+    # unpickling makes the class in a fresh module
+    fresh = load('lwlazyclient')
+    album = loads(pickled)
+    assert album.__class__ is fresh.Client._types._types['AlbumResult']
+    eq_(album.album, 'Boy')
+    eq_(album.year, 1980)
+
+
+@raises(AttributeError)
+def test_missing_type():
+    load('lwlazyclient').Client().type.NoSuchType
+
+
+def test_exec_in_namespace():
+    code = gen.gen(client.Client(helpers.support('lyrics.wsdl', 'r')),
+                   lazy=True)
+    ns = {}
+    exec code in ns
+    assert ns['Client']().type.AlbumResult
+
+
+def test_threads_see_resolved_types():
+    zf = load('zflazyclient')
+    seen = []
+    def make():
+        cls = zf.Client().type.PhotoSet
+        seen.append([c.type for c in cls._children])
+    threads = [threading.Thread(target=make) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    eq_(len(seen), 4)
+    for types in seen:
+        for t in types:
+            assert not isinstance(t, static.Ref)
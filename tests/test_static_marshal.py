@@ -0,0 +1,117 @@
+import imp
+import os
+
+from lxml import etree
+from nose.tools import eq_
+
+from scio import client, gen
+import helpers
+
+HERE = os.path.dirname(__file__)
+
+WSDLS = (('lyrics.wsdl', 'lw'),
+         ('zfapi.wsdl', 'zf'),
+         ('boyzoid.wsdl', 'bz'),
+         ('adwords_trafficestimatorservice.wsdl', 'adwords'))
+M = {}
+
+
+def setup():
+    # each client generated with and without marshalling code
+    for wsdl, name in WSDLS:
+        dynamic = client.Client(helpers.support(wsdl, 'r'))
+        for marshal, suffix in ((False, 'genericclient'),
+                               (True, 'marshalclient')):
+            module = name + suffix
+            fh = open(os.path.join(HERE, module + '.py'), 'w')
+            try:
+                fh.write(gen.gen(dynamic, marshal=marshal))
+            finally:
+                fh.close()
+            fh, path, desc = imp.find_module(module, [HERE])
+            try:
+                M[(name, marshal)] = imp.load_module(module, fh, path, desc)
+            finally:
+                fh.close()
+
+
+def dump(value):
+    # everything unmarshalling sets, with classes by name
+    if isinstance(value, (list, tuple)):
+        return [type(value).__name__] + [dump(v) for v in value]
+    if isinstance(value, dict):
+        return sorted([(k, dump(v)) for k, v in value.items()])
+    state = getattr(value, '__dict__', None)
+    if state is None:
+        return value
+    if isinstance(value, client.ComplexType):
+        # compared by identity
+        return (type(value).__name__, dump(state))
+    return (type(value).__name__, value, dump(state))
+
+
+def both(name, func):
+    generic = func(M[(name, False)].Client())
+    generated = func(M[(name, True)].Client())
+    eq_(dump(generated), dump(generic))
+    return generated
+
+
+def test_lyrics_response():
+    rsp = etree.fromstring(helpers.support('lyric_rsp.xml', 'r').read())[0][0]
+    artist, albums = both(
+        'lw', lambda c: c.service.getArtist.method.output(rsp))
+    eq_(len(albums), 22)
+    eq_(albums[0].year, 1980)
+    eq_(albums[0].songs[10], u'Shadows And Tall Trees')
+
+
+def test_adwords_response():
+    rsp = helpers.support('adwords_response_example.xml', 'r').read()
+    result, headers = both('adwords', lambda c: c.handle_response(
+        c.service.estimateKeywordList.method, rsp))
+    eq_(headers['operations'], 1)
+
+
+def test_boyzoid_response():
+    rsp = etree.parse(helpers.support('bz_response.xml', 'r')).getroot()
+    quote = both('bz', lambda c: c.service.getQuote.method.output(rsp))
+    eq_(quote.item[1].key, 'QUOTE')
+
+
+def test_zfapi_types():
+    address = etree.fromstring(
+        '<Address xmlns:x="urn:x" x:ignored="1" Extra="2">'
+        '<FirstName>Fred</FirstName><x:LastName>Smith</x:LastName>'
+        '<Empty/><Country/></Address>')
+    def make(c):
+        value = c.type.Address(address)
+        return value, etree.tostring(value.toxml('Address'))
+    value, xml = both('zf', make)
+    eq_(value.FirstName, 'Fred')
+    assert 'Smith' in xml
+    eq_(value.LastName, 'Smith')
+
+
+def test_toxml():
+    def make(c):
+        album = c.type.AlbumResult(artist='U2', album='Boy', year=1980)
+        empty = c.type.AlbumResult()
+        return [etree.tostring(album.toxml('album')),
+                empty.toxml('album') is None,
+                etree.tostring(empty.toxml('album', empty=True))]
+    both('lw', make)
+
+
+def test_request():
+    def make(c):
+        return c.service.getArtist.format_request('U2').data
+    both('lw', make)
+
+
+def test_arrays():
+    def make(c):
+        return [c.type.ArrayOfstring(['a', u'b']),
+                c.type.ArrayOfstring(etree.fromstring(
+                    '<a><item>x</item><item/></a>'))]
+    both('lw', make)
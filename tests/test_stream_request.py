@@ -0,0 +1,146 @@
+from StringIO import StringIO
+
+from lxml import etree
+from nose.tools import eq_, raises
+
+import scio
+from scio import client
+import helpers
+
+
+def support_resolver(url):
+    return helpers.support(url.split('/')[-1], 'r')
+
+
+def build(fn, **kw):
+    return scio.Client(helpers.support(fn, 'r'),
+                       resolver=support_resolver, **kw)
+
+
+def c14n(xml):
+    return etree.tostring(etree.fromstring(xml), method='c14n')
+
+
+def streamed(client_, message):
+    buf = StringIO()
+    client_.write_envelope(message, buf)
+    return buf.getvalue()
+
+
+def same_xml(client_, message):
+    eq_(c14n(streamed(client_, message)),
+        c14n(etree.tostring(client_.envelope(message))))
+
+
+def keywords(bing, count):
+    for i in range(count):
+        kw = bing.type.Keyword(Text='keyword %s' % i, Param1='p%s' % i)
+        kw.ExactMatchBid.Amount = 0.25
+        yield kw
+
+
+def test_rpc_request():
+    lw = build('lyrics.wsdl')
+    same_xml(lw, lw.service.getArtist.method.input('Wilco'))
+
+
+def test_document_request_with_headers():
+    bing = build('CampaignManagementService.wsdl')
+    method = bing.service.AddKeywords.method
+    message = method.input(
+        AdGroupId=1, DeveloperToken='token',
+        Keywords=bing.type.ArrayOfKeyword(Keyword=list(keywords(bing, 3))))
+    assert message.headers
+    same_xml(bing, message)
+
+
+def written(value, tag):
+    buf = StringIO()
+    with etree.xmlfile(buf) as xf:
+        writer = client.StreamWriter(xf)
+        writer.start(etree.Element('root'), True)
+        writer.write(value, tag)
+        writer.end()
+    return buf.getvalue()[len('<root>'):-len('</root>')]
+
+
+def test_empty_values_left_out():
+    aw = build('adwords_trafficestimatorservice.wsdl')
+    cpg = aw.type.CampaignRequest()
+    # nothing set under these
+    cpg.geoTargeting.countryTargets
+    cpg.networkTargeting
+    eq_(cpg.toxml('CampaignRequest'), None)
+    eq_(written(cpg, 'CampaignRequest'), '')
+    cpg.geoTargeting.cityTargets.cities = ['Houston', 'Ontario']
+    xml = written(cpg, 'CampaignRequest')
+    eq_(c14n(xml), c14n(etree.tostring(cpg.toxml('CampaignRequest'))))
+    assert 'countryTargets' not in xml
+    assert 'networkTargeting' not in xml
+
+
+def test_repeated_child_from_generator():
+    bing = build('CampaignManagementService.wsdl')
+    method = bing.service.AddKeywords.method
+    listed = bing.type.ArrayOfKeyword(Keyword=list(keywords(bing, 5)))
+    stream = bing.type.ArrayOfKeyword(Keyword=keywords(bing, 5))
+    assert isinstance(stream.__dict__['_Keyword_'], client.ItemStream)
+    eq_(c14n(streamed(bing, method.input(AdGroupId=1, Keywords=stream))),
+        c14n(streamed(bing, method.input(AdGroupId=1, Keywords=listed))))
+
+
+def test_array_from_generator():
+    aw = build('adwords_campaignservice.wsdl')
+    method = aw.service.addCampaignList.method
+
+    def campaigns():
+        for i in range(3):
+            yield aw.type.Campaign(name='campaign %s' % i, status='Paused')
+    listed = streamed(aw, method.input(campaigns=list(campaigns())))
+    eq_(c14n(streamed(aw, method.input(campaigns=campaigns()))),
+        c14n(listed))
+    eq_(listed.count('<name>'), 3)
+
+
+def test_streamed_request_sent():
+    sent = []
+
+    def transport(request):
+        sent.append(request)
+        return StringIO(helpers.support('lyric_rsp.xml', 'r').read())
+    lw = build('lyrics.wsdl', transport=transport, stream_requests=1024)
+    artist, albums = lw.service.getArtist('U2')
+    eq_(len(albums), 22)
+    body = sent[0].get_data().read()
+    eq_(int(sent[0].get_header('Content-length')), len(body))
+    eq_(c14n(body), c14n(etree.tostring(lw.envelope(
+        lw.service.getArtist.method.input('U2')))))
+
+
+def test_streamed_body_read_once():
+    lw = build('lyrics.wsdl', stream_requests=1024)
+    body = lw.service.getArtist.format_request('U2').get_data()
+    chunks = []
+    while True:
+        chunk = body.read(100)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    try:
+        body.read(100)
+    except IOError:
+        pass
+    else:
+        raise AssertionError("body read again")
+    body.seek(0)
+    eq_(body.read(), ''.join(chunks))
+
+
+@raises(ValueError)
+def test_generator_written_once():
+    bing = build('CampaignManagementService.wsdl')
+    method = bing.service.AddKeywords.method
+    stream = bing.type.ArrayOfKeyword(Keyword=keywords(bing, 5))
+    message = method.input(AdGroupId=1, Keywords=stream)
+    streamed(bing, message)
+    streamed(bing, message)
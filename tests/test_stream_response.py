@@ -0,0 +1,99 @@
+from StringIO import StringIO
+from urllib2 import HTTPError
+
+from lxml import etree
+from nose.tools import eq_, raises
+
+import scio
+from scio import client
+import helpers
+
+FAULT = """<env:Envelope xmlns:env='http://schemas.xmlsoap.org/soap/envelope/'><env:Header></env:Header><env:Body><env:Fault><faultcode>env:Server</faultcode><faultstring>java.lang.NullPointerException</faultstring></env:Fault></env:Body></env:Envelope>"""
+
+
+def support_resolver(url):
+    return helpers.support(url.split('/')[-1], 'r')
+
+
+def lyrics(response):
+    def transport(request):
+        if isinstance(response, Exception):
+            raise response
+        return StringIO(response)
+    return scio.Client(helpers.support('lyrics.wsdl', 'r'),
+                       transport=transport)
+
+
+def bing_response(bing, count):
+    output = bing.service.GetKeywordsByAdGroupId.method.output
+    rsp = output.parts[0][1]()
+    rsp.Keywords.Keyword = [bing.type.Keyword(Text='keyword %s' % i, Id=i)
+                            for i in range(count)]
+    env = etree.Element('{%s}Envelope' % client.NS_SOAP_ENV)
+    etree.SubElement(env, client.SOAP_BODY).append(rsp.toxml())
+    return etree.tostring(env)
+
+
+def test_rpc_array_items():
+    lw = lyrics(helpers.support('lyric_rsp.xml', 'r').read())
+    items = lw.service.getArtist.stream('U2')
+    artist, albums = lw.service.getArtist('U2')
+    eq_(repr(list(items)), repr(list(albums)))
+
+
+def test_document_repeated_child():
+    bing = scio.Client(helpers.support('CampaignManagementService.wsdl', 'r'),
+                       resolver=support_resolver)
+    method = bing.service.GetKeywordsByAdGroupId.method
+    xml = bing_response(bing, 5)
+    items = list(bing.iter_response(method, StringIO(xml)))
+    eq_([kw.Text for kw in items], ['keyword %s' % i for i in range(5)])
+    eq_(items[4].Id, 4)
+    eq_(repr(items), repr(method.output(etree.fromstring(xml)[0][0])
+                          .Keywords.Keyword))
+
+
+def test_read_items_cleared():
+    bing = scio.Client(helpers.support('CampaignManagementService.wsdl', 'r'),
+                       resolver=support_resolver)
+    method = bing.service.GetKeywordsByAdGroupId.method
+    names, make = method.output.items('GetKeywordsByAdGroupIdResponse')
+    before = []
+
+    def counting(element):
+        # the parser reads ahead, but the items before are gone
+        before.append(len(list(element.itersiblings(preceding=True))))
+        return make(element)
+    method.output.items = lambda tag: (names, counting)
+    eq_(len(list(bing.iter_response(method,
+                                    StringIO(bing_response(bing, 50))))), 50)
+    eq_(max(before), 1)
+
+
+@raises(scio.Fault)
+def test_fault_raises():
+    lw = lyrics(FAULT)
+    list(lw.service.getArtist.stream('U2'))
+
+
+@raises(scio.Fault)
+def test_fault_in_http_error_raises():
+    lw = lyrics(HTTPError("http://foo", 500, "Server Error", {},
+                          StringIO(FAULT)))
+    lw.service.getArtist.stream('U2')
+
+
+def test_no_content():
+    lw = lyrics(HTTPError("http://foo", 204, "No Content", {}, None))
+    eq_(list(lw.service.getArtist.stream('U2')), [])
+
+
+@raises(scio.NotSOAP)
+def test_not_soap():
+    list(lyrics('<a/>').service.getArtist.stream('U2'))
+
+
+@raises(ValueError)
+def test_no_repeating_child():
+    lw = lyrics(helpers.support('lyric_rsp.xml', 'r').read())
+    list(lw.service.checkSongExists.stream('U2', 'Boy'))
@@ -0,0 +1,96 @@
+from lxml import etree
+from nose.tools import eq_
+
+from scio import client
+
+
+def make_item():
+    class Item(client.ComplexType):
+        _namespace = 'urn:t'
+        count = client.AttributeDescriptor('count', client.IntType,
+                                           namespace='urn:t')
+        names = client.AttributeDescriptor('names', client.StringType,
+                                           max='unbounded', namespace='urn:t')
+        when = client.AttributeDescriptor('when', client.DateType,
+                                          namespace='urn:t')
+        id = client.AttributeDescriptor('id')
+        _children = [count, names, when]
+        _attributes = [id]
+    return Item
+
+
+XML = ('<item xmlns:t="urn:t" xmlns:o="urn:other" id="7">'
+       '<t:count>3</t:count><names>x</names><o:names>y</o:names>'
+       '<t:names t:x="1"/><t:when>2011-11-30</t:when>'
+       '<t:unknown>z</t:unknown></item>')
+
+
+def test_children_by_any_tag():
+    item = make_item()(etree.fromstring(XML))
+    eq_(item.id, u'7')
+    eq_(item.count, 3)
+    assert isinstance(item.count, client.IntType)
+    eq_(item.names, [u'x', u'y', u''])
+    eq_(item.when.isoformat(), '2011-11-30')
+    # the attribute comes first
+    eq_([n._position for n in item.names], [2, 3, 4])
+    eq_(item.names[0]._tag, 'names')
+    eq_(item.names[0]._namespace, 'urn:t')
+
+
+def test_same_as_descriptors():
+    Item = make_item()
+    planned = Item(etree.fromstring(XML))
+    assigned = Item()
+    for el in etree.fromstring(XML):
+        name = client.local(el.tag)
+        if name != 'unknown':
+            setattr(assigned, name, el)
+    assigned.id = '7'
+    eq_(etree.tostring(planned.toxml('item')),
+        etree.tostring(assigned.toxml('item')))
+
+
+def test_plan_kept_on_class():
+    Item = make_item()
+    Item(etree.fromstring(XML))
+    plan = Item.__dict__['_unmarshal_plan_']
+    Item(etree.fromstring(XML))
+    assert Item._unmarshal_plan() is plan
+
+
+def test_subclass_has_own_plan():
+    Item = make_item()
+    Item(etree.fromstring(XML))
+
+    class Bigger(Item):
+        extra = client.AttributeDescriptor('extra', namespace='urn:t')
+        _children = Item._children + [extra]
+    big = Bigger(etree.fromstring(
+        '<item xmlns="urn:t"><count>1</count><extra>e</extra></item>'))
+    eq_(big.count, 1)
+    eq_(big.extra, u'e')
+    assert Bigger._unmarshal_plan() is not Item._unmarshal_plan()
+
+
+def test_own_setattr_sees_children():
+    Item = make_item()
+    seen = []
+
+    class Watched(Item):
+        def __setattr__(self, name, value):
+            seen.append(name)
+            super(Watched, self).__setattr__(name, value)
+    Watched(etree.fromstring(XML))
+    for name in ('id', 'count', 'names', 'when'):
+        assert name in seen, name
+
+
+def test_any_attribute_added_once():
+    Item = make_item()
+    Item.any_attribute = True
+    Item._attributes = list(Item._attributes)
+    for i in range(3):
+        item = Item(etree.fromstring('<item id="1" other="2"/>'))
+    eq_([a.name for a in Item._attributes], ['id', 'other'])
+    eq_(item.other, '2')
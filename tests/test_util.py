@@ -0,0 +1,32 @@
+import os
+import shutil
+import tempfile
+
+from nose.tools import eq_, raises
+
+from scio.util import atomic_write
+
+
+class TestAtomicWrite:
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'out')
+
+    def teardown(self):
+        shutil.rmtree(self.dir)
+
+    def test_replaces_file(self):
+        atomic_write(self.path, 'one')
+        atomic_write(self.path, 'two')
+        eq_(open(self.path, 'rb').read(), 'two')
+        eq_(os.listdir(self.dir), ['out'])
+
+    @raises(TypeError)
+    def test_failed_write_leaves_old_file(self):
+        atomic_write(self.path, 'one')
+        try:
+            atomic_write(self.path, object())
+        finally:
+            eq_(open(self.path, 'rb').read(), 'one')
+            eq_(os.listdir(self.dir), ['out'])